@@ -10,7 +10,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from app.database import Base
 from app.config import settings
-from app.models import Product, Order, OrderItem
+from app.models import Product, Order, OrderItem, TableCounter, IdempotencyKey, DailyProductSales, DailyOrderStatusCount
 import os
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,34 @@
+"""Add table_counters for maintained product count
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'table_counters',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('name')
+    )
+    # Seed with the current number of live products
+    op.execute(
+        "INSERT INTO table_counters (name, value) "
+        "SELECT 'products', COUNT(*) FROM products WHERE deleted_at IS NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('table_counters')
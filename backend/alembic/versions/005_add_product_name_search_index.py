@@ -0,0 +1,29 @@
+"""Add trigram index for product name search
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # GIN trigram index serving LIKE '%q%' and the similarity operator (%) on lower(name)
+    # for live products, as queried by ProductService.search_products
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_products_name_trgm ON products "
+        "USING gin (lower(name) gin_trgm_ops) WHERE deleted_at IS NULL"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_products_name_trgm")
@@ -0,0 +1,52 @@
+"""Add composite indexes for filtered order listing and live products
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Built CONCURRENTLY (outside the migration transaction) so writes are not blocked
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_orders_status_created_at_id', 'orders',
+            ['status', sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_orders_created_at_id', 'orders',
+            [sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_order_items_product_id_order_id', 'order_items', ['product_id', 'order_id'],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_products_live_id', 'products', ['id'],
+            unique=False, postgresql_where=sa.text('deleted_at IS NULL'), postgresql_concurrently=True,
+        )
+        # Superseded by ix_order_items_product_id_order_id (same leading column) and by
+        # the partial ix_products_live_id (queries only ever look for deleted_at IS NULL)
+        op.drop_index('ix_order_items_product_id', table_name='order_items', postgresql_concurrently=True)
+        op.drop_index('ix_products_deleted_at', table_name='products', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    op.create_index('ix_products_deleted_at', 'products', ['deleted_at'], unique=False)
+    op.create_index('ix_order_items_product_id', 'order_items', ['product_id'], unique=False)
+    op.drop_index('ix_products_live_id', table_name='products')
+    op.drop_index('ix_order_items_product_id_order_id', table_name='order_items')
+    op.drop_index('ix_orders_created_at_id', table_name='orders')
+    op.drop_index('ix_orders_status_created_at_id', table_name='orders')
@@ -0,0 +1,64 @@
+"""Add daily sales and order status rollups
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match app.models.rollup.ORDER_STATUS_SHARDS
+ORDER_STATUS_SHARDS = 8
+
+
+def upgrade() -> None:
+    op.create_table(
+        'daily_product_sales',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('units_sold', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('revenue', sa.Numeric(precision=14, scale=2), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='RESTRICT'),
+        sa.PrimaryKeyConstraint('day', 'product_id')
+    )
+    op.create_index(op.f('ix_daily_product_sales_product_id'), 'daily_product_sales', ['product_id'], unique=False)
+
+    order_status_enum = postgresql.ENUM('Pending', 'Shipped', 'Cancelled', name='orderstatus', create_type=False)
+    op.create_table(
+        'daily_order_status_counts',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('status', order_status_enum, nullable=False),
+        sa.Column('shard', sa.SmallInteger(), nullable=False),
+        sa.Column('order_count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('day', 'status', 'shard')
+    )
+
+    # Backfill from existing orders (order day in UTC; cancelled orders have no sales)
+    op.execute(
+        "INSERT INTO daily_product_sales (day, product_id, units_sold, revenue) "
+        "SELECT (o.created_at AT TIME ZONE 'UTC')::date, i.product_id, "
+        "SUM(i.quantity_ordered), SUM(i.quantity_ordered * i.price_at_time) "
+        "FROM order_items i JOIN orders o ON o.id = i.order_id "
+        "WHERE o.status <> 'Cancelled' "
+        "GROUP BY 1, 2"
+    )
+    op.execute(
+        "INSERT INTO daily_order_status_counts (day, status, shard, order_count) "
+        f"SELECT (created_at AT TIME ZONE 'UTC')::date, status, id % {ORDER_STATUS_SHARDS}, COUNT(*) "
+        "FROM orders GROUP BY 1, 2, 3"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('daily_order_status_counts')
+    op.drop_index(op.f('ix_daily_product_sales_product_id'), table_name='daily_product_sales')
+    op.drop_table('daily_product_sales')
@@ -0,0 +1,27 @@
+"""Add version columns to products and orders
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A constant server default does not rewrite the table on PostgreSQL 11+
+    op.add_column('products', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+    op.add_column('orders', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    op.drop_column('orders', 'version')
+    op.drop_column('products', 'version')
@@ -0,0 +1,48 @@
+"""Add reservations and reservation_items (stock holds)
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'reservations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_reservations_expires_at'), 'reservations', ['expires_at'], unique=False)
+    op.create_table(
+        'reservation_items',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('reservation_id', sa.Integer(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('price_at_time', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(['reservation_id'], ['reservations.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='RESTRICT'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_reservation_items_reservation_id', 'reservation_items', ['reservation_id'], unique=False)
+    op.create_index('ix_reservation_items_product_id', 'reservation_items', ['product_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reservation_items_product_id', table_name='reservation_items')
+    op.drop_index('ix_reservation_items_reservation_id', table_name='reservation_items')
+    op.drop_table('reservation_items')
+    op.drop_index(op.f('ix_reservations_expires_at'), table_name='reservations')
+    op.drop_table('reservations')
@@ -1,8 +1,15 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_async_db, get_db
 
 
 def get_database_session() -> Generator[Session, None, None]:
     """Dependency for getting database session"""
     yield from get_db()
+
+
+async def get_async_database_session() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency for getting an async database session"""
+    async for db in get_async_db():
+        yield db
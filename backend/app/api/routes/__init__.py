@@ -1,7 +1,32 @@
 from fastapi import APIRouter
-from app.api.routes import products, orders
+from app.api.routes import products, orders, async_products, async_orders, analytics, reservations, changes
+from app.config import settings
+
+
+def _unshadowed(router: APIRouter, async_router: APIRouter) -> APIRouter:
+    """Copy of a sync router without the routes its async counterpart already serves."""
+    served = {(route.path, method) for route in async_router.routes for method in route.methods}
+    remaining = APIRouter()
+    remaining.routes = [
+        route for route in router.routes
+        if not all((route.path, method) in served for method in route.methods)
+    ]
+    return remaining
+
 
 api_router = APIRouter()
 
-api_router.include_router(products.router, prefix="/products", tags=["products"])
-api_router.include_router(orders.router, prefix="/orders", tags=["orders"])
+if settings.db_mode == "async":
+    # Endpoints without an async counterpart keep being served by the sync routers.
+    # They go first so their literal paths win over path parameters like /{order_id}.
+    api_router.include_router(_unshadowed(products.router, async_products.router), prefix="/products", tags=["products"])
+    api_router.include_router(_unshadowed(orders.router, async_orders.router), prefix="/orders", tags=["orders"])
+    api_router.include_router(async_products.router, prefix="/products", tags=["products"])
+    api_router.include_router(async_orders.router, prefix="/orders", tags=["orders"])
+else:
+    api_router.include_router(products.router, prefix="/products", tags=["products"])
+    api_router.include_router(orders.router, prefix="/orders", tags=["orders"])
+
+api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
+api_router.include_router(reservations.router, prefix="/reservations", tags=["reservations"])
+api_router.include_router(changes.router, prefix="/changes", tags=["changes"])
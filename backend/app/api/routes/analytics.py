@@ -0,0 +1,63 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from app.api.dependencies import get_database_session
+from app.services.rollup_service import RollupService
+from app.schemas.analytics import DailyRevenue, ProductSales, DailyStatusCount
+
+router = APIRouter()
+
+DEFAULT_RANGE_DAYS = 30
+MAX_RANGE_DAYS = 366
+
+
+def _date_range(date_from: Optional[date], date_to: Optional[date]) -> Tuple[date, date]:
+    """Inclusive day range, defaulting to the last 30 days (UTC); 400 if invalid or too long."""
+    date_to = date_to or datetime.now(timezone.utc).date()
+    date_from = date_from or date_to - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    if date_from > date_to:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="date_from must not be after date_to")
+    if (date_to - date_from).days >= MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range must not exceed {MAX_RANGE_DAYS} days",
+        )
+    return date_from, date_to
+
+
+@router.get("/revenue/daily", response_model=List[DailyRevenue])
+def daily_revenue(
+    date_from: Optional[date] = Query(None, description="First order day (UTC), default 29 days before date_to"),
+    date_to: Optional[date] = Query(None, description="Last order day (UTC), default today"),
+    db: Session = Depends(get_database_session)
+):
+    """Units sold and revenue per order day, excluding cancelled orders (days without sales are omitted)"""
+    rows = RollupService.daily_revenue(db, *_date_range(date_from, date_to))
+    return [DailyRevenue(day=r.day, units_sold=r.units_sold, revenue=r.revenue) for r in rows]
+
+
+@router.get("/products/top", response_model=List[ProductSales])
+def top_products(
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    limit: int = Query(20, ge=1, le=500),
+    db: Session = Depends(get_database_session)
+):
+    """Best-selling products by units sold in the date range"""
+    rows = RollupService.top_products(db, *_date_range(date_from, date_to), limit=limit)
+    return [
+        ProductSales(product_id=r.product_id, product_name=r.name, units_sold=r.units_sold, revenue=r.revenue)
+        for r in rows
+    ]
+
+
+@router.get("/orders/status-daily", response_model=List[DailyStatusCount])
+def daily_status_counts(
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    db: Session = Depends(get_database_session)
+):
+    """Number of orders per order day and current status"""
+    rows = RollupService.daily_status_counts(db, *_date_range(date_from, date_to))
+    return [DailyStatusCount(day=r.day, status=r.status, order_count=r.order_count) for r in rows]
@@ -0,0 +1,179 @@
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, Response
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import etags
+from app.api.dependencies import get_async_database_session
+from app.api.routes.orders import (
+    _decode_after,
+    _order_etag,
+    _order_list_etag,
+    _product_ids,
+    _replay_response,
+    _set_next_cursor,
+)
+from app.order_intake import order_intake
+from app.serializers import json_response, order_payload
+from app.services.async_order_service import AsyncOrderService
+from app.services.async_product_service import AsyncProductService
+from app.services.async_idempotency_service import AsyncIdempotencyService
+from app.services.idempotency_service import IdempotencyService
+from app.schemas.order import OrderCreate, OrderResponse, OrderStatusUpdate
+from app.models.order import Order, OrderStatus
+from app.exceptions import (
+    IdempotencyKeyMismatchError,
+    InsufficientStockError,
+    OrderIntakeUnavailableError,
+    ProductNotFoundError,
+)
+
+router = APIRouter()
+
+
+async def _format_orders(db: AsyncSession, orders: List[Order]) -> List[dict]:
+    """OrderResponse payloads of orders, resolving product names through the product cache."""
+    product_names = await AsyncProductService.get_product_names(db, _product_ids(orders))
+    return [order_payload(order, product_names) for order in orders]
+
+
+@router.post("/", response_model=OrderResponse, status_code=201)
+async def create_order(
+    order_data: OrderCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: AsyncSession = Depends(get_async_database_session)
+):
+    """
+    Create a new order with stock reduction.
+    A retry with the same Idempotency-Key header and body replays the stored response.
+    Without a key, the order goes through the order intake queue when it is enabled.
+    """
+    request_hash = None
+    try:
+        if idempotency_key is None and order_intake.running:
+            order_id = await order_intake.create_async(order_data)
+            order = await AsyncOrderService.get_order(db, order_id)
+            return json_response((await _format_orders(db, [order]))[0], status_code=status.HTTP_201_CREATED)
+        if idempotency_key is not None:
+            request_hash = IdempotencyService.fingerprint(order_data)
+            stored = await AsyncIdempotencyService.lookup(db, idempotency_key, request_hash)
+            if stored is not None:
+                return _replay_response(stored)
+        try:
+            order = await AsyncOrderService.create_order(db, order_data, idempotency_key, request_hash)
+        except IntegrityError:
+            # A concurrent request with the same key committed first
+            stored = idempotency_key and await AsyncIdempotencyService.lookup(db, idempotency_key, request_hash)
+            if not stored:
+                raise
+            return _replay_response(stored)
+        order = await AsyncOrderService.get_order(db, order.id)
+        return json_response((await _format_orders(db, [order]))[0], status_code=status.HTTP_201_CREATED)
+    except IdempotencyKeyMismatchError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    except InsufficientStockError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except ProductNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except OrderIntakeUnavailableError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
+
+@router.get("/", response_model=list[OrderResponse])
+async def list_orders(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = Query(None, description="X-Next-Cursor of the previous page (takes precedence over skip)"),
+    order_status: Optional[OrderStatus] = Query(None, alias="status"),
+    created_from: Optional[datetime] = Query(None, description="Only orders created at or after this time"),
+    created_to: Optional[datetime] = Query(None, description="Only orders created before this time"),
+    product_id: Optional[int] = Query(None, description="Only orders containing this product"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_database_session)
+):
+    """List orders newest first with offset or cursor (keyset) pagination, optionally filtered"""
+    orders = await AsyncOrderService.list_orders(
+        db, skip=skip, limit=limit, after=_decode_after(after),
+        status=order_status, created_from=created_from, created_to=created_to, product_id=product_id,
+    )
+    _set_next_cursor(response, orders, limit)
+    product_names = await AsyncProductService.get_product_names(db, _product_ids(orders))
+    etag = _order_list_etag(orders, product_names, response)
+    if etags.if_none_match(if_none_match, etag):
+        return etags.not_modified(etag)
+    response.headers["ETag"] = etag
+    return json_response([order_payload(order, product_names) for order in orders], response)
+
+
+@router.get("/{order_id}", response_model=OrderResponse)
+async def get_order(
+    order_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_database_session)
+):
+    """Get order details by ID, with a strong ETag (304 on a matching If-None-Match)"""
+    if if_none_match is not None:
+        current = await AsyncOrderService.get_order_version(db, order_id)
+        if current is not None:
+            version, product_ids = current
+            etag = _order_etag(order_id, version, await AsyncProductService.get_product_names(db, product_ids))
+            if etags.if_none_match(if_none_match, etag):
+                return etags.not_modified(etag)
+    order = await AsyncOrderService.get_order(db, order_id)
+    if not order:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Order with ID {order_id} not found"
+        )
+    product_names = await AsyncProductService.get_product_names(db, _product_ids([order]))
+    response.headers["ETag"] = _order_etag(order.id, order.version, product_names)
+    return json_response(order_payload(order, product_names), response)
+
+
+@router.patch("/{order_id}/status", response_model=OrderResponse)
+@router.patch("/{order_id}/status/", response_model=OrderResponse)
+async def update_order_status(
+    order_id: int,
+    status_update: OrderStatusUpdate,
+    db: AsyncSession = Depends(get_async_database_session),
+):
+    """Update order status. Accepts body: { \"status\": \"Shipped\" } (or Pending, Cancelled)."""
+    try:
+        order = await AsyncOrderService.update_order_status(db, order_id, status_update.status)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    order = await AsyncOrderService.get_order(db, order.id)
+    return json_response((await _format_orders(db, [order]))[0])
+
+
+@router.post("/{order_id}/items/", response_model=OrderResponse)
+async def add_order_items(
+    order_id: int,
+    order_data: OrderCreate,
+    db: AsyncSession = Depends(get_async_database_session),
+):
+    """Add items to an existing Pending order."""
+    try:
+        order = await AsyncOrderService.add_items_to_order(db, order_id, order_data.items)
+        order = await AsyncOrderService.get_order(db, order.id)
+        return json_response((await _format_orders(db, [order]))[0])
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except InsufficientStockError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except ProductNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+@router.delete("/{order_id}/", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_order(
+    order_id: int,
+    db: AsyncSession = Depends(get_async_database_session),
+):
+    """Cancel an order (sets status to Cancelled)."""
+    try:
+        await AsyncOrderService.update_order_status(db, order_id, OrderStatus.CANCELLED)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
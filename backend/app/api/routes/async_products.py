@@ -0,0 +1,136 @@
+from fastapi import APIRouter, Depends, Header, Query, HTTPException, status, Body, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.api.dependencies import get_async_database_session
+from app import etags
+from app.api.routes.products import (
+    _decode_after,
+    _expected_version,
+    _if_match_version,
+    _product_etag,
+    _product_list_etag,
+    _to_product_list_response,
+)
+from app.exceptions import InsufficientStockError, VersionConflictError
+from app.serializers import json_response, product_payload
+from app.services.async_product_service import AsyncProductService
+from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse, ProductListResponse, StockAdjustment
+
+router = APIRouter()
+
+
+@router.post("/", response_model=ProductResponse, status_code=201)
+async def create_product(
+    product_data: ProductCreate,
+    db: AsyncSession = Depends(get_async_database_session)
+):
+    """Create a new product"""
+    return await AsyncProductService.create_product(db, product_data)
+
+
+@router.get("/", response_model=ProductListResponse)
+async def list_products(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = Query(None, description="next_cursor of the previous page (takes precedence over skip)"),
+    include_total: bool = Query(True, description="Set to false to omit the total"),
+    exact_total: bool = Query(False, description="Recount the total instead of using the maintained counter"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_database_session)
+):
+    """List products with offset or cursor (keyset) pagination"""
+    products, total = await AsyncProductService.list_products(
+        db, skip=skip, limit=limit, after_id=_decode_after(after),
+        include_total=include_total, exact_total=exact_total,
+    )
+    etag = _product_list_etag(products, total, skip, limit)
+    if etags.if_none_match(if_none_match, etag):
+        return etags.not_modified(etag)
+    response.headers["ETag"] = etag
+    return json_response(_to_product_list_response(products, total, skip, limit), response)
+
+
+@router.get("/{product_id}/", response_model=ProductResponse)
+async def get_product(
+    product_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_database_session)
+):
+    """Get a single product by ID, with a strong ETag (304 on a matching If-None-Match)"""
+    if if_none_match is not None:
+        version = await AsyncProductService.get_product_version(db, product_id)
+        if version is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+        etag = _product_etag(product_id, version)
+        if etags.if_none_match(if_none_match, etag):
+            return etags.not_modified(etag)
+    product = await AsyncProductService.get_product_cached(db, product_id)
+    if not product:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+    response.headers["ETag"] = _product_etag(product.id, product.version)
+    return json_response(product_payload(product), response)
+
+
+@router.patch("/{product_id}/", response_model=ProductResponse)
+async def update_product(
+    product_id: int,
+    product_data: ProductUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_database_session)
+):
+    """Update a product by ID (409 if an If-Match ETag or `version` field is not current)"""
+    expected_version = _expected_version(product_id, if_match, product_data)
+    try:
+        product = await AsyncProductService.update_product(db, product_id, product_data, expected_version)
+    except VersionConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    if not product:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+    response.headers["ETag"] = _product_etag(product.id, product.version)
+    return product
+
+
+@router.post("/{product_id}/stock/", response_model=ProductResponse)
+async def adjust_stock(
+    product_id: int,
+    adjustment: StockAdjustment,
+    response: Response,
+    db: AsyncSession = Depends(get_async_database_session)
+):
+    """Add (positive delta) or remove (negative delta) stock without a read-modify-write"""
+    try:
+        product = await AsyncProductService.adjust_stock(db, product_id, adjustment.delta)
+    except InsufficientStockError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if not product:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+    response.headers["ETag"] = _product_etag(product.id, product.version)
+    return product
+
+
+@router.delete("/{product_id}/", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_product(
+    product_id: int,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_database_session)
+):
+    """Delete a single product (409 if an If-Match ETag is sent and not current)"""
+    try:
+        deleted = await AsyncProductService.delete_product(db, product_id, _if_match_version(product_id, if_match))
+    except VersionConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    if not deleted:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+
+
+@router.post("/bulk-delete/", status_code=status.HTTP_200_OK)
+async def bulk_delete_products(
+    product_ids: List[int] = Body(..., embed=False),
+    db: AsyncSession = Depends(get_async_database_session)
+):
+    """Delete multiple products by ID. Request body: JSON array of product IDs, e.g. [1, 2, 3]."""
+    deleted = await AsyncProductService.delete_products_bulk(db, product_ids)
+    return {"deleted": deleted}
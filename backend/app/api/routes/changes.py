@@ -0,0 +1,94 @@
+import json
+from typing import Optional, Set
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from app.api.dependencies import get_database_session
+from app.change_feed import FeedEvent, change_feed
+from app.serializers import json_response
+from app.services.outbox_service import OutboxService
+
+router = APIRouter()
+
+ENTITIES = ("product", "order")
+
+
+def _entities(types: Optional[str]) -> Optional[Set[str]]:
+    """Entities selected by a comma-separated types parameter (None = all)."""
+    if not types:
+        return None
+    selected = {t.strip() for t in types.split(",") if t.strip()}
+    unknown = selected - set(ENTITIES)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown types: {', '.join(sorted(unknown))} (expected {', '.join(ENTITIES)})",
+        )
+    return selected
+
+
+def _selected(event_type: str, entities: Optional[Set[str]]) -> bool:
+    return entities is None or event_type.split(".", 1)[0] in entities
+
+
+def sse_message(event: Optional[FeedEvent]) -> str:
+    """One server-sent event (a keepalive comment for None)."""
+    if event is None:
+        return ": keepalive\n\n"
+    return f"id: {event.id}\nevent: {event.type}\ndata: {event.data}\n\n"
+
+
+@router.get("/")
+def list_changes(
+    after: int = Query(0, ge=0, description="Return events with an ID greater than this"),
+    limit: int = Query(100, ge=1, le=1000),
+    types: Optional[str] = Query(None, description="Comma-separated entities: product, order"),
+    db: Session = Depends(get_database_session)
+):
+    """
+    Poll the change feed: committed events after an offset, in ID order.
+    Pass next_after back as after to continue; it advances past filtered-out events too.
+    """
+    entities = _entities(types)
+    events = OutboxService.read(db, after, limit)
+    return json_response({
+        "events": [
+            {"id": e.id, "type": e.type, "entity_id": e.entity_id, "data": json.loads(e.data)}
+            for e in events if _selected(e.type, entities)
+        ],
+        "next_after": events[-1].id if events else after,
+    })
+
+
+@router.get("/stream")
+async def stream_changes(
+    after: Optional[int] = Query(None, ge=0, description="Replay events with an ID greater than this first"),
+    types: Optional[str] = Query(None, description="Comma-separated entities: product, order"),
+    last_event_id: Optional[str] = Header(None),
+):
+    """
+    Server-sent event stream of the change feed. Each event's id is its feed
+    offset: reconnecting clients send it back as Last-Event-ID (which wins over
+    after) and receive only what they missed. Without either, the stream starts
+    with the changes committed from now on.
+    """
+    entities = _entities(types)
+    if last_event_id is not None:
+        try:
+            after = int(last_event_id)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Last-Event-ID must be an event ID")
+    if not change_feed.configured:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Change feed is not running")
+
+    async def events():
+        async for event in change_feed.stream(after):
+            if event is None or _selected(event.type, entities):
+                yield sse_message(event)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Tell proxies (nginx) not to buffer the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
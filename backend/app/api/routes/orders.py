@@ -1,42 +1,133 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from datetime import datetime
+from typing import Dict, Iterable, List, Literal, Optional, Set, Tuple
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from app import etags
 from app.api.dependencies import get_database_session
+from app.etags import collection_etag, entity_etag
+from app.order_intake import order_intake
+from app.pagination import decode_cursor, encode_cursor
+from app.serializers import json_response, order_payload
 from app.services.order_service import OrderService
-from app.schemas.order import OrderCreate, OrderResponse, OrderStatusUpdate, OrderItemResponse
+from app.services.idempotency_service import IdempotencyService
+from app.services.product_service import ProductService
+from app.services.export_service import ExportService, ORDER_CSV_COLUMNS
+from app.schemas.order import (
+    OrderCreate,
+    OrderResponse,
+    OrderStatusUpdate,
+    OrderStatusBulkUpdate,
+    OrderStatusBulkResponse,
+    OrderBatchCreate,
+    OrderBatchResponse,
+)
 from app.models.order import Order, OrderStatus
-from app.models.order_item import OrderItem
-from app.exceptions import InsufficientStockError, ProductNotFoundError
+from app.models.idempotency_key import IdempotencyKey
+from app.exceptions import (
+    IdempotencyKeyMismatchError,
+    InsufficientStockError,
+    OrderIntakeUnavailableError,
+    ProductNotFoundError,
+)
 
 router = APIRouter()
 
 
+def _product_ids(orders: Iterable[Order]) -> Set[int]:
+    """Product IDs referenced by the orders' items."""
+    return {item.product_id for order in orders for item in order.order_items}
+
+
+def _format_orders(db: Session, orders: List[Order]) -> List[dict]:
+    """OrderResponse payloads of orders, resolving product names through the product cache."""
+    product_names = ProductService.get_product_names(db, _product_ids(orders))
+    return [order_payload(order, product_names) for order in orders]
+
+
+def _decode_after(after: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """(created_at, id) encoded in an `after` cursor (400 if malformed)."""
+    if after is None:
+        return None
+    try:
+        created_at, order_id = decode_cursor(after, datetime, int)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return created_at, order_id
+
+
+def _replay_response(stored: IdempotencyKey) -> Response:
+    """The response recorded for an Idempotency-Key, marked as a replay."""
+    return Response(
+        content=stored.response_body,
+        status_code=stored.status_code,
+        media_type="application/json",
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+def _order_etag(order_id: int, version: int, product_names: Dict[int, str]) -> str:
+    """
+    Strong ETag of an order: its version plus the product names the response
+    shows (from the same lookup as the body, so a rename changes the tag).
+    """
+    return entity_etag("order", order_id, version, sorted(product_names.items()))
+
+
+def _order_list_etag(orders: List[Order], product_names: Dict[int, str], response: Response) -> str:
+    """Weak ETag of an order page: changes when any listed order, product name or the next cursor changes."""
+    return collection_etag(
+        tuple((o.id, o.version) for o in orders),
+        tuple(sorted(product_names.items())),
+        response.headers.get("X-Next-Cursor"),
+    )
+
+
+def _set_next_cursor(response: Response, orders: List[Order], limit: int) -> None:
+    """Expose the cursor for the next page in the X-Next-Cursor header when the page is full."""
+    if len(orders) == limit:
+        last = orders[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+
+
 @router.post("/", response_model=OrderResponse, status_code=201)
 def create_order(
     order_data: OrderCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     db: Session = Depends(get_database_session)
 ):
-    """Create a new order with stock reduction"""
+    """
+    Create a new order with stock reduction.
+    A retry with the same Idempotency-Key header and body replays the stored
+    response without creating another order. Without a key, the order goes
+    through the order intake queue when it is enabled.
+    """
+    request_hash = None
     try:
-        order = OrderService.create_order(db, order_data)
+        if idempotency_key is None and order_intake.running:
+            order = OrderService.get_order(db, order_intake.create(order_data))
+            return json_response(_format_orders(db, [order])[0], status_code=status.HTTP_201_CREATED)
+        if idempotency_key is not None:
+            request_hash = IdempotencyService.fingerprint(order_data)
+            stored = IdempotencyService.lookup(db, idempotency_key, request_hash)
+            if stored is not None:
+                return _replay_response(stored)
+        try:
+            order = OrderService.create_order(db, order_data, idempotency_key, request_hash)
+        except IntegrityError:
+            # A concurrent request with the same key committed first
+            stored = idempotency_key and IdempotencyService.lookup(db, idempotency_key, request_hash)
+            if not stored:
+                raise
+            return _replay_response(stored)
         # Eager load relationships for response
         order = OrderService.get_order(db, order.id)
-        
-        # Format response with product names
-        order_items_response = []
-        for item in order.order_items:
-            order_items_response.append(OrderItemResponse(
-                id=item.id,
-                product_id=item.product_id,
-                quantity_ordered=item.quantity_ordered,
-                price_at_time=item.price_at_time,
-                product_name=item.product.name if item.product else None
-            ))
-        
-        return OrderResponse(
-            id=order.id,
-            created_at=order.created_at,
-            status=order.status,
-            order_items=order_items_response
+        return json_response(_format_orders(db, [order])[0], status_code=status.HTTP_201_CREATED)
+    except IdempotencyKeyMismatchError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
         )
     except InsufficientStockError as e:
         raise HTTPException(
@@ -48,48 +139,143 @@ def create_order(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
         )
+    except OrderIntakeUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+
+
+@router.post("/batch", response_model=OrderBatchResponse)
+def create_orders_batch(
+    batch: OrderBatchCreate,
+    db: Session = Depends(get_database_session)
+):
+    """
+    Create many orders in one transaction. Each order succeeds or fails on its own;
+    results are reported per order, in request order.
+    """
+    outcomes = OrderService.create_orders_batch(db, batch.orders)
+    orders = OrderService.get_orders(db, [o for o in outcomes if isinstance(o, int)])
+    created = {order["id"]: order for order in _format_orders(db, orders)}
+    results = []
+    for index, outcome in enumerate(outcomes):
+        if isinstance(outcome, int):
+            results.append({
+                "index": index,
+                "success": True,
+                "status_code": status.HTTP_201_CREATED,
+                "order": created[outcome],
+                "error": None,
+            })
+        else:
+            results.append({
+                "index": index,
+                "success": False,
+                "status_code": (
+                    status.HTTP_404_NOT_FOUND if isinstance(outcome, ProductNotFoundError)
+                    else status.HTTP_400_BAD_REQUEST
+                ),
+                "order": None,
+                "error": str(outcome),
+            })
+    return json_response({
+        "created": len(created),
+        "failed": len(results) - len(created),
+        "results": results,
+    })
+
+
+@router.post("/status/bulk", response_model=OrderStatusBulkResponse)
+def update_orders_status_bulk(
+    bulk_update: OrderStatusBulkUpdate,
+    db: Session = Depends(get_database_session)
+):
+    """
+    Move many orders to one status in a single transaction. Orders the
+    transition rules do not allow are skipped, with the reason, rather than
+    failing the request.
+    """
+    updated, skipped = OrderService.update_orders_status_bulk(db, bulk_update.order_ids, bulk_update.status)
+    return json_response({
+        "updated": [{"id": row.id, "status": row.status, "version": row.version} for row in updated],
+        "skipped": [{"id": order_id, "reason": reason} for order_id, reason in skipped],
+    })
+
+
+@router.get("/export")
+def export_orders(
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    created_from: Optional[datetime] = Query(None, description="Only orders created at or after this time"),
+    created_to: Optional[datetime] = Query(None, description="Only orders created before this time"),
+    order_status: Optional[OrderStatus] = Query(None, alias="status"),
+    db: Session = Depends(get_database_session),
+):
+    """
+    Stream all matching orders, by ID. NDJSON has one order per line with nested
+    items; CSV has one row per order item.
+    """
+    filters = dict(created_from=created_from, created_to=created_to, status=order_status)
+    if format == "csv":
+        body = ExportService.encode_csv(ExportService.iter_order_rows(db, **filters), ORDER_CSV_COLUMNS)
+        media_type = "text/csv"
+    else:
+        body = ExportService.encode_ndjson(ExportService.iter_orders(db, **filters))
+        media_type = "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="orders.{format}"'},
+    )
 
 
 @router.get("/", response_model=list[OrderResponse])
 def list_orders(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = Query(None, description="X-Next-Cursor of the previous page (takes precedence over skip)"),
+    order_status: Optional[OrderStatus] = Query(None, alias="status"),
+    created_from: Optional[datetime] = Query(None, description="Only orders created at or after this time"),
+    created_to: Optional[datetime] = Query(None, description="Only orders created before this time"),
+    product_id: Optional[int] = Query(None, description="Only orders containing this product"),
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_database_session)
 ):
-    """List orders with pagination"""
-    from sqlalchemy.orm import joinedload
-    
-    orders = db.query(Order).options(
-        joinedload(Order.order_items).joinedload(OrderItem.product)
-    ).order_by(Order.created_at.desc()).offset(skip).limit(limit).all()
-    
-    orders_response = []
-    for order in orders:
-        order_items_response = []
-        for item in order.order_items:
-            order_items_response.append(OrderItemResponse(
-                id=item.id,
-                product_id=item.product_id,
-                quantity_ordered=item.quantity_ordered,
-                price_at_time=item.price_at_time,
-                product_name=item.product.name if item.product else None
-            ))
-        orders_response.append(OrderResponse(
-            id=order.id,
-            created_at=order.created_at,
-            status=order.status,
-            order_items=order_items_response
-        ))
-    
-    return orders_response
+    """List orders newest first with offset or cursor (keyset) pagination, optionally filtered"""
+    orders = OrderService.list_orders(
+        db, skip=skip, limit=limit, after=_decode_after(after),
+        status=order_status, created_from=created_from, created_to=created_to, product_id=product_id,
+    )
+    _set_next_cursor(response, orders, limit)
+    product_names = ProductService.get_product_names(db, _product_ids(orders))
+    etag = _order_list_etag(orders, product_names, response)
+    if etags.if_none_match(if_none_match, etag):
+        return etags.not_modified(etag)
+    response.headers["ETag"] = etag
+    return json_response([order_payload(order, product_names) for order in orders], response)
 
 
 @router.get("/{order_id}", response_model=OrderResponse)
 def get_order(
     order_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_database_session)
 ):
-    """Get order details by ID"""
+    """
+    Get order details by ID, with a strong ETag. A matching If-None-Match is
+    answered with 304 from the order's version and product names, without
+    loading its items.
+    """
+    if if_none_match is not None:
+        current = OrderService.get_order_version(db, order_id)
+        if current is not None:
+            version, product_ids = current
+            etag = _order_etag(order_id, version, ProductService.get_product_names(db, product_ids))
+            if etags.if_none_match(if_none_match, etag):
+                return etags.not_modified(etag)
+
     order = OrderService.get_order(db, order_id)
     
     if not order:
@@ -98,23 +284,9 @@ def get_order(
             detail=f"Order with ID {order_id} not found"
         )
     
-    # Format response with product names
-    order_items_response = []
-    for item in order.order_items:
-        order_items_response.append(OrderItemResponse(
-            id=item.id,
-            product_id=item.product_id,
-            quantity_ordered=item.quantity_ordered,
-            price_at_time=item.price_at_time,
-            product_name=item.product.name if item.product else None
-        ))
-    
-    return OrderResponse(
-        id=order.id,
-        created_at=order.created_at,
-        status=order.status,
-        order_items=order_items_response
-    )
+    product_names = ProductService.get_product_names(db, _product_ids([order]))
+    response.headers["ETag"] = _order_etag(order.id, order.version, product_names)
+    return json_response(order_payload(order, product_names), response)
 
 
 def _do_update_order_status(
@@ -125,22 +297,7 @@ def _do_update_order_status(
     """Shared logic for PATCH order status (used by both with and without trailing slash)."""
     order = OrderService.update_order_status(db, order_id, status_update.status)
     order = OrderService.get_order(db, order.id)
-    order_items_response = [
-        OrderItemResponse(
-            id=item.id,
-            product_id=item.product_id,
-            quantity_ordered=item.quantity_ordered,
-            price_at_time=item.price_at_time,
-            product_name=item.product.name if item.product else None,
-        )
-        for item in order.order_items
-    ]
-    return OrderResponse(
-        id=order.id,
-        created_at=order.created_at,
-        status=order.status,
-        order_items=order_items_response,
-    )
+    return json_response(_format_orders(db, [order])[0])
 
 
 @router.patch("/{order_id}/status", response_model=OrderResponse)
@@ -172,31 +329,11 @@ def add_order_items(
         if not order:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
         # Return current order as response
-        order_items_response = [
-            OrderItemResponse(
-                id=item.id,
-                product_id=item.product_id,
-                quantity_ordered=item.quantity_ordered,
-                price_at_time=item.price_at_time,
-                product_name=item.product.name if item.product else None,
-            )
-            for item in order.order_items
-        ]
-        return OrderResponse(id=order.id, created_at=order.created_at, status=order.status, order_items=order_items_response)
+        return json_response(_format_orders(db, [order])[0])
     try:
         order = OrderService.add_items_to_order(db, order_id, order_data.items)
         order = OrderService.get_order(db, order.id)
-        order_items_response = [
-            OrderItemResponse(
-                id=item.id,
-                product_id=item.product_id,
-                quantity_ordered=item.quantity_ordered,
-                price_at_time=item.price_at_time,
-                product_name=item.product.name if item.product else None,
-            )
-            for item in order.order_items
-        ]
-        return OrderResponse(id=order.id, created_at=order.created_at, status=order.status, order_items=order_items_response)
+        return json_response(_format_orders(db, [order])[0])
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except InsufficientStockError as e:
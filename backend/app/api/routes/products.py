@@ -1,13 +1,79 @@
-from fastapi import APIRouter, Depends, Query, HTTPException, status, Body
+import anyio
+from fastapi import APIRouter, Depends, Header, Query, HTTPException, status, Body, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Iterator, List, Literal, Optional
+from app import etags
 from app.api.dependencies import get_database_session
+from app.etags import collection_etag, entity_etag
+from app.exceptions import InsufficientStockError, VersionConflictError
+from app.pagination import decode_cursor, encode_cursor
+from app.serializers import json_response, product_payload
 from app.services.product_service import ProductService
-from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse, ProductListResponse
+from app.services.export_service import ExportService, PRODUCT_CSV_COLUMNS
+from app.services.import_service import ProductImportService
+from app.schemas.product import (
+    ProductCreate,
+    ProductUpdate,
+    ProductBulkUpdate,
+    ProductBulkUpdateResponse,
+    ProductResponse,
+    ProductListResponse,
+    ProductImportResponse,
+    ProductSearchResponse,
+    StockAdjustment,
+)
 
 router = APIRouter()
 
 
+def _decode_after(after: Optional[str]) -> Optional[int]:
+    """Product ID encoded in an `after` cursor (400 if malformed)."""
+    if after is None:
+        return None
+    try:
+        return decode_cursor(after, int)[0]
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def _product_etag(product_id: int, version: int) -> str:
+    return entity_etag("product", product_id, version)
+
+
+def _expected_version(product_id: int, if_match: Optional[str], data: ProductUpdate) -> Optional[int]:
+    """Version the update must find, from If-Match or the body's version field (400 if they disagree)."""
+    version = _if_match_version(product_id, if_match)
+    if version is not None and data.version is not None and version != data.version:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="If-Match and version disagree")
+    return version if version is not None else data.version
+
+
+def _if_match_version(product_id: int, if_match: Optional[str]) -> Optional[int]:
+    """Version named by an If-Match header (None without one; 400 if malformed)."""
+    try:
+        return etags.version_from_if_match(if_match, "product", product_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def _product_list_etag(products, total, skip: int, limit: int) -> str:
+    """Weak ETag of a product page: changes when any listed product or the total changes."""
+    return collection_etag(tuple((p.id, p.version) for p in products), total, skip, limit)
+
+
+def _to_product_list_response(products, total, skip: int, limit: int) -> dict:
+    """ProductListResponse payload of a product page; next_cursor is set when the page is full."""
+    return {
+        "items": [product_payload(p) for p in products],
+        "total": total,
+        "skip": skip,
+        "limit": limit,
+        "next_cursor": encode_cursor(products[-1].id) if len(products) == limit else None,
+    }
+
+
 @router.post("/", response_model=ProductResponse, status_code=201)
 def create_product(
     product_data: ProductCreate,
@@ -20,52 +86,203 @@ def create_product(
 
 @router.get("/", response_model=ProductListResponse)
 def list_products(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = Query(None, description="next_cursor of the previous page (takes precedence over skip)"),
+    include_total: bool = Query(True, description="Set to false to omit the total"),
+    exact_total: bool = Query(False, description="Recount the total instead of using the maintained counter"),
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_database_session)
 ):
-    """List products with pagination"""
-    products, total = ProductService.list_products(db, skip=skip, limit=limit)
-    return ProductListResponse(
-        items=[ProductResponse.model_validate(p) for p in products],
-        total=total,
-        skip=skip,
-        limit=limit
+    """List products with offset or cursor (keyset) pagination"""
+    products, total = ProductService.list_products(
+        db, skip=skip, limit=limit, after_id=_decode_after(after),
+        include_total=include_total, exact_total=exact_total,
+    )
+    etag = _product_list_etag(products, total, skip, limit)
+    if etags.if_none_match(if_none_match, etag):
+        return etags.not_modified(etag)
+    response.headers["ETag"] = etag
+    return json_response(_to_product_list_response(products, total, skip, limit), response)
+
+
+def _iter_request_body(request: Request) -> Iterator[bytes]:
+    """Request body chunks, pulled from the event loop by a worker thread as they arrive."""
+    stream = request.stream()
+
+    async def next_chunk() -> bytes:
+        return await stream.__anext__()
+
+    while True:
+        try:
+            chunk = anyio.from_thread.run(next_chunk)
+        except StopAsyncIteration:
+            return
+        if chunk:
+            yield chunk
+
+
+@router.get("/search", response_model=ProductSearchResponse)
+def search_products(
+    q: str = Query(..., min_length=1, max_length=255, description="Name prefix, substring or approximate name"),
+    skip: int = Query(0, ge=0, le=1000),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_database_session)
+):
+    """
+    Search live products by name. Results are ranked: names starting with q,
+    then names containing q, then names similar to q (trigram similarity).
+    """
+    results = ProductService.search_products(db, q, skip=skip, limit=limit)
+    return json_response({
+        "items": [{**product_payload(product), "score": round(score, 4)} for product, score in results],
+        "query": q,
+        "skip": skip,
+        "limit": limit,
+    })
+
+
+@router.post("/import", response_model=ProductImportResponse)
+async def import_products(
+    request: Request,
+    format: Literal["csv", "ndjson"] = Query("csv"),
+    upsert_by_name: bool = Query(False, description="Update live products with the same name instead of inserting"),
+    db: Session = Depends(get_database_session)
+):
+    """
+    Bulk import products from the raw request body: CSV with a
+    name,price,stock_quantity header, or NDJSON objects with the same fields.
+    The body is parsed as it streams in and written in batches; invalid rows are
+    reported (row number and errors) without stopping the import.
+    """
+    return await run_in_threadpool(
+        ProductImportService.import_products, db, _iter_request_body(request), format, upsert_by_name
+    )
+
+
+@router.get("/export")
+def export_products(
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    include_deleted: bool = Query(False),
+    db: Session = Depends(get_database_session)
+):
+    """Stream the product catalog, by ID, as NDJSON or CSV."""
+    records = ExportService.iter_products(db, include_deleted=include_deleted)
+    if format == "csv":
+        body = ExportService.encode_csv(records, PRODUCT_CSV_COLUMNS)
+        media_type = "text/csv"
+    else:
+        body = ExportService.encode_ndjson(records)
+        media_type = "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="products.{format}"'},
     )
 
 
 @router.get("/{product_id}/", response_model=ProductResponse)
 def get_product(
     product_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_database_session)
 ):
-    """Get a single product by ID"""
-    product = ProductService.get_product(db, product_id)
+    """
+    Get a single product by ID, with a strong ETag. A matching If-None-Match
+    is answered with 304 after reading only the product's version.
+    """
+    if if_none_match is not None:
+        version = ProductService.get_product_version(db, product_id)
+        if version is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+        etag = _product_etag(product_id, version)
+        if etags.if_none_match(if_none_match, etag):
+            return etags.not_modified(etag)
+    product = ProductService.get_product_cached(db, product_id)
     if not product:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
-    return product
+    response.headers["ETag"] = _product_etag(product.id, product.version)
+    return json_response(product_payload(product), response)
+
+
+@router.patch("/bulk", response_model=ProductBulkUpdateResponse)
+@router.patch("/bulk/", response_model=ProductBulkUpdateResponse)
+def bulk_update_products(
+    bulk_update: ProductBulkUpdate,
+    db: Session = Depends(get_database_session)
+):
+    """
+    Update up to 10000 products, each with the fields it sets (stock absolutely
+    with stock_quantity or relatively with stock_delta). Each product succeeds or
+    is skipped on its own; outcomes are reported per product, in request order.
+    """
+    results = ProductService.update_products_bulk(db, bulk_update.items)
+    updated = sum(1 for _, outcome, _ in results if outcome == "updated")
+    return json_response({
+        "updated": updated,
+        "skipped": len(results) - updated,
+        "results": [
+            {"id": product_id, "outcome": outcome, "product": product_payload(row) if row is not None else None}
+            for product_id, outcome, row in results
+        ],
+    })
 
 
 @router.patch("/{product_id}/", response_model=ProductResponse)
 def update_product(
     product_id: int,
     product_data: ProductUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_database_session)
+):
+    """
+    Update a product by ID. With an If-Match ETag or a `version` field the
+    update only applies to that version and fails with 409 otherwise.
+    """
+    expected_version = _expected_version(product_id, if_match, product_data)
+    try:
+        product = ProductService.update_product(db, product_id, product_data, expected_version)
+    except VersionConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    if not product:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+    response.headers["ETag"] = _product_etag(product.id, product.version)
+    return product
+
+
+@router.post("/{product_id}/stock/", response_model=ProductResponse)
+def adjust_stock(
+    product_id: int,
+    adjustment: StockAdjustment,
+    response: Response,
     db: Session = Depends(get_database_session)
 ):
-    """Update a product by ID"""
-    product = ProductService.update_product(db, product_id, product_data)
+    """Add (positive delta) or remove (negative delta) stock without a read-modify-write"""
+    try:
+        product = ProductService.adjust_stock(db, product_id, adjustment.delta)
+    except InsufficientStockError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     if not product:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+    response.headers["ETag"] = _product_etag(product.id, product.version)
     return product
 
 
 @router.delete("/{product_id}/", status_code=status.HTTP_204_NO_CONTENT)
 def delete_product(
     product_id: int,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_database_session)
 ):
-    """Delete a single product"""
-    if not ProductService.delete_product(db, product_id):
+    """Delete a single product (409 if an If-Match ETag is sent and not current)"""
+    try:
+        deleted = ProductService.delete_product(db, product_id, _if_match_version(product_id, if_match))
+    except VersionConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
 
 
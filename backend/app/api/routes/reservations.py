@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from app.api.dependencies import get_database_session
+from app.api.routes.orders import _format_orders
+from app.exceptions import InsufficientStockError, ProductNotFoundError, ReservationNotFoundError
+from app.schemas.order import OrderResponse
+from app.schemas.reservation import ReservationCreate, ReservationResponse
+from app.serializers import json_response
+from app.services.order_service import OrderService
+from app.services.reservation_service import ReservationService
+
+router = APIRouter()
+
+
+@router.post("/", response_model=ReservationResponse, status_code=201)
+def hold_stock(
+    reservation_data: ReservationCreate,
+    db: Session = Depends(get_database_session)
+):
+    """
+    Hold stock for a checkout. The stock is taken now and returned if the
+    reservation is released or not confirmed before expires_at.
+    """
+    try:
+        return ReservationService.hold(db, reservation_data)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except InsufficientStockError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except ProductNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+@router.get("/{reservation_id}", response_model=ReservationResponse)
+def get_reservation(
+    reservation_id: int,
+    db: Session = Depends(get_database_session)
+):
+    """Get an active (unexpired) reservation"""
+    reservation = ReservationService.get_reservation(db, reservation_id)
+    if not reservation:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reservation not found or expired")
+    return reservation
+
+
+@router.post("/{reservation_id}/confirm", response_model=OrderResponse, status_code=201)
+def confirm_reservation(
+    reservation_id: int,
+    db: Session = Depends(get_database_session)
+):
+    """Create the order for an unexpired reservation (at the held prices, without taking stock again)"""
+    try:
+        order = ReservationService.confirm(db, reservation_id)
+    except ReservationNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    order = OrderService.get_order(db, order.id)
+    return json_response(_format_orders(db, [order])[0], status_code=status.HTTP_201_CREATED)
+
+
+@router.delete("/{reservation_id}", status_code=status.HTTP_204_NO_CONTENT)
+def release_reservation(
+    reservation_id: int,
+    db: Session = Depends(get_database_session)
+):
+    """Release a reservation and return its stock"""
+    if not ReservationService.release(db, reservation_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reservation not found")
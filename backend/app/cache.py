@@ -0,0 +1,136 @@
+"""Read-through product cache with pluggable storage backends"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional
+
+from app.config import settings
+from app.schemas.product import ProductResponse
+
+
+class CacheBackend(ABC):
+    """
+    Storage behind ProductCache.
+    The in-process LRUTTLCache is per worker; a shared backend (e.g. Redis)
+    implements the same methods so that invalidations reach every worker.
+    """
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if absent or expired."""
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting as needed."""
+
+    @abstractmethod
+    def delete_many(self, keys: Iterable[Hashable]) -> None:
+        """Drop the given keys if present."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every entry."""
+
+    def __len__(self) -> int:
+        return 0
+
+
+class LRUTTLCache(CacheBackend):
+    """Thread-safe in-process cache bounded by entry count (LRU) and age (TTL)."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.evictions = 0
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete_many(self, keys: Iterable[Hashable]) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class ProductCache:
+    """
+    Cache of live (not soft-deleted) products as ProductResponse, keyed by ID,
+    with hit/miss counters. Writers invalidate after commit so a concurrent
+    read cannot re-populate a value that is about to change.
+    """
+
+    def __init__(self, backend: CacheBackend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, product_id: int) -> Optional[ProductResponse]:
+        if not self.enabled:
+            return None
+        product = self.backend.get(product_id)
+        with self._lock:
+            if product is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return product
+
+    def set(self, product: ProductResponse) -> None:
+        if self.enabled:
+            self.backend.set(product.id, product)
+
+    def invalidate(self, product_ids: Iterable[int]) -> None:
+        if self.enabled:
+            self.backend.delete_many(product_ids)
+
+    def clear(self) -> None:
+        self.backend.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "size": len(self.backend),
+            "evictions": getattr(self.backend, "evictions", None),
+        }
+
+
+product_cache = ProductCache(
+    LRUTTLCache(maxsize=settings.product_cache_size, ttl=settings.product_cache_ttl),
+    enabled=settings.product_cache_enabled,
+)
@@ -0,0 +1,187 @@
+"""
+Fan-out of the change feed (the change_events outbox) to server-sent event streams.
+
+Each worker process runs at most one poller. It starts with the first
+subscriber and stops when the last one leaves. Every poll_interval seconds it
+reads the new outbox events once (OutboxService.read) and pushes them to every
+subscriber's queue, so open streams add no database load of their own. A
+subscriber resuming from an older offset first reads the events up to the
+poller's position from the outbox, then switches to the live ones. A
+subscriber that falls buffer_size events behind is taken off the live fan-out
+and catches up from the outbox again, so slow clients never stall the others.
+"""
+import asyncio
+import logging
+from contextlib import suppress
+from typing import AsyncIterator, Callable, List, NamedTuple, Optional, Set
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.services.outbox_service import OutboxService
+
+logger = logging.getLogger(__name__)
+
+READ_BATCH_SIZE = 500
+
+
+class FeedEvent(NamedTuple):
+    id: int
+    type: str
+    entity_id: Optional[int]
+    # JSON payload as stored in the outbox
+    data: str
+
+
+class _Subscriber:
+    def __init__(self, position: int, buffer_size: int):
+        # Events after this ID arrive through the queue
+        self.position = position
+        self.queue: asyncio.Queue = asyncio.Queue(buffer_size)
+        self.overflowed = False
+        self.closed = False
+
+    def push(self, events: List[FeedEvent]) -> None:
+        if self.overflowed:
+            return
+        for event in events:
+            try:
+                self.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.overflowed = True
+                return
+
+    def close(self) -> None:
+        self.closed = True
+        with suppress(asyncio.QueueFull):
+            self.queue.put_nowait(None)  # wakes a waiting stream
+
+
+class ChangeFeedBroadcaster:
+    """Single outbox poller per worker, shared by all change feed streams."""
+
+    def __init__(self, poll_interval: float = 0.5, buffer_size: int = 1000, heartbeat: float = 15.0):
+        self.poll_interval = poll_interval
+        self.buffer_size = buffer_size
+        self.heartbeat = heartbeat
+        self._session_factory: Optional[Callable[[], Session]] = None
+        self._subscribers: Set[_Subscriber] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._position = 0
+
+    @property
+    def configured(self) -> bool:
+        return self._session_factory is not None
+
+    def configure(self, session_factory: Callable[[], Session]) -> None:
+        """Read the outbox with sessions from session_factory (called by the app lifespan)."""
+        self._session_factory = session_factory
+
+    async def stop(self) -> None:
+        """Stop polling and end all open streams."""
+        self._session_factory = None
+        for subscriber in list(self._subscribers):
+            subscriber.close()
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+    def stats(self):
+        return {
+            "running": self._task is not None,
+            "subscribers": len(self._subscribers),
+            "position": self._position,
+        }
+
+    async def stream(self, after: Optional[int] = None) -> AsyncIterator[Optional[FeedEvent]]:
+        """
+        Events with ID > after (or, if after is None, those committed from now
+        on), in ID order, until stop(). Yields None when heartbeat seconds pass
+        without an event, so the caller can keep the connection alive.
+        """
+        last = after
+        while True:
+            subscriber = await self._subscribe()
+            try:
+                if last is None:
+                    last = subscriber.position
+                # Catch up from the outbox to where live delivery starts
+                while last < subscriber.position:
+                    events = await run_in_threadpool(self._read, last)
+                    events = [event for event in events if event.id <= subscriber.position]
+                    if not events:
+                        break
+                    for event in events:
+                        last = event.id
+                        yield event
+                while not subscriber.overflowed or not subscriber.queue.empty():
+                    try:
+                        event = await asyncio.wait_for(subscriber.queue.get(), self.heartbeat)
+                    except asyncio.TimeoutError:
+                        event = None
+                    if subscriber.closed:
+                        return
+                    if event is None:
+                        yield None
+                    elif event.id > last:
+                        last = event.id
+                        yield event
+            finally:
+                self._subscribers.discard(subscriber)
+            # Overflowed: the queue is drained, resume from the outbox
+
+    async def _subscribe(self) -> _Subscriber:
+        if self._session_factory is None:
+            raise RuntimeError("Change feed is not running")
+        if self._task is None:
+            position = await run_in_threadpool(self._latest_id)
+            if self._task is None:  # another subscriber may have started it meanwhile
+                self._position = position
+                self._task = asyncio.create_task(self._poll())
+        subscriber = _Subscriber(self._position, self.buffer_size)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    async def _poll(self) -> None:
+        while self._subscribers:
+            try:
+                events = await run_in_threadpool(self._read, self._position)
+            except Exception:
+                logger.exception("Reading the change feed outbox failed")
+                events = []
+            if events:
+                self._position = events[-1].id
+                for subscriber in list(self._subscribers):
+                    subscriber.push(events)
+            if len(events) < READ_BATCH_SIZE:
+                await asyncio.sleep(self.poll_interval)
+        # Idle: the next subscriber starts a new poller from the then-latest event
+        self._task = None
+
+    def _latest_id(self) -> int:
+        db = self._session_factory()
+        try:
+            return OutboxService.latest_id(db)
+        finally:
+            db.close()
+
+    def _read(self, after: int) -> List[FeedEvent]:
+        db = self._session_factory()
+        try:
+            return [
+                FeedEvent(event.id, event.type, event.entity_id, event.data)
+                for event in OutboxService.read(db, after, READ_BATCH_SIZE)
+            ]
+        finally:
+            db.close()
+
+
+# Configured by the app lifespan; the poller itself starts with the first stream
+change_feed = ChangeFeedBroadcaster(
+    poll_interval=settings.change_feed_poll_interval,
+    buffer_size=settings.change_feed_buffer_size,
+    heartbeat=settings.change_feed_heartbeat,
+)
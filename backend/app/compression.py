@@ -0,0 +1,181 @@
+"""
+Negotiated response compression (brotli when the `brotli` package is
+installed, otherwise gzip) as a pure ASGI middleware.
+
+Complete responses are compressed once they reach a minimum size. Streaming
+responses (exports) are compressed chunk by chunk and flushed after each
+chunk, so they are never buffered. Responses that already have a
+Content-Encoding and server-sent event streams pass through untouched. A
+compressed response's strong ETag gets a per-encoding suffix (encoded_etag).
+"""
+import zlib
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.etags import encoded_etag
+
+try:
+    import brotli
+except ImportError:  # brotli is optional
+    brotli = None
+
+# Preferred first when the client accepts several with the same q-value
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# Never compressed: events must reach the client as soon as they are sent
+_UNCOMPRESSED_TYPES = ("text/event-stream",)
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Accept-Encoding codings (lowercased) and their q-values."""
+    accepted = {}
+    for part in header.split(","):
+        coding, *params = part.strip().split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def choose_encoding(header: Optional[str], supported=SUPPORTED_ENCODINGS) -> Optional[str]:
+    """The supported encoding the client accepts with the highest q-value, or None."""
+    if not header:
+        return None
+    accepted = parse_accept_encoding(header)
+    best, best_quality = None, 0.0
+    for coding in supported:
+        quality = accepted.get(coding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+class _Compressor:
+    """Incremental gzip or brotli stream."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits 16 + MAX_WBITS writes the gzip header and trailer
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        """Compressed data, flushed so the client can decode everything sent so far."""
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses for clients that send a matching Accept-Encoding.
+    Whether a response is streamed is decided on its first body message: one
+    with more_body=False is a complete response and subject to minimum_size.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                if (
+                    "content-encoding" in headers
+                    or content_type.startswith(_UNCOMPRESSED_TYPES)
+                    or message["status"] < 200
+                    or message["status"] in (204, 304)
+                ):
+                    passthrough = True
+                    if message["status"] == 304 and "etag" in headers:
+                        message["headers"] = self._not_modified_headers(message, request_headers, encoding)
+                    await send(message)
+                else:
+                    # Held back until the first body message shows the response size
+                    start_message = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(raw=list(start_message["headers"]))
+                headers.add_vary_header("Accept-Encoding")
+                if not more_body and len(body) < self.minimum_size:
+                    start_message["headers"] = headers.raw
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                headers["Content-Encoding"] = encoding
+                if "etag" in headers:
+                    headers["ETag"] = encoded_etag(headers["ETag"], encoding)
+                if more_body:
+                    del headers["Content-Length"]
+                    start_message["headers"] = headers.raw
+                    await send(start_message)
+                else:
+                    body = compressor.finish(body)
+                    headers["Content-Length"] = str(len(body))
+                    start_message["headers"] = headers.raw
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+
+            data = compressor.chunk(body) if more_body else compressor.finish(body)
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _not_modified_headers(message, request_headers: Headers, encoding: str):
+        """304 headers naming the encoded ETag when that is the one the client validated."""
+        headers = MutableHeaders(raw=list(message["headers"]))
+        encoded = encoded_etag(headers["ETag"], encoding)
+        sent = [tag.strip() for tag in request_headers.get("if-none-match", "").split(",")]
+        if encoded in sent:
+            headers["ETag"] = encoded
+        return headers.raw
@@ -1,17 +1,68 @@
+from typing import Any, Dict
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 from app.config import settings
+from app.pool_metrics import InstrumentedAsyncAdaptedQueuePool, InstrumentedQueuePool
+
+
+def pool_options(database_url: str, asynchronous: bool = False) -> Dict[str, Any]:
+    """Engine pool arguments from settings; SQLite keeps SQLAlchemy's default pool."""
+    if make_url(database_url).get_backend_name() == "sqlite":
+        return {"pool_pre_ping": settings.db_pool_pre_ping}
+    return {
+        "poolclass": InstrumentedAsyncAdaptedQueuePool if asynchronous else InstrumentedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_use_lifo": settings.db_pool_use_lifo,
+    }
+
 
 engine = create_engine(
     settings.database_url,
-    pool_pre_ping=True,
-    echo=False
+    echo=False,
+    **pool_options(settings.database_url)
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# Async driver used for each sync backend when DB_MODE=async
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_database_url(database_url: str) -> str:
+    """Rewrite a sync database URL to use the matching async driver."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend '{backend}'")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def create_async_session_factory(database_url: str) -> async_sessionmaker:
+    """Build an async engine and session factory for the given (sync) database URL."""
+    async_engine = create_async_engine(
+        get_async_database_url(database_url),
+        echo=False,
+        **pool_options(database_url, asynchronous=True)
+    )
+    # expire_on_commit=False: attributes must stay loaded once the session
+    # hands objects back to an async route (no implicit IO outside run_sync).
+    return async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+# Only built in async mode so the async driver is not required otherwise
+AsyncSessionLocal = create_async_session_factory(settings.database_url) if settings.db_mode == "async" else None
+
 
 def get_db():
     """Dependency for getting database session"""
@@ -20,3 +71,11 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency for getting an async database session"""
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database sessions require DB_MODE=async")
+    async with AsyncSessionLocal() as db:
+        yield db
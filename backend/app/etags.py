@@ -0,0 +1,78 @@
+"""ETags for conditional GET (If-None-Match / 304 Not Modified)"""
+import hashlib
+from typing import Hashable, Optional
+from fastapi import Response, status
+
+# Content codings the compression middleware adds to strong ETags ("product-1-v3-gzip")
+ENCODING_SUFFIXES = ("-gzip", "-br")
+
+
+def entity_etag(kind: str, entity_id: int, version: int, *related: Hashable) -> str:
+    """
+    Strong ETag of one versioned row (products, orders). related is any other
+    data the representation includes (e.g. the product names in an order),
+    folded in as a digest so the tag changes with it.
+    """
+    if not related:
+        return f'"{kind}-{entity_id}-v{version}"'
+    digest = hashlib.blake2b(repr(related).encode(), digest_size=8).hexdigest()
+    return f'"{kind}-{entity_id}-v{version}-{digest}"'
+
+
+def version_from_if_match(header: Optional[str], kind: str, entity_id: int) -> Optional[int]:
+    """
+    Version named by an If-Match header holding one entity ETag (None if the
+    header is absent or "*"). Raises ValueError for anything else, including
+    weak ETags, which If-Match must not accept.
+    """
+    if header is None or header.strip() == "*":
+        return None
+    prefix = f'"{kind}-{entity_id}-v'
+    tag = _without_encoding(header)
+    if tag.startswith(prefix) and tag.endswith('"') and tag[len(prefix):-1].isdigit():
+        return int(tag[len(prefix):-1])
+    raise ValueError(f"If-Match must be the current ETag of {kind} {entity_id}")
+
+
+def collection_etag(*parts: Hashable) -> str:
+    """Weak ETag of a list page, from the (id, version) pairs and paging values it was built from."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """
+    ETag of a content-coded body. Strong tags get a per-encoding suffix, since
+    the coded and identity bodies must not share a strong validator (RFC 9110
+    8.8.3); weak tags are unchanged.
+    """
+    if etag.startswith("W/") or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def _without_encoding(tag: str) -> str:
+    """A tag sent back by a client, without the suffix encoded_etag added."""
+    tag = tag.strip()
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(f'{suffix}"'):
+            return f'{tag[:-len(suffix) - 1]}"'
+    return tag
+
+
+def if_none_match(header: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches etag (weak comparison, as RFC 9110
+    requires), in its identity or any encoded form.
+    """
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(_without_encoding(tag).removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response carrying the current ETag."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
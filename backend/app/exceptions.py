@@ -9,3 +9,23 @@ class InsufficientStockError(Exception):
 class ProductNotFoundError(Exception):
     """Raised when a product is not found"""
     pass
+
+
+class IdempotencyKeyMismatchError(Exception):
+    """Raised when an Idempotency-Key is reused with a different request body"""
+    pass
+
+
+class VersionConflictError(Exception):
+    """Raised when a versioned update targets a row that has changed since it was read"""
+    pass
+
+
+class ReservationNotFoundError(Exception):
+    """Raised when a stock reservation does not exist or has expired"""
+    pass
+
+
+class OrderIntakeUnavailableError(Exception):
+    """Raised when the order intake queue is stopped or does not answer in time"""
+    pass
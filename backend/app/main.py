@@ -1,12 +1,95 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Callable
+from fastapi import FastAPI, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm.exc import StaleDataError
 from app.api.routes import api_router
+from app.cache import product_cache
+from app.change_feed import change_feed
+from app.compression import CompressionMiddleware
+from app.config import settings
+from app.metrics import MetricsMiddleware, install_sql_hooks, render_metrics
 from app.exceptions import InsufficientStockError, ProductNotFoundError
-from app.database import engine, Base
+from app.database import engine, Base, AsyncSessionLocal, SessionLocal
+from app.order_intake import order_intake
+from app.pool_metrics import pool_stats
+from app.services.idempotency_service import IdempotencyService
+from app.services.outbox_service import OutboxService
+from app.services.reservation_service import ReservationService
+
+logger = logging.getLogger(__name__)
 
 # Create tables (in production, use Alembic migrations)
 # Base.metadata.create_all(bind=engine)
 
+
+
+def _purge_idempotency_keys() -> int:
+    db = SessionLocal()
+    try:
+        return IdempotencyService.purge_expired(db)
+    finally:
+        db.close()
+
+
+def _sweep_expired_reservations() -> int:
+    db = SessionLocal()
+    try:
+        return ReservationService.sweep_expired(db)
+    finally:
+        db.close()
+
+
+def _purge_change_events() -> int:
+    db = SessionLocal()
+    try:
+        return OutboxService.purge_older_than(db, settings.change_feed_retention)
+    finally:
+        db.close()
+
+
+async def _run_periodically(interval: float, job: Callable[[], int], description: str) -> None:
+    """Run a blocking maintenance job in the threadpool every interval seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(job)
+        except Exception:
+            logger.exception("%s failed", description)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    tasks = []
+    if settings.idempotency_purge_interval > 0:
+        tasks.append(asyncio.create_task(_run_periodically(
+            settings.idempotency_purge_interval, _purge_idempotency_keys, "Purging expired idempotency keys",
+        )))
+    if settings.reservation_sweep_interval > 0:
+        tasks.append(asyncio.create_task(_run_periodically(
+            settings.reservation_sweep_interval, _sweep_expired_reservations, "Sweeping expired reservations",
+        )))
+    if settings.change_feed_purge_interval > 0:
+        tasks.append(asyncio.create_task(_run_periodically(
+            settings.change_feed_purge_interval, _purge_change_events, "Purging old change events",
+        )))
+    if settings.order_intake_enabled:
+        order_intake.start(SessionLocal)
+    change_feed.configure(SessionLocal)
+    yield
+    for task in tasks:
+        task.cancel()
+    await change_feed.stop()
+    # Orders already queued are still created before shutdown completes
+    await run_in_threadpool(order_intake.stop)
+
+
 app = FastAPI(
     title="Inventory & Order Management Service",
     description="A backend service for managing products and orders",
@@ -14,6 +97,7 @@ app = FastAPI(
     docs_url="/api/v1/docs",
     redoc_url="/api/v1/redoc",
     openapi_url="/api/v1/openapi.json",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -23,12 +107,35 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Idempotent-Replayed", "ETag"],
 )
 
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+    )
+
+# Request latency and SQL metrics; added last so it is the outermost middleware
+if settings.metrics_enabled:
+    install_sql_hooks()
+    app.add_middleware(MetricsMiddleware)
+
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
 
+@app.exception_handler(StaleDataError)
+def stale_data_handler(request: Request, exc: StaleDataError):
+    """An ORM flush found a versioned row changed by a concurrent writer"""
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={"detail": "The resource was modified concurrently; reload it and retry"},
+    )
+
+
 @app.get("/")
 def root():
     return {"message": "Inventory & Order Management Service API"}
@@ -37,3 +144,50 @@ def root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+def _pools():
+    """Connection pools of this worker's engines, by name"""
+    pools = {"sync": engine.pool}
+    if AsyncSessionLocal is not None:
+        pools["async"] = AsyncSessionLocal.kw["bind"].sync_engine.pool
+    return pools
+
+
+@app.get("/health/db")
+def db_health():
+    """Database connectivity and connection pool statistics (per worker process)"""
+    pools = {name: pool_stats(pool) for name, pool in _pools().items()}
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except SQLAlchemyError as e:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "unavailable", "error": str(e.__class__.__name__), "pools": pools},
+        )
+    return {"status": "healthy", "pools": pools}
+
+
+@app.get("/health/cache")
+def cache_stats():
+    """Product cache hit/miss counters"""
+    return product_cache.stats()
+
+
+@app.get("/health/order-intake")
+def order_intake_stats():
+    """Order intake queue state and batch counters for this worker"""
+    return order_intake.stats()
+
+
+@app.get("/health/change-feed")
+def change_feed_stats():
+    """Change feed poller state and open streams for this worker"""
+    return change_feed.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    """Prometheus metrics for this worker process"""
+    return PlainTextResponse(render_metrics(_pools()), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,226 @@
+"""
+In-process Prometheus metrics: per-route request latency, SQL statements and
+SQL time per request, in-flight requests, plus pool and cache gauges read at
+scrape time. Rendered in the Prometheus text format at /metrics.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.cache import product_cache
+from app.pool_metrics import pool_stats
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Label value for requests that matched no route (keeps label cardinality bounded)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in values)
+    return "{" + ",".join(f'{n}="{v}"' for n, v in zip(names, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # Unlabelled metrics are exported from the start, even before the first inc()
+        self._values: Dict[Tuple[str, ...], float] = {} if self.labelnames else {(): 0}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    def dec(self, labels: Tuple[str, ...] = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (last is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._series.items())
+        names = self.labelnames + ("le",)
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(float(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(names, labels + (le,))} {cumulative}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_str} {cumulative}")
+        return lines
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.",
+    ("method", "route", "status"), LATENCY_BUCKETS,
+)
+REQUEST_SQL_STATEMENTS = Histogram(
+    "http_request_sql_statements", "SQL statements executed per HTTP request.",
+    ("method", "route"), STATEMENT_COUNT_BUCKETS,
+)
+REQUEST_SQL_DURATION = Histogram(
+    "http_request_sql_duration_seconds", "Time spent executing SQL per HTTP request.",
+    ("method", "route"), LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served.")
+SQL_STATEMENTS = Counter("db_statements_total", "SQL statements executed (inside and outside requests).")
+
+
+class RequestStats:
+    __slots__ = ("statements", "sql_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.sql_seconds = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    SQL_STATEMENTS.inc()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.sql_seconds += elapsed
+
+
+def install_sql_hooks() -> None:
+    """Count and time SQL statements on every engine (sync and the async engines' sync core)."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no per-request task or body buffering) recording
+    latency and SQL usage per route template, e.g. /api/v1/orders/{order_id}.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUESTS_IN_FLIGHT.dec()
+            _request_stats.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+            REQUEST_LATENCY.observe((method, path, str(status_code)), elapsed)
+            REQUEST_SQL_STATEMENTS.observe((method, path), stats.statements)
+            REQUEST_SQL_DURATION.observe((method, path), stats.sql_seconds)
+
+
+def _scrape_gauges(pools: Dict[str, object]) -> List[str]:
+    """Pool and cache values read at scrape time."""
+    lines = []
+    pool_series = [
+        ("db_pool_checked_out", "gauge", "Connections currently checked out.", "checked_out"),
+        ("db_pool_overflow_in_use", "gauge", "Overflow connections currently open.", "overflow_in_use"),
+        ("db_pool_checkouts_total", "counter", "Connection checkouts.", "checkouts"),
+        ("db_pool_checkout_timeouts_total", "counter", "Checkouts that timed out.", "checkout_timeouts"),
+        ("db_pool_connections_opened_total", "counter", "DBAPI connections opened.", "connections_opened"),
+        ("db_pool_connections_closed_total", "counter", "DBAPI connections closed.", "connections_closed"),
+    ]
+    stats = {name: pool_stats(pool) for name, pool in pools.items()}
+    for metric, kind, documentation, key in pool_series:
+        values = [(name, s[key]) for name, s in stats.items() if key in s]
+        if values:
+            lines += [f"# HELP {metric} {documentation}", f"# TYPE {metric} {kind}"]
+            lines += [f'{metric}{{engine="{name}"}} {value}' for name, value in values]
+    cache = product_cache.stats()
+    lines += [
+        "# HELP product_cache_hits_total Product cache hits.",
+        "# TYPE product_cache_hits_total counter",
+        f"product_cache_hits_total {cache['hits']}",
+        "# HELP product_cache_misses_total Product cache misses.",
+        "# TYPE product_cache_misses_total counter",
+        f"product_cache_misses_total {cache['misses']}",
+    ]
+    return lines
+
+
+def render_metrics(pools: Dict[str, object]) -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines: List[str] = []
+    for metric in (REQUEST_LATENCY, REQUEST_SQL_STATEMENTS, REQUEST_SQL_DURATION, REQUESTS_IN_FLIGHT, SQL_STATEMENTS):
+        lines += metric.render()
+    lines += _scrape_gauges(pools)
+    return "\n".join(lines) + "\n"
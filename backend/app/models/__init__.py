@@ -1,5 +1,21 @@
 from app.models.product import Product
 from app.models.order import Order
 from app.models.order_item import OrderItem
+from app.models.counter import TableCounter
+from app.models.idempotency_key import IdempotencyKey
+from app.models.rollup import DailyProductSales, DailyOrderStatusCount
+from app.models.reservation import Reservation, ReservationItem
+from app.models.change_event import ChangeEvent
 
-__all__ = ["Product", "Order", "OrderItem"]
+__all__ = [
+    "Product",
+    "Order",
+    "OrderItem",
+    "TableCounter",
+    "IdempotencyKey",
+    "DailyProductSales",
+    "DailyOrderStatusCount",
+    "Reservation",
+    "ReservationItem",
+    "ChangeEvent",
+]
@@ -0,0 +1,21 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String, Text
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class ChangeEvent(Base):
+    """
+    Transactional outbox row: one stock, price or status change, written in the
+    same transaction as the change itself. The ID is the feed offset clients
+    resume from (SSE Last-Event-ID).
+    """
+    __tablename__ = "change_events"
+
+    # BIGINT on PostgreSQL; SQLite only autoincrements INTEGER PRIMARY KEY
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # e.g. "product.updated", "order.status_changed"
+    type = Column(String(50), nullable=False)
+    entity_id = Column(Integer, nullable=True)
+    # Pre-encoded JSON payload, sent to subscribers as is
+    data = Column(Text, nullable=False)
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, String, BigInteger
+from app.database import Base
+
+
+class TableCounter(Base):
+    """Row counts maintained transactionally by the services (e.g. live products)."""
+    __tablename__ = "table_counters"
+
+    name = Column(String, primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class IdempotencyKey(Base):
+    """Stored response of an order request made with an Idempotency-Key header."""
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(255), primary_key=True)
+    # SHA-256 of the canonical request body; a reused key with another body is rejected
+    request_hash = Column(String(64), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=True)
+    status_code = Column(Integer, nullable=False)
+    response_body = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, DateTime, Index, Enum as SQLEnum
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -21,6 +21,17 @@ class Order(Base):
         nullable=False,
         default=OrderStatus.PENDING,
     )
+    # Bumped on every update, including item additions (ETags)
+    version = Column(Integer, nullable=False, default=1, server_default='1')
 
     # Relationships
     order_items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
+
+    # Fetch the server-side created_at on flush (RETURNING) so rollups can use it before commit
+    __mapper_args__ = {"eager_defaults": True, "version_id_col": version}
+
+    # Match list_orders' ORDER BY created_at DESC, id DESC (with and without a status filter)
+    __table_args__ = (
+        Index('ix_orders_status_created_at_id', status, created_at.desc(), id.desc()),
+        Index('ix_orders_created_at_id', created_at.desc(), id.desc()),
+    )
@@ -18,5 +18,6 @@ class OrderItem(Base):
 
     __table_args__ = (
         Index('ix_order_items_order_id', 'order_id'),
-        Index('ix_order_items_product_id', 'product_id'),
+        # Product filter on order listing: EXISTS probe by (product_id, order_id)
+        Index('ix_order_items_product_id_order_id', 'product_id', 'order_id'),
     )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Numeric, CheckConstraint, DateTime
+from sqlalchemy import Column, Integer, String, Numeric, CheckConstraint, DateTime, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -10,11 +10,21 @@ class Product(Base):
     name = Column(String, nullable=False, index=True)
     price = Column(Numeric(10, 2), nullable=False)
     stock_quantity = Column(Integer, nullable=False, default=0)
-    deleted_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
+    # Bumped on every update (ETags); the ORM checks and increments it, core UPDATEs set version + 1
+    version = Column(Integer, nullable=False, default=1, server_default='1')
 
     # Relationships
     order_items = relationship("OrderItem", back_populates="product")
 
+    __mapper_args__ = {"version_id_col": version}
+
     __table_args__ = (
         CheckConstraint('stock_quantity >= 0', name='check_stock_quantity_non_negative'),
+        # Live products by ID (list_products and every deleted_at IS NULL lookup);
+        # deleted rows are left out of the index
+        Index(
+            'ix_products_live_id', id,
+            postgresql_where=deleted_at.is_(None), sqlite_where=deleted_at.is_(None),
+        ),
     )
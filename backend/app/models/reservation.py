@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, Numeric, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class Reservation(Base):
+    """
+    Active stock hold. Holding takes the stock from products.stock_quantity
+    right away; confirming turns the hold into an order, releasing or expiring
+    puts the stock back. Rows only exist while the hold is active.
+    """
+    __tablename__ = "reservations"
+
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    items = relationship("ReservationItem", back_populates="reservation", cascade="all, delete-orphan")
+
+
+class ReservationItem(Base):
+    __tablename__ = "reservation_items"
+
+    id = Column(Integer, primary_key=True)
+    reservation_id = Column(Integer, ForeignKey("reservations.id", ondelete="CASCADE"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="RESTRICT"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    # Price when the stock was held; the confirmed order is charged this price
+    price_at_time = Column(Numeric(10, 2), nullable=False)
+
+    reservation = relationship("Reservation", back_populates="items")
+
+    __table_args__ = (
+        Index('ix_reservation_items_reservation_id', 'reservation_id'),
+        Index('ix_reservation_items_product_id', 'product_id'),
+    )
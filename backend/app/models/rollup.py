@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, SmallInteger, BigInteger, Date, Numeric, ForeignKey, Enum as SQLEnum
+from app.database import Base
+from app.models.order import OrderStatus
+
+# Each day/status count is spread over this many rows (shard = order_id % shards)
+# so concurrent order transactions do not all queue on the same row lock
+ORDER_STATUS_SHARDS = 8
+
+
+class DailyProductSales(Base):
+    """Units and revenue per product and order day (cancelled orders excluded)."""
+    __tablename__ = "daily_product_sales"
+
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="RESTRICT"), primary_key=True, index=True)
+    units_sold = Column(BigInteger, nullable=False, default=0)
+    revenue = Column(Numeric(14, 2), nullable=False, default=0)
+
+
+class DailyOrderStatusCount(Base):
+    """Number of orders per order day and current status, in ORDER_STATUS_SHARDS rows."""
+    __tablename__ = "daily_order_status_counts"
+
+    day = Column(Date, primary_key=True)
+    status = Column(
+        SQLEnum(OrderStatus, values_callable=lambda x: [e.value for e in x]),
+        primary_key=True,
+    )
+    shard = Column(SmallInteger, primary_key=True)
+    order_count = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,190 @@
+"""
+Opt-in group commit for POST /orders/.
+
+Requests are handed to one worker thread, which collects those arriving within
+a short window (up to a maximum batch size) and creates them together with
+OrderService.create_orders_batch: one transaction, one commit, and one lock on
+the union of their products, with stock reduced in arrival order. Each request
+waits on its own future for its new order ID or its error, for at most timeout
+seconds.
+"""
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.exceptions import OrderIntakeUnavailableError
+from app.schemas.order import OrderCreate
+from app.services.order_service import OrderService
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class OrderIntakeQueue:
+    """Micro-batching queue in front of OrderService.create_orders_batch."""
+
+    def __init__(self, window_ms: float = 5.0, max_batch_size: int = 200, timeout: float = 30.0):
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._session_factory: Optional[Callable[[], Session]] = None
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._orders = 0
+        self._largest_batch = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, session_factory: Callable[[], Session]) -> None:
+        """Start the worker thread; batches use sessions from session_factory."""
+        if self._thread is not None:
+            return
+        self._session_factory = session_factory
+        self._thread = threading.Thread(target=self._run, name="order-intake", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 10.0) -> None:
+        """Create the orders already queued, then stop the worker."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is not None:
+                self._queue.put(_STOP)
+        if thread is not None:
+            thread.join(timeout)
+
+    def submit(self, order_data: OrderCreate) -> Future:
+        """
+        Queue an order. The future resolves to the new order ID or raises its
+        InsufficientStockError / ProductNotFoundError (or the batch's failure).
+        Raises OrderIntakeUnavailableError if the queue is stopped.
+        """
+        future: Future = Future()
+        # Under the lock, so an order is never queued behind stop()'s sentinel
+        with self._lock:
+            if self._thread is None:
+                raise OrderIntakeUnavailableError("Order intake queue is not running")
+            self._queue.put((order_data, future))
+        return future
+
+    def create(self, order_data: OrderCreate) -> int:
+        """
+        Queue an order and wait for its ID (sync routes); see submit(). The
+        timeout only applies while the order is queued: an order whose batch
+        has started may still commit, so its outcome is awaited instead.
+        """
+        future = self.submit(order_data)
+        try:
+            return future.result(self.timeout)
+        except FutureTimeoutError:
+            if future.cancel():  # still queued: it will not be created
+                raise self._timed_out()
+        return future.result()
+
+    async def create_async(self, order_data: OrderCreate) -> int:
+        """Queue an order and await its ID without holding a thread (async routes); see create()."""
+        future = self.submit(order_data)
+        try:
+            # shield: a timeout must not cancel an order whose batch has started
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self.timeout)
+        except asyncio.TimeoutError:
+            if future.cancel():
+                raise self._timed_out()
+        return await asyncio.wrap_future(future)
+
+    def _timed_out(self) -> OrderIntakeUnavailableError:
+        return OrderIntakeUnavailableError(f"Order intake queue did not start the order within {self.timeout}s")
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "running": self.running,
+                "window_ms": self.window_ms,
+                "max_batch_size": self.max_batch_size,
+                "batches": self._batches,
+                "orders": self._orders,
+                "largest_batch": self._largest_batch,
+                "queued": self._queue.qsize(),
+            }
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch, stopping = self._collect(first)
+            self._create(batch)
+            if stopping:
+                break
+        self._fail_queued()
+
+    def _fail_queued(self) -> None:
+        """Fail any requests still queued behind the stop sentinel, so no caller waits forever."""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP and item[1].set_running_or_notify_cancel():
+                item[1].set_exception(OrderIntakeUnavailableError("Order intake queue is not running"))
+
+    def _collect(self, first) -> Tuple[List[Tuple[OrderCreate, Future]], bool]:
+        """The first request plus those arriving within the window (up to the maximum)."""
+        batch = [first]
+        deadline = time.monotonic() + self.window_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _create(self, batch: List[Tuple[OrderCreate, Future]]) -> None:
+        # Drop requests whose caller gave up (timed out) while they were queued
+        batch = [(order_data, future) for order_data, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        db = None
+        try:
+            db = self._session_factory()
+            outcomes = OrderService.create_orders_batch(db, [order_data for order_data, _ in batch])
+        except Exception as e:
+            logger.exception("Creating a batch of %d orders failed", len(batch))
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        finally:
+            if db is not None:
+                db.close()
+        with self._lock:
+            self._batches += 1
+            self._orders += len(batch)
+            self._largest_batch = max(self._largest_batch, len(batch))
+        for outcome, (_, future) in zip(outcomes, batch):
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+
+# Started by the app lifespan when ORDER_INTAKE_ENABLED is set
+order_intake = OrderIntakeQueue(
+    window_ms=settings.order_intake_window_ms,
+    max_batch_size=settings.order_intake_max_batch_size,
+    timeout=settings.order_intake_timeout,
+)
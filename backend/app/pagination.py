@@ -0,0 +1,38 @@
+"""Opaque cursor tokens for keyset pagination"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last row of a page as an opaque token."""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, *types: type) -> List[Any]:
+    """
+    Decode a token produced by encode_cursor, converting each value to the
+    matching type (int or datetime). Raises ValueError for malformed tokens.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid pagination cursor")
+    if not isinstance(payload, list) or len(payload) != len(types):
+        raise ValueError("Invalid pagination cursor")
+    values = []
+    for value, type_ in zip(payload, types):
+        try:
+            if type_ is datetime:
+                values.append(datetime.fromisoformat(value))
+            elif type_ is int and isinstance(value, int) and not isinstance(value, bool):
+                values.append(value)
+            else:
+                raise TypeError
+        except (ValueError, TypeError):
+            raise ValueError("Invalid pagination cursor")
+    return values
@@ -0,0 +1,130 @@
+"""Connection pool instrumentation (checkout wait times, connection churn)"""
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Recent checkout waits kept for percentiles
+WAIT_SAMPLE_SIZE = 2048
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile (q in 0..100) of an already sorted sequence."""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(q / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class PoolMetrics:
+    """Counters and recent checkout wait times for one pool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+        self._waits: deque = deque(maxlen=WAIT_SAMPLE_SIZE)
+        self._lock = threading.Lock()
+
+    # Pool events fire on many threads at once, so every counter changes under the lock
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self._waits.append(seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def record_close(self) -> None:
+        with self._lock:
+            self.closes += 1
+
+    def record_invalidation(self) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def wait_times(self) -> list:
+        with self._lock:
+            return sorted(self._waits)
+
+
+def pool_stats(pool) -> Dict[str, Any]:
+    """Stats of an instrumented pool, or SQLAlchemy's status line for other pools."""
+    if isinstance(pool, _InstrumentedPoolMixin):
+        return pool.stats()
+    return {"status": pool.status()}
+
+
+class _InstrumentedPoolMixin:
+    """Times each checkout and counts connections opened, closed and invalidated."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+        event.listen(self, "connect", self._on_connect)
+        event.listen(self, "close", self._on_close)
+        event.listen(self, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        self.metrics.record_connect()
+
+    def _on_close(self, dbapi_connection, connection_record):
+        self.metrics.record_close()
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        self.metrics.record_invalidation()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_timeout()
+            raise
+        finally:
+            self.metrics.record_wait(time.perf_counter() - start)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool occupancy, checkout wait percentiles (ms) and connection churn."""
+        waits = self.metrics.wait_times()
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow_in_use": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.metrics.checkouts,
+            "checkout_timeouts": self.metrics.timeouts,
+            "checkout_wait_ms": {
+                name: round(value * 1000, 3) if value is not None else None
+                for name, value in (
+                    ("p50", percentile(waits, 50)),
+                    ("p95", percentile(waits, 95)),
+                    ("p99", percentile(waits, 99)),
+                    ("max", waits[-1] if waits else None),
+                )
+            },
+            "connections_opened": self.metrics.connects,
+            "connections_closed": self.metrics.closes,
+            "connections_invalidated": self.metrics.invalidations,
+        }
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
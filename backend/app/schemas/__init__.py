@@ -1,5 +1,14 @@
 from app.schemas.product import ProductCreate, ProductResponse
-from app.schemas.order import OrderCreate, OrderItemCreate, OrderResponse, OrderItemResponse, OrderStatusUpdate
+from app.schemas.order import (
+    OrderCreate,
+    OrderItemCreate,
+    OrderResponse,
+    OrderItemResponse,
+    OrderStatusUpdate,
+    OrderBatchCreate,
+    OrderBatchResult,
+    OrderBatchResponse,
+)
 from app.schemas.order_item import OrderItemBase
 
 __all__ = [
@@ -10,5 +19,8 @@ __all__ = [
     "OrderResponse",
     "OrderItemResponse",
     "OrderStatusUpdate",
+    "OrderBatchCreate",
+    "OrderBatchResult",
+    "OrderBatchResponse",
     "OrderItemBase",
 ]
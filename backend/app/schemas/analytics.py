@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from datetime import date
+from decimal import Decimal
+from app.models.order import OrderStatus
+
+
+class DailyRevenue(BaseModel):
+    day: date
+    units_sold: int
+    revenue: Decimal
+
+
+class ProductSales(BaseModel):
+    product_id: int
+    product_name: str
+    units_sold: int
+    revenue: Decimal
+
+
+class DailyStatusCount(BaseModel):
+    day: date
+    status: OrderStatus
+    order_count: int
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Optional
 from app.schemas.order_item import OrderItemBase, OrderItemResponse
 from app.models.order import OrderStatus
 
@@ -35,11 +35,71 @@ class OrderStatusUpdate(BaseModel):
         raise ValueError(f"status must be one of: {list(_STATUS_MAP.keys())}")
 
 
+class OrderStatusBulkUpdate(OrderStatusUpdate):
+    order_ids: List[int] = Field(..., min_length=1, max_length=10000)
+
+
+class OrderStatusChange(BaseModel):
+    id: int
+    status: OrderStatus
+    version: int
+
+
+class OrderStatusSkip(BaseModel):
+    id: int
+    # "not_found", "cancelled", "unchanged" or "invalid_transition"
+    reason: str
+
+
+class OrderStatusBulkResponse(BaseModel):
+    updated: List[OrderStatusChange]
+    skipped: List[OrderStatusSkip]
+
+
 class OrderResponse(BaseModel):
     id: int
     created_at: datetime
     status: OrderStatus
+    version: int
     order_items: List[OrderItemResponse]
 
     class Config:
         from_attributes = True
+
+    @classmethod
+    def from_order(cls, order, product_names: Dict[int, str]) -> "OrderResponse":
+        """Format an order with loaded items, using pre-fetched product names."""
+        return cls(
+            id=order.id,
+            created_at=order.created_at,
+            status=order.status,
+            version=order.version,
+            order_items=[
+                OrderItemResponse(
+                    id=item.id,
+                    product_id=item.product_id,
+                    quantity_ordered=item.quantity_ordered,
+                    price_at_time=item.price_at_time,
+                    product_name=product_names.get(item.product_id),
+                )
+                for item in order.order_items
+            ],
+        )
+
+
+class OrderBatchCreate(BaseModel):
+    orders: List[OrderCreate] = Field(..., min_length=1, max_length=1000)
+
+
+class OrderBatchResult(BaseModel):
+    index: int
+    success: bool
+    status_code: int
+    order: Optional[OrderResponse] = None
+    error: Optional[str] = None
+
+
+class OrderBatchResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[OrderBatchResult]
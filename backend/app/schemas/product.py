@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator, model_validator
 from decimal import Decimal
-from typing import Optional
+from typing import List, Optional
 
 
 class ProductCreate(BaseModel):
@@ -13,6 +13,43 @@ class ProductUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=255)
     price: Optional[Decimal] = Field(None, gt=0)
     stock_quantity: Optional[int] = Field(None, ge=0)
+    # Expected current version; the update is rejected with 409 if the product has changed
+    version: Optional[int] = Field(None, ge=1)
+
+
+class ProductBulkUpdateItem(ProductUpdate):
+    id: int
+    # Relative stock change instead of an absolute stock_quantity
+    stock_delta: Optional[int] = None
+
+    @model_validator(mode="after")
+    def one_stock_field(self) -> "ProductBulkUpdateItem":
+        if self.stock_quantity is not None and self.stock_delta is not None:
+            raise ValueError("set stock_quantity or stock_delta, not both")
+        return self
+
+
+class ProductBulkUpdate(BaseModel):
+    items: List[ProductBulkUpdateItem] = Field(..., min_length=1, max_length=10000)
+
+    @field_validator("items")
+    @classmethod
+    def unique_ids(cls, v: List[ProductBulkUpdateItem]) -> List[ProductBulkUpdateItem]:
+        if len({item.id for item in v}) != len(v):
+            raise ValueError("each product ID may appear only once")
+        return v
+
+
+class StockAdjustment(BaseModel):
+    # Units to add (restock) or remove; stock never goes below zero
+    delta: int = Field(..., description="Non-zero change to stock_quantity")
+
+    @field_validator("delta")
+    @classmethod
+    def delta_not_zero(cls, v: int) -> int:
+        if v == 0:
+            raise ValueError("delta must not be zero")
+        return v
 
 
 class ProductResponse(BaseModel):
@@ -20,13 +57,56 @@ class ProductResponse(BaseModel):
     name: str
     price: Decimal
     stock_quantity: int
+    version: int
 
     class Config:
         from_attributes = True
 
 
+class ProductBulkUpdateResult(BaseModel):
+    id: int
+    # "updated", "not_found", "version_conflict" or "insufficient_stock"
+    outcome: str
+    product: Optional[ProductResponse] = None
+
+
+class ProductBulkUpdateResponse(BaseModel):
+    updated: int
+    skipped: int
+    results: List[ProductBulkUpdateResult]
+
+
 class ProductListResponse(BaseModel):
     items: list[ProductResponse]
-    total: int
+    total: Optional[int]
+    skip: int
+    limit: int
+    next_cursor: Optional[str] = None
+
+
+class ProductSearchResult(ProductResponse):
+    # Trigram similarity of the name to the query (0..1)
+    score: float
+
+
+class ProductSearchResponse(BaseModel):
+    items: List[ProductSearchResult]
+    query: str
     skip: int
     limit: int
+
+
+class ProductImportError(BaseModel):
+    row: int
+    errors: List[str]
+
+
+class ProductImportResponse(BaseModel):
+    received: int
+    inserted: int
+    updated: int
+    # With upsert_by_name: rows superseded by a later row with the same name
+    skipped: int
+    failed: int
+    errors: List[ProductImportError]
+    errors_truncated: bool
@@ -0,0 +1,30 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
+from app.schemas.order import OrderItemCreate
+
+
+class ReservationCreate(BaseModel):
+    items: List[OrderItemCreate] = Field(..., min_length=1)
+    # How long to hold the stock; defaults to RESERVATION_TTL, at most RESERVATION_MAX_TTL
+    ttl_seconds: Optional[int] = Field(None, ge=1)
+
+
+class ReservationItemResponse(BaseModel):
+    product_id: int
+    quantity: int
+    price_at_time: Decimal
+
+    class Config:
+        from_attributes = True
+
+
+class ReservationResponse(BaseModel):
+    id: int
+    created_at: datetime
+    expires_at: datetime
+    items: List[ReservationItemResponse]
+
+    class Config:
+        from_attributes = True
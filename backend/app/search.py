@@ -0,0 +1,159 @@
+"""In-memory trigram index for product name search on databases without pg_trgm"""
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.config import settings
+
+# Same default as pg_trgm.similarity_threshold
+SIMILARITY_THRESHOLD = 0.3
+
+# Match ranks: a name starting with the query, containing it, or only similar to it
+RANK_PREFIX = 0
+RANK_SUBSTRING = 1
+RANK_SIMILAR = 2
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Trigrams of text as pg_trgm extracts them: lowercased alphanumeric words,
+    each padded with two spaces in front and one behind.
+    """
+    grams = set()
+    for word in _WORD.findall(text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _inner_trigrams(query: str) -> Set[str]:
+    """Trigrams every name containing query must have (those within its words)."""
+    return {
+        word[i:i + 3]
+        for word in _WORD.findall(query)
+        for i in range(len(word) - 2)
+    }
+
+
+class TrigramIndex:
+    """
+    Thread-safe inverted index from name trigrams to product IDs.
+    Loaded lazily from the database on first search and kept up to date by
+    ProductService writes in this process. Writes made by other processes
+    (other uvicorn workers) do not reach it, so it is reloaded once it is
+    max_age seconds old: their renames and deletes show up within that time.
+    """
+
+    def __init__(self, max_age: Optional[float] = None):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._names: Dict[int, str] = {}
+        self._grams: Dict[int, Set[str]] = {}
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._loaded_at: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the index is loaded and younger than max_age (else the next search reloads it)."""
+        loaded_at = self._loaded_at
+        if loaded_at is None:
+            return False
+        return self.max_age is None or time.monotonic() - loaded_at < self.max_age
+
+    def load(self, products: Iterable[Tuple[int, str]]) -> None:
+        """Replace the contents with (id, name) pairs of the live products."""
+        with self._lock:
+            self._clear()
+            for product_id, name in products:
+                self._add(product_id, name)
+            self._loaded_at = time.monotonic()
+
+    def add(self, product_id: int, name: str) -> None:
+        """Index a new or renamed product (no-op until loaded)."""
+        with self._lock:
+            if self._loaded_at is not None:
+                self._remove(product_id)
+                self._add(product_id, name)
+
+    def remove(self, product_ids: Iterable[int]) -> None:
+        """Drop deleted products."""
+        with self._lock:
+            for product_id in product_ids:
+                self._remove(product_id)
+
+    def invalidate(self) -> None:
+        """Reload from the database on the next search (after bulk writes)."""
+        with self._lock:
+            self._clear()
+            self._loaded_at = None
+
+    clear = invalidate
+
+    def search(self, query: str, limit: int) -> List[Tuple[int, int, float]]:
+        """
+        Up to limit (product_id, rank, similarity) matches, best first: prefix
+        matches, then substring matches, then names whose trigram similarity
+        reaches SIMILARITY_THRESHOLD; ties by similarity, name and ID.
+        """
+        query = query.lower().strip()
+        query_grams = trigrams(query)
+        with self._lock:
+            if len(query) < 3:
+                # Too short for inner trigrams: candidates are names with a word starting with query
+                candidates = set(self._postings.get(f"  {query}"[-3:], ()))
+            else:
+                inner = sorted((self._postings.get(g, set()) for g in _inner_trigrams(query)), key=len)
+                candidates = set.intersection(*inner) if inner else set()
+            # Similar names: count shared trigrams over the query's posting lists
+            shared = Counter()
+            for gram in query_grams:
+                shared.update(self._postings.get(gram, ()))
+
+            matches = []
+            for product_id in candidates | shared.keys():
+                name = self._names[product_id]
+                common = shared.get(product_id, 0)
+                union = len(query_grams) + len(self._grams[product_id]) - common
+                similarity = common / union if union else 0.0
+                if name.startswith(query):
+                    rank = RANK_PREFIX
+                elif query in name:
+                    rank = RANK_SUBSTRING
+                elif similarity >= SIMILARITY_THRESHOLD:
+                    rank = RANK_SIMILAR
+                else:
+                    continue
+                matches.append((rank, -similarity, name, product_id))
+        matches.sort()
+        return [(product_id, rank, -score) for rank, score, _, product_id in matches[:limit]]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def _add(self, product_id: int, name: str) -> None:
+        grams = trigrams(name)
+        self._names[product_id] = name.lower()
+        self._grams[product_id] = grams
+        for gram in grams:
+            self._postings[gram].add(product_id)
+
+    def _remove(self, product_id: int) -> None:
+        self._names.pop(product_id, None)
+        for gram in self._grams.pop(product_id, ()):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(product_id)
+                if not posting:
+                    del self._postings[gram]
+
+    def _clear(self) -> None:
+        self._names.clear()
+        self._grams.clear()
+        self._postings.clear()
+
+
+product_search_index = TrigramIndex(max_age=settings.search_index_max_age)
@@ -0,0 +1,84 @@
+"""
+Fast JSON path for order and product responses.
+
+Routes that return many objects build plain dicts straight from ORM objects (or
+cached ProductResponse models) in one pass and return them as a
+FastJSONResponse, skipping FastAPI's response_model validation and stdlib json
+encoding. The bytes are the same as the regular path: Decimal as its str(),
+datetimes in ISO 8601 with UTC as "Z", enums as their values.
+"""
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Optional
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        text = value.isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Compact UTF-8 JSON, as FastAPI's JSONResponse would render the validated model."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+    return json.dumps(content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with orjson (stdlib json if orjson is not installed)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_response(content: Any, response: Optional[Response] = None, status_code: int = 200) -> FastJSONResponse:
+    """
+    FastJSONResponse carrying the headers already set on the route's injected
+    Response (returning a Response directly would drop them).
+    """
+    headers = dict(response.headers) if response is not None else None
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
+
+
+def product_payload(product) -> Dict[str, Any]:
+    """ProductResponse fields of a Product or a cached ProductResponse."""
+    return {
+        "id": product.id,
+        "name": product.name,
+        "price": product.price,
+        "stock_quantity": product.stock_quantity,
+        "version": product.version,
+    }
+
+
+def order_payload(order, product_names: Dict[int, str]) -> Dict[str, Any]:
+    """OrderResponse fields of an order with loaded items, using pre-fetched product names."""
+    return {
+        "id": order.id,
+        "created_at": order.created_at,
+        "status": order.status,
+        "version": order.version,
+        "order_items": [
+            {
+                "id": item.id,
+                "product_id": item.product_id,
+                "quantity_ordered": item.quantity_ordered,
+                "price_at_time": item.price_at_time,
+                "product_name": product_names.get(item.product_id),
+            }
+            for item in order.order_items
+        ],
+    }
+
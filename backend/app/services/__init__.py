@@ -1,4 +1,19 @@
 from app.services.product_service import ProductService
 from app.services.order_service import OrderService
+from app.services.async_product_service import AsyncProductService
+from app.services.async_order_service import AsyncOrderService
+from app.services.idempotency_service import IdempotencyService
+from app.services.async_idempotency_service import AsyncIdempotencyService
+from app.services.rollup_service import RollupService
+from app.services.reservation_service import ReservationService
 
-__all__ = ["ProductService", "OrderService"]
+__all__ = [
+    "ProductService",
+    "OrderService",
+    "AsyncProductService",
+    "AsyncOrderService",
+    "IdempotencyService",
+    "AsyncIdempotencyService",
+    "RollupService",
+    "ReservationService",
+]
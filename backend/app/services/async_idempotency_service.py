@@ -0,0 +1,13 @@
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.idempotency_key import IdempotencyKey
+from app.services.idempotency_service import IdempotencyService
+
+
+class AsyncIdempotencyService:
+    """Async counterpart of IdempotencyService (run on the underlying Session via run_sync)."""
+
+    @staticmethod
+    async def lookup(db: AsyncSession, key: str, request_hash: str) -> Optional[IdempotencyKey]:
+        """The unexpired stored response for key, or None."""
+        return await db.run_sync(IdempotencyService.lookup, key, request_hash)
@@ -0,0 +1,60 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import List, Optional, Set, Tuple
+from app.models.order import Order, OrderStatus
+from app.schemas.order import OrderCreate, OrderItemCreate
+from app.services.order_service import OrderService
+
+
+class AsyncOrderService:
+    """
+    Async counterpart of OrderService.
+    Transactions, row locks and stock checks are the sync implementation run
+    on the AsyncSession's underlying Session via run_sync.
+    """
+
+    @staticmethod
+    async def create_order(
+        db: AsyncSession,
+        order_data: OrderCreate,
+        idempotency_key: Optional[str] = None,
+        request_hash: Optional[str] = None,
+    ) -> Order:
+        """Create an order with transactional stock reduction."""
+        return await db.run_sync(OrderService.create_order, order_data, idempotency_key, request_hash)
+
+    @staticmethod
+    async def get_order(db: AsyncSession, order_id: int) -> Order | None:
+        """Get an order by ID with eager loading of order items"""
+        return await db.run_sync(OrderService.get_order, order_id)
+
+    @staticmethod
+    async def get_order_version(db: AsyncSession, order_id: int) -> Optional[Tuple[int, Set[int]]]:
+        """Current version of an order and the IDs of its products (for ETag checks), or None."""
+        return await db.run_sync(OrderService.get_order_version, order_id)
+
+    @staticmethod
+    async def list_orders(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Tuple[datetime, int]] = None,
+        status: Optional[OrderStatus] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        product_id: Optional[int] = None,
+    ) -> List[Order]:
+        """List orders newest first with offset or keyset pagination, optionally filtered"""
+        return await db.run_sync(
+            OrderService.list_orders, skip, limit, after, status, created_from, created_to, product_id
+        )
+
+    @staticmethod
+    async def update_order_status(db: AsyncSession, order_id: int, new_status: OrderStatus) -> Order:
+        """Update order status with validation"""
+        return await db.run_sync(OrderService.update_order_status, order_id, new_status)
+
+    @staticmethod
+    async def add_items_to_order(db: AsyncSession, order_id: int, items: List[OrderItemCreate]) -> Order:
+        """Add line items to an existing Pending order. Validates stock and reduces it."""
+        return await db.run_sync(OrderService.add_items_to_order, order_id, items)
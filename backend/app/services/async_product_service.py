@@ -0,0 +1,73 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.models.product import Product
+from app.schemas.product import ProductCreate, ProductResponse, ProductUpdate
+from app.services.product_service import ProductService
+
+
+class AsyncProductService:
+    """
+    Async counterpart of ProductService.
+    Each method runs the sync implementation on the AsyncSession's underlying
+    Session via run_sync: I/O goes through the async driver without blocking
+    the event loop, and the business rules live only in ProductService.
+    """
+
+    @staticmethod
+    async def create_product(db: AsyncSession, product_data: ProductCreate) -> Product:
+        """Create a new product"""
+        return await db.run_sync(ProductService.create_product, product_data)
+
+    @staticmethod
+    async def list_products(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[int] = None,
+        include_total: bool = True,
+        exact_total: bool = False,
+    ) -> Tuple[List[Product], Optional[int]]:
+        """List products by ID with offset or keyset pagination (excludes soft-deleted)."""
+        return await db.run_sync(ProductService.list_products, skip, limit, after_id, include_total, exact_total)
+
+    @staticmethod
+    async def get_product(db: AsyncSession, product_id: int) -> Product | None:
+        """Get a product by ID (excludes soft-deleted)."""
+        return await db.run_sync(ProductService.get_product, product_id)
+
+    @staticmethod
+    async def get_product_version(db: AsyncSession, product_id: int) -> Optional[int]:
+        """Current version of a live product (for ETag checks), or None if missing."""
+        return await db.run_sync(ProductService.get_product_version, product_id)
+
+    @staticmethod
+    async def get_product_cached(db: AsyncSession, product_id: int) -> ProductResponse | None:
+        """Get a product by ID (excludes soft-deleted), read through the product cache."""
+        return await db.run_sync(ProductService.get_product_cached, product_id)
+
+    @staticmethod
+    async def get_product_names(db: AsyncSession, product_ids: Iterable[int]) -> Dict[int, str]:
+        """Names for the given product IDs (including soft-deleted), read through the product cache."""
+        return await db.run_sync(ProductService.get_product_names, product_ids)
+
+    @staticmethod
+    async def update_product(
+        db: AsyncSession, product_id: int, data: ProductUpdate, expected_version: Optional[int] = None
+    ) -> Product | None:
+        """Update a live product in one UPDATE, checking the expected version if given."""
+        return await db.run_sync(ProductService.update_product, product_id, data, expected_version)
+
+    @staticmethod
+    async def adjust_stock(db: AsyncSession, product_id: int, delta: int) -> Product | None:
+        """Add delta to a live product's stock in one conditional UPDATE."""
+        return await db.run_sync(ProductService.adjust_stock, product_id, delta)
+
+    @staticmethod
+    async def delete_product(db: AsyncSession, product_id: int, expected_version: Optional[int] = None) -> bool:
+        """Soft-delete a live product in one UPDATE, checking the expected version if given."""
+        return await db.run_sync(ProductService.delete_product, product_id, expected_version)
+
+    @staticmethod
+    async def delete_products_bulk(db: AsyncSession, product_ids: List[int]) -> int:
+        """Soft-delete multiple products by IDs. Returns count of (soft) deleted."""
+        return await db.run_sync(ProductService.delete_products_bulk, product_ids)
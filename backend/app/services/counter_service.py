@@ -0,0 +1,72 @@
+from typing import Callable
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.counter import TableCounter
+from app.models.product import Product
+
+# Counter names
+LIVE_PRODUCTS = "products"
+
+
+def _count_live_products(db: Session) -> int:
+    return db.query(Product).filter(Product.deleted_at.is_(None)).count()
+
+
+# Exact count used to seed or reconcile each counter
+RECOUNTS: dict[str, Callable[[Session], int]] = {
+    LIVE_PRODUCTS: _count_live_products,
+}
+
+
+class CounterService:
+    """
+    Counts kept in table_counters so list endpoints do not need COUNT(*).
+    Writers call adjust() in the same transaction as the rows they change, so the
+    counter commits or rolls back with them.
+    """
+
+    @staticmethod
+    def adjust(db: Session, name: str, delta: int) -> None:
+        """Add delta to a counter (no-op until the counter has been seeded by a read)."""
+        if delta:
+            db.execute(
+                update(TableCounter)
+                .where(TableCounter.name == name)
+                .values(value=TableCounter.value + delta)
+                .execution_options(synchronize_session=False)
+            )
+
+    @staticmethod
+    def get(db: Session, name: str) -> int:
+        """Current counter value; seeded with an exact recount on first use."""
+        value = db.execute(select(TableCounter.value).where(TableCounter.name == name)).scalar()
+        if value is None:
+            return CounterService.recount(db, name)
+        return value
+
+    @staticmethod
+    def recount(db: Session, name: str) -> int:
+        """
+        Recount exactly and store the result.
+        The counter row is locked first: writers that have not committed yet
+        block on it in adjust() and apply their delta on top of the recount.
+        """
+        try:
+            counter = db.execute(
+                select(TableCounter).where(TableCounter.name == name).with_for_update()
+            ).scalar_one_or_none()
+            value = RECOUNTS[name](db)
+            if counter is None:
+                db.add(TableCounter(name=name, value=value))
+            else:
+                counter.value = value
+            db.commit()
+            return value
+        except IntegrityError:
+            # Another request seeded the counter first
+            db.rollback()
+            return CounterService.get(db, name)
+        except Exception:
+            db.rollback()
+            raise
@@ -0,0 +1,146 @@
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.models.order import Order, OrderStatus
+from app.models.order_item import OrderItem
+from app.models.product import Product
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+
+ORDER_CSV_COLUMNS = [
+    "order_id", "created_at", "status",
+    "item_id", "product_id", "product_name", "quantity_ordered", "price_at_time",
+]
+PRODUCT_CSV_COLUMNS = ["id", "name", "price", "stock_quantity", "deleted_at"]
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, OrderStatus):
+        return value.value
+    return value
+
+
+class ExportService:
+    """
+    Streams orders and products from a server-side cursor (yield_per), encoding
+    them as NDJSON or CSV in chunks, so memory use does not grow with the export.
+    """
+
+    @staticmethod
+    def iter_order_rows(
+        db: Session,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        status: Optional[OrderStatus] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """One dict per order item (orders without items yield one row with empty item fields), by order ID."""
+        query = (
+            select(
+                Order.id.label("order_id"),
+                Order.created_at,
+                Order.status,
+                OrderItem.id.label("item_id"),
+                OrderItem.product_id,
+                Product.name.label("product_name"),
+                OrderItem.quantity_ordered,
+                OrderItem.price_at_time,
+            )
+            .select_from(Order)
+            .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+            .outerjoin(Product, Product.id == OrderItem.product_id)
+            .order_by(Order.id, OrderItem.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        if created_from is not None:
+            query = query.where(Order.created_at >= created_from)
+        if created_to is not None:
+            query = query.where(Order.created_at < created_to)
+        if status is not None:
+            query = query.where(Order.status == status)
+        for row in db.execute(query):
+            yield row._asdict()
+
+    @staticmethod
+    def iter_orders(db: Session, **filters) -> Iterator[Dict[str, Any]]:
+        """One dict per order with its items nested, grouped from the ordered item rows."""
+        current: Optional[Dict[str, Any]] = None
+        for row in ExportService.iter_order_rows(db, **filters):
+            if current is None or current["id"] != row["order_id"]:
+                if current is not None:
+                    yield current
+                current = {
+                    "id": row["order_id"],
+                    "created_at": row["created_at"],
+                    "status": row["status"].value,
+                    "order_items": [],
+                }
+            if row["item_id"] is not None:
+                current["order_items"].append({
+                    "id": row["item_id"],
+                    "product_id": row["product_id"],
+                    "quantity_ordered": row["quantity_ordered"],
+                    "price_at_time": row["price_at_time"],
+                    "product_name": row["product_name"],
+                })
+        if current is not None:
+            yield current
+
+    @staticmethod
+    def iter_products(db: Session, include_deleted: bool = False) -> Iterator[Dict[str, Any]]:
+        """One dict per product, by ID."""
+        query = (
+            select(Product.id, Product.name, Product.price, Product.stock_quantity, Product.deleted_at)
+            .order_by(Product.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        if not include_deleted:
+            query = query.where(Product.deleted_at.is_(None))
+        for row in db.execute(query):
+            yield row._asdict()
+
+    @staticmethod
+    def encode_ndjson(records: Iterable[Dict[str, Any]], chunk_size: int = EXPORT_BATCH_SIZE) -> Iterator[str]:
+        """Encode records as newline-delimited JSON, yielding chunk_size lines at a time."""
+        lines: List[str] = []
+        for record in records:
+            lines.append(json.dumps(record, default=_json_default, separators=(",", ":")))
+            if len(lines) >= chunk_size:
+                yield "\n".join(lines) + "\n"
+                lines = []
+        if lines:
+            yield "\n".join(lines) + "\n"
+
+    @staticmethod
+    def encode_csv(
+        records: Iterable[Dict[str, Any]], columns: List[str], chunk_size: int = EXPORT_BATCH_SIZE
+    ) -> Iterator[str]:
+        """Encode records as CSV with a header row, yielding chunk_size rows at a time."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        pending = 0
+        for record in records:
+            writer.writerow([_csv_value(record[column]) for column in columns])
+            pending += 1
+            if pending >= chunk_size:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+        yield buffer.getvalue()
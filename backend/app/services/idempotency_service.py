@@ -0,0 +1,100 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from pydantic import BaseModel
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.exceptions import IdempotencyKeyMismatchError
+from app.models.idempotency_key import IdempotencyKey
+
+
+class IdempotencyService:
+    """
+    Stored responses for requests made with an Idempotency-Key header.
+    The response is recorded in the same transaction as the order it describes,
+    so a key exists if and only if its order was committed.
+    """
+
+    @staticmethod
+    def fingerprint(request: BaseModel) -> str:
+        """SHA-256 of the request body in canonical JSON form."""
+        return hashlib.sha256(request.model_dump_json().encode()).hexdigest()
+
+    @staticmethod
+    def lookup(db: Session, key: str, request_hash: str) -> Optional[IdempotencyKey]:
+        """
+        The unexpired stored response for key, or None.
+        A plain read: replays take no product or order locks.
+        Raises IdempotencyKeyMismatchError if the key was used with another body.
+        """
+        record = db.execute(
+            select(IdempotencyKey).where(
+                IdempotencyKey.key == key,
+                IdempotencyKey.expires_at > datetime.now(timezone.utc),
+            )
+        ).scalar_one_or_none()
+        if record is not None and record.request_hash != request_hash:
+            raise IdempotencyKeyMismatchError(
+                f"Idempotency-Key '{key}' was already used with a different request body"
+            )
+        return record
+
+    @staticmethod
+    def record(
+        db: Session,
+        key: str,
+        request_hash: str,
+        status_code: int,
+        response: BaseModel,
+        order_id: Optional[int] = None,
+    ) -> None:
+        """
+        Add the response for key inside the caller's transaction (the caller commits).
+        A concurrent request that recorded the same key first makes the commit fail
+        with IntegrityError; the caller then replays that request's response.
+        """
+        now = datetime.now(timezone.utc)
+        # An expired record with the same key is replaced rather than conflicting
+        db.execute(
+            delete(IdempotencyKey)
+            .where(IdempotencyKey.key == key, IdempotencyKey.expires_at <= now)
+            .execution_options(synchronize_session=False)
+        )
+        db.add(IdempotencyKey(
+            key=key,
+            request_hash=request_hash,
+            order_id=order_id,
+            status_code=status_code,
+            response_body=response.model_dump_json(),
+            expires_at=now + timedelta(seconds=settings.idempotency_key_ttl),
+        ))
+
+    @staticmethod
+    def purge_expired(db: Session, batch_size: int = 1000, max_batches: int = 100) -> int:
+        """
+        Delete expired keys in batches of batch_size, committing after each batch
+        so no single transaction holds many row locks. Returns the number deleted.
+        """
+        deleted = 0
+        try:
+            for _ in range(max_batches):
+                expired = (
+                    select(IdempotencyKey.key)
+                    .where(IdempotencyKey.expires_at <= datetime.now(timezone.utc))
+                    .limit(batch_size)
+                    .scalar_subquery()
+                )
+                result = db.execute(
+                    delete(IdempotencyKey)
+                    .where(IdempotencyKey.key.in_(expired))
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
+                deleted += result.rowcount
+                if result.rowcount < batch_size:
+                    break
+            return deleted
+        except Exception:
+            db.rollback()
+            raise
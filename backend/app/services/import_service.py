@@ -0,0 +1,176 @@
+import codecs
+import csv
+import io
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+from pydantic import ValidationError
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.orm import Session
+from app.cache import product_cache
+from app.search import product_search_index
+from app.models.product import Product
+from app.schemas.product import ProductCreate
+from app.services.counter_service import CounterService, LIVE_PRODUCTS
+from app.services.outbox_service import OutboxService, PRODUCTS_IMPORTED
+
+# Rows validated and written per transaction
+IMPORT_BATCH_SIZE = 5000
+# Row errors listed in the report; later errors are only counted
+MAX_REPORTED_ERRORS = 1000
+
+
+def _iter_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Split a stream of UTF-8 byte chunks into lines (line endings kept)."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        # The last piece may be an incomplete line; it is kept for the next chunk
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def _iter_ndjson_records(lines: Iterable[str]) -> Iterator[Tuple[int, Any]]:
+    """(line number, decoded object or ValueError) per non-blank line."""
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError as e:
+            yield number, ValueError(f"Invalid JSON: {e}")
+
+
+def _iter_csv_records(lines: Iterable[str]) -> Iterator[Tuple[int, Any]]:
+    """(data row number, row dict) per CSV row after the header; empty cells are omitted."""
+    reader = csv.DictReader(lines)
+    for number, row in enumerate(reader, start=1):
+        yield number, {k: v for k, v in row.items() if k is not None and v not in ("", None)}
+
+
+class ProductImportService:
+    """
+    Imports products from a streamed CSV or NDJSON body.
+    Rows are parsed incrementally, validated against ProductCreate and written
+    in batches of IMPORT_BATCH_SIZE (one commit per batch): PostgreSQL COPY when
+    running on psycopg2, executemany INSERT otherwise. With upsert_by_name,
+    rows whose name matches live products update those products instead, and
+    a row whose name repeats later in the same batch is skipped (the later row
+    wins). Every received row is counted once: inserted, updated, skipped or failed.
+    """
+
+    @staticmethod
+    def import_products(
+        db: Session,
+        chunks: Iterable[bytes],
+        format: str = "csv",
+        upsert_by_name: bool = False,
+        batch_size: int = IMPORT_BATCH_SIZE,
+    ) -> Dict[str, Any]:
+        lines = _iter_lines(chunks)
+        records = _iter_csv_records(lines) if format == "csv" else _iter_ndjson_records(lines)
+
+        report: Dict[str, Any] = {
+            "received": 0, "inserted": 0, "updated": 0, "skipped": 0, "failed": 0, "errors": [],
+        }
+        batch: List[ProductCreate] = []
+        for row_number, record in records:
+            report["received"] += 1
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                if not isinstance(record, dict):
+                    raise ValueError("Row must be an object")
+                batch.append(ProductCreate.model_validate(record))
+            except ValidationError as e:
+                ProductImportService._record_error(report, row_number, [
+                    f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+                ])
+            except ValueError as e:
+                ProductImportService._record_error(report, row_number, [str(e)])
+            if len(batch) >= batch_size:
+                ProductImportService._write_batch(db, batch, upsert_by_name, report)
+                batch = []
+        if batch:
+            ProductImportService._write_batch(db, batch, upsert_by_name, report)
+        report["errors_truncated"] = report["failed"] > len(report["errors"])
+        return report
+
+    @staticmethod
+    def _record_error(report: Dict[str, Any], row_number: int, errors: List[str]) -> None:
+        report["failed"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append({"row": row_number, "errors": errors})
+
+    @staticmethod
+    def _write_batch(db: Session, batch: List[ProductCreate], upsert_by_name: bool, report: Dict[str, Any]) -> None:
+        """Insert (or upsert) one validated batch and commit it."""
+        updated_ids: List[int] = []
+        updated_rows = skipped_rows = 0
+        try:
+            to_insert = batch
+            if upsert_by_name:
+                # Later rows win when a name repeats within the batch
+                by_name = {p.name: p for p in batch}
+                skipped_rows = len(batch) - len(by_name)
+                existing = db.execute(
+                    select(Product.id, Product.name)
+                    .where(Product.name.in_(by_name), Product.deleted_at.is_(None))
+                ).all()
+                updates = [
+                    {"b_id": row.id, "b_price": by_name[row.name].price, "b_stock": by_name[row.name].stock_quantity}
+                    for row in existing
+                ]
+                if updates:
+                    # Core executemany so each row's version is bumped in SQL
+                    db.connection().execute(
+                        update(Product.__table__)
+                        .where(Product.__table__.c.id == bindparam("b_id"))
+                        .values(
+                            price=bindparam("b_price"),
+                            stock_quantity=bindparam("b_stock"),
+                            version=Product.__table__.c.version + 1,
+                        ),
+                        updates,
+                    )
+                updated_ids = [u["b_id"] for u in updates]
+                matched = {row.name for row in existing}
+                # One input row may update several live products with its name
+                updated_rows = len(matched)
+                to_insert = [p for name, p in by_name.items() if name not in matched]
+            if to_insert:
+                ProductImportService._insert_rows(db, to_insert)
+                CounterService.adjust(db, LIVE_PRODUCTS, len(to_insert))
+            # One event per batch rather than per row; subscribers reload what they cache
+            OutboxService.record(db, [(PRODUCTS_IMPORTED, None, {
+                "inserted": len(to_insert), "updated": len(updated_ids), "updated_ids": updated_ids,
+            })])
+            db.commit()
+            product_cache.invalidate(updated_ids)
+            product_search_index.invalidate()
+            report["inserted"] += len(to_insert)
+            report["updated"] += updated_rows
+            report["skipped"] += skipped_rows
+        except Exception:
+            db.rollback()
+            raise
+
+    @staticmethod
+    def _insert_rows(db: Session, products: List[ProductCreate]) -> None:
+        connection = db.connection()
+        if connection.dialect.driver == "psycopg2":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for p in products:
+                writer.writerow([p.name, p.price, p.stock_quantity])
+            buffer.seek(0)
+            cursor = connection.connection.driver_connection.cursor()
+            cursor.copy_expert("COPY products (name, price, stock_quantity) FROM STDIN WITH (FORMAT csv)", buffer)
+        else:
+            db.execute(insert(Product), [
+                {"name": p.name, "price": p.price, "stock_quantity": p.stock_quantity} for p in products
+            ])
@@ -1,75 +1,83 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import select
-from typing import List
+from sqlalchemy.engine import Row
+from sqlalchemy import Select, select, insert, update, and_, or_, exists
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple, Union
 from app.models.order import Order, OrderStatus
 from app.models.order_item import OrderItem
 from app.models.product import Product
-from app.schemas.order import OrderCreate, OrderItemCreate
+from app.schemas.order import OrderCreate, OrderItemCreate, OrderResponse
+from app.cache import product_cache
+from app.config import settings
+from app.services.idempotency_service import IdempotencyService
+from app.services.outbox_service import (
+    OutboxService, ORDER_CREATED, ORDER_STATUS_CHANGED, ORDER_UPDATED, PRODUCT_UPDATED,
+)
+from app.services.rollup_service import RollupService, order_day
 from app.exceptions import InsufficientStockError, ProductNotFoundError
 
+# Statuses an order may move to each status from (the rules of update_order_status;
+# moving to the current status is a no-op)
+STATUS_SOURCES = {
+    OrderStatus.PENDING: (),
+    OrderStatus.SHIPPED: (OrderStatus.PENDING,),
+    OrderStatus.CANCELLED: (OrderStatus.PENDING, OrderStatus.SHIPPED),
+}
+
 
 class OrderService:
     @staticmethod
-    def create_order(db: Session, order_data: OrderCreate) -> Order:
+    def create_order(
+        db: Session,
+        order_data: OrderCreate,
+        idempotency_key: Optional[str] = None,
+        request_hash: Optional[str] = None,
+    ) -> Order:
         """
         Create an order with transactional stock reduction.
-        Uses SELECT FOR UPDATE to prevent race conditions.
+        Stock is reserved according to settings.stock_mode (see _reserve_stock).
+        With an idempotency_key, the formatted response is stored in the same
+        transaction (see IdempotencyService.record).
         """
         # Start transaction
         try:
-            # Collect all product IDs
-            product_ids = [item.product_id for item in order_data.items]
-            
-            # Lock products for update to prevent race conditions (exclude soft-deleted)
-            products_query = (
-                select(Product)
-                .where(Product.id.in_(product_ids), Product.deleted_at.is_(None))
-                .with_for_update()
-            )
-            products = db.execute(products_query).scalars().all()
-            
-            # Create a dictionary for quick lookup
-            products_dict = {p.id: p for p in products}
-            
-            # Validate all products exist
-            for item in order_data.items:
-                if item.product_id not in products_dict:
-                    raise ProductNotFoundError(f"Product with ID {item.product_id} not found")
-            
-            # Check stock availability and prepare stock reductions
-            for item in order_data.items:
-                product = products_dict[item.product_id]
-                if product.stock_quantity < item.quantity:
-                    raise InsufficientStockError(
-                        f"Insufficient stock for product '{product.name}'. "
-                        f"Available: {product.stock_quantity}, Requested: {item.quantity}"
-                    )
+            # Validate and reduce stock; products_dict gives name/price per product ID
+            products_dict = OrderService._reserve_stock(db, order_data.items)
             
             # Create order
             order = Order(status=OrderStatus.PENDING)
             db.add(order)
             db.flush()  # Get order ID without committing
             
-            # Create order items and reduce stock
-            order_items = []
+            # Create order items
             for item in order_data.items:
                 product = products_dict[item.product_id]
-                
-                # Reduce stock
-                product.stock_quantity -= item.quantity
-                
-                # Create order item
                 order_item = OrderItem(
                     order_id=order.id,
                     product_id=product.id,
                     quantity_ordered=item.quantity,
                     price_at_time=product.price
                 )
-                order_items.append(order_item)
                 db.add(order_item)
+
+            RollupService.record_new_orders(db, [(order.id, order.created_at, [
+                (item.product_id, item.quantity, products_dict[item.product_id].price) for item in order_data.items
+            ])])
+            OutboxService.record_orders(db, ORDER_CREATED, [order])
+
+            if idempotency_key is not None:
+                db.flush()
+                db.refresh(order)  # the new items
+                product_names = {pid: p.name for pid, p in products_dict.items()}
+                IdempotencyService.record(
+                    db, idempotency_key, request_hash, 201,
+                    OrderResponse.from_order(order, product_names), order_id=order.id,
+                )
             
             # Commit transaction
             db.commit()
+            product_cache.invalidate(products_dict.keys())
             db.refresh(order)
             
             return order
@@ -81,35 +89,399 @@ class OrderService:
             db.rollback()
             raise
 
+    @staticmethod
+    def _reserve_stock(db: Session, items: List[OrderItemCreate]) -> Dict[int, Product]:
+        """
+        Validate and reduce stock for the given items inside the caller's transaction,
+        recording a product.updated change event per product.
+        Returns products (or rows with id, name, price) keyed by product ID.
+        Raises ProductNotFoundError / InsufficientStockError; the caller rolls back.
+        """
+        if settings.stock_mode == "conditional":
+            products_dict = OrderService._decrement_stock_conditional(db, items)
+        else:
+            products_dict = OrderService._decrement_stock_locking(db, items)
+            db.flush()  # bumps the versions the change events carry
+        OutboxService.record_products(db, PRODUCT_UPDATED, products_dict.values())
+        return products_dict
+
+    @staticmethod
+    def _decrement_stock_locking(db: Session, items: List[OrderItemCreate]) -> Dict[int, Product]:
+        """
+        Lock products with SELECT FOR UPDATE, check stock in Python and reduce it
+        through the ORM.
+        """
+        # Lock products for update to prevent race conditions (exclude soft-deleted)
+        product_ids = [item.product_id for item in items]
+        products_query = (
+            select(Product)
+            .where(Product.id.in_(product_ids), Product.deleted_at.is_(None))
+            .with_for_update()
+            # Locked rows replace any stale copies already in the session
+            .execution_options(populate_existing=True)
+        )
+        products = db.execute(products_query).scalars().all()
+        products_dict = {p.id: p for p in products}
+        
+        # Validate all products exist
+        for item in items:
+            if item.product_id not in products_dict:
+                raise ProductNotFoundError(f"Product with ID {item.product_id} not found")
+        
+        # Check stock availability
+        for item in items:
+            product = products_dict[item.product_id]
+            if product.stock_quantity < item.quantity:
+                raise InsufficientStockError(
+                    f"Insufficient stock for product '{product.name}'. "
+                    f"Available: {product.stock_quantity}, Requested: {item.quantity}"
+                )
+        
+        # Reduce stock
+        for item in items:
+            products_dict[item.product_id].stock_quantity -= item.quantity
+        return products_dict
+
+    @staticmethod
+    def _decrement_stock_conditional(db: Session, items: List[OrderItemCreate]) -> Dict[int, Row]:
+        """
+        Reduce stock with one guarded UPDATE ... RETURNING per product, without
+        reading or locking rows first. Products are updated in ID order so
+        concurrent multi-product orders cannot deadlock. A miss is resolved into
+        ProductNotFoundError or InsufficientStockError with a plain read.
+        """
+        requested: Dict[int, int] = defaultdict(int)
+        for item in items:
+            requested[item.product_id] += item.quantity
+
+        products_dict = {}
+        for product_id in sorted(requested):
+            quantity = requested[product_id]
+            row = db.execute(
+                update(Product)
+                .where(
+                    Product.id == product_id,
+                    Product.stock_quantity >= quantity,
+                    Product.deleted_at.is_(None),
+                )
+                .values(stock_quantity=Product.stock_quantity - quantity, version=Product.version + 1)
+                .returning(Product.id, Product.name, Product.price, Product.stock_quantity, Product.version)
+                .execution_options(synchronize_session=False)
+            ).first()
+            if row is None:
+                current = db.execute(
+                    select(Product.name, Product.stock_quantity)
+                    .where(Product.id == product_id, Product.deleted_at.is_(None))
+                ).first()
+                if current is None:
+                    raise ProductNotFoundError(f"Product with ID {product_id} not found")
+                raise InsufficientStockError(
+                    f"Insufficient stock for product '{current.name}'. "
+                    f"Available: {current.stock_quantity}, Requested: {quantity}"
+                )
+            products_dict[product_id] = row
+        return products_dict
+
+    @staticmethod
+    def create_orders_batch(
+        db: Session, orders_data: List[OrderCreate]
+    ) -> List[Union[int, InsufficientStockError, ProductNotFoundError]]:
+        """
+        Create many orders in one transaction.
+        Locks the union of their products once, in ID order, then validates and
+        reduces stock in memory order by order, so a failing order is skipped
+        without affecting the others. Accepted orders and their items are written
+        with bulk inserts. Returns, per input order, the new order ID or the error.
+        """
+        try:
+            product_ids = sorted({item.product_id for data in orders_data for item in data.items})
+            products_query = (
+                select(Product)
+                .where(Product.id.in_(product_ids), Product.deleted_at.is_(None))
+                .order_by(Product.id)
+                .with_for_update()
+                .execution_options(populate_existing=True)
+            )
+            products_dict = {p.id: p for p in db.execute(products_query).scalars().all()}
+            remaining = {p.id: p.stock_quantity for p in products_dict.values()}
+
+            results: List[Union[int, InsufficientStockError, ProductNotFoundError]] = []
+            accepted: List[Tuple[int, OrderCreate]] = []
+            for index, data in enumerate(orders_data):
+                requested: Dict[int, int] = defaultdict(int)
+                for item in data.items:
+                    requested[item.product_id] += item.quantity
+                error = None
+                for product_id, quantity in requested.items():
+                    if product_id not in products_dict:
+                        error = ProductNotFoundError(f"Product with ID {product_id} not found")
+                        break
+                    if remaining[product_id] < quantity:
+                        error = InsufficientStockError(
+                            f"Insufficient stock for product '{products_dict[product_id].name}'. "
+                            f"Available: {remaining[product_id]}, Requested: {quantity}"
+                        )
+                        break
+                results.append(error)
+                if error is None:
+                    for product_id, quantity in requested.items():
+                        remaining[product_id] -= quantity
+                    accepted.append((index, data))
+
+            if accepted:
+                created = db.execute(
+                    insert(Order).returning(
+                        Order.id, Order.created_at, Order.status, Order.version, sort_by_parameter_order=True
+                    ),
+                    [{"status": OrderStatus.PENDING} for _ in accepted],
+                ).all()
+                order_ids = [row.id for row in created]
+                db.execute(insert(OrderItem), [
+                    {
+                        "order_id": order_id,
+                        "product_id": item.product_id,
+                        "quantity_ordered": item.quantity,
+                        "price_at_time": products_dict[item.product_id].price,
+                    }
+                    for order_id, (_, data) in zip(order_ids, accepted)
+                    for item in data.items
+                ])
+                RollupService.record_new_orders(db, [
+                    (row.id, row.created_at, [
+                        (item.product_id, item.quantity, products_dict[item.product_id].price) for item in data.items
+                    ])
+                    for row, (_, data) in zip(created, accepted)
+                ])
+                for order_id, (index, _) in zip(order_ids, accepted):
+                    results[index] = order_id
+                changed = sorted({item.product_id for _, data in accepted for item in data.items})
+                for product_id in changed:
+                    products_dict[product_id].stock_quantity = remaining[product_id]
+                db.flush()
+                OutboxService.record_products(db, PRODUCT_UPDATED, [products_dict[pid] for pid in changed])
+                OutboxService.record_orders(db, ORDER_CREATED, created)
+
+            db.commit()
+            product_cache.invalidate(products_dict.keys())
+            return results
+
+        except Exception:
+            db.rollback()
+            raise
+
     @staticmethod
     def get_order(db: Session, order_id: int) -> Order | None:
-        """Get an order by ID with eager loading of order items and products"""
+        """
+        Get an order by ID with eager loading of order items.
+        Product names for responses come from ProductService.get_product_names,
+        which reads through the product cache instead of joining products.
+        """
         from sqlalchemy.orm import joinedload
         
         return db.query(Order).options(
-            joinedload(Order.order_items).joinedload(OrderItem.product)
+            joinedload(Order.order_items)
         ).filter(Order.id == order_id).first()
 
+    @staticmethod
+    def get_order_version(db: Session, order_id: int) -> Optional[Tuple[int, Set[int]]]:
+        """
+        Current version of an order and the IDs of its products (for ETag
+        checks) in one query, without loading the items, or None.
+        """
+        rows = db.execute(
+            select(Order.version, OrderItem.product_id)
+            .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+            .where(Order.id == order_id)
+        ).all()
+        if not rows:
+            return None
+        return rows[0].version, {row.product_id for row in rows if row.product_id is not None}
+
+    @staticmethod
+    def get_orders(db: Session, order_ids: List[int]) -> List[Order]:
+        """Get orders by IDs (in ID order) with eager loading of order items"""
+        from sqlalchemy.orm import joinedload
+
+        if not order_ids:
+            return []
+        return db.query(Order).options(
+            joinedload(Order.order_items)
+        ).filter(Order.id.in_(order_ids)).order_by(Order.id).all()
+
+    @staticmethod
+    def list_orders_query(
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Tuple[datetime, int]] = None,
+        status: Optional[OrderStatus] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        product_id: Optional[int] = None,
+    ) -> Select:
+        """
+        SELECT for one page of orders, newest first (created_at, id).
+        Served by ix_orders_status_created_at_id when filtering by status and by
+        ix_orders_created_at_id otherwise; the product filter is an EXISTS probe
+        on ix_order_items_product_id_order_id.
+        """
+        query = select(Order).order_by(Order.created_at.desc(), Order.id.desc())
+        if status is not None:
+            query = query.where(Order.status == status)
+        if created_from is not None:
+            query = query.where(Order.created_at >= created_from)
+        if created_to is not None:
+            query = query.where(Order.created_at < created_to)
+        if product_id is not None:
+            query = query.where(
+                exists().where(OrderItem.order_id == Order.id, OrderItem.product_id == product_id)
+            )
+        if after is not None:
+            created_at, order_id = after
+            query = query.where(or_(
+                Order.created_at < created_at,
+                and_(Order.created_at == created_at, Order.id < order_id),
+            ))
+        else:
+            query = query.offset(skip)
+        return query.limit(limit)
+
+    @staticmethod
+    def list_orders(
+        db: Session,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Tuple[datetime, int]] = None,
+        status: Optional[OrderStatus] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        product_id: Optional[int] = None,
+    ) -> List[Order]:
+        """
+        List orders newest first (created_at, id), with order items eagerly
+        loaded. With after=(created_at, id) of the previous page's last
+        order, seeks past it (keyset) instead of using skip. Optionally
+        filtered by status, created_at range [created_from, created_to) and
+        orders containing product_id.
+        """
+        from sqlalchemy.orm import joinedload
+
+        query = OrderService.list_orders_query(
+            skip, limit, after, status=status, created_from=created_from,
+            created_to=created_to, product_id=product_id,
+        ).options(joinedload(Order.order_items))
+        return db.execute(query).unique().scalars().all()
+
     @staticmethod
     def update_order_status(db: Session, order_id: int, new_status: OrderStatus) -> Order:
-        """Update order status with validation"""
-        order = db.query(Order).filter(Order.id == order_id).first()
-        
-        if not order:
-            raise ValueError(f"Order with ID {order_id} not found")
-        
-        # Validate status transition
-        if order.status == OrderStatus.CANCELLED:
-            raise ValueError("Cannot update status of a cancelled order")
-        
-        if order.status == OrderStatus.SHIPPED and new_status == OrderStatus.PENDING:
-            raise ValueError("Cannot change status from Shipped to Pending")
-        
-        order.status = new_status
-        db.commit()
-        db.refresh(order)
-        
-        return order
+        """
+        Update order status with validation.
+        The order row is locked so the status rollup sees each transition once;
+        cancelling also takes the order's items out of the sales rollup.
+        """
+        try:
+            order = db.query(Order).filter(Order.id == order_id).with_for_update().populate_existing().first()
+
+            if not order:
+                raise ValueError(f"Order with ID {order_id} not found")
+
+            # Validate status transition
+            if order.status == OrderStatus.CANCELLED:
+                raise ValueError("Cannot update status of a cancelled order")
+
+            if order.status == OrderStatus.SHIPPED and new_status == OrderStatus.PENDING:
+                raise ValueError("Cannot change status from Shipped to Pending")
+
+            if order.status != new_status:
+                day = order_day(order.created_at)
+                RollupService.record_status(db, [(day, order.status, order.id, -1), (day, new_status, order.id, 1)])
+                if new_status == OrderStatus.CANCELLED:
+                    RollupService.record_sales(db, [
+                        (day, item.product_id, item.quantity_ordered, item.price_at_time) for item in order.order_items
+                    ], sign=-1)
+                order.status = new_status
+                db.flush()
+                OutboxService.record_orders(db, ORDER_STATUS_CHANGED, [order])
+            db.commit()
+            db.refresh(order)
+
+            return order
+        except Exception:
+            db.rollback()
+            raise
+
+    @staticmethod
+    def update_orders_status_bulk(
+        db: Session, order_ids: List[int], new_status: OrderStatus
+    ) -> Tuple[List[Row], List[Tuple[int, str]]]:
+        """
+        Move many orders to new_status in one transaction, with the rules of
+        update_order_status applied in SQL: one UPDATE ... WHERE status = source
+        RETURNING per status the orders may come from (see STATUS_SOURCES), with
+        the rows locked in ID order. Each row's previous status is therefore known
+        for the rollups without reading the orders first.
+        Returns the updated (id, status, version) rows in ID order and the skipped
+        (order ID, reason) pairs in request order; reasons are "not_found",
+        "cancelled", "unchanged" and "invalid_transition".
+        """
+        order_ids = list(dict.fromkeys(order_ids))
+        try:
+            updated: List[Row] = []
+            status_changes = []
+            for source in STATUS_SOURCES[new_status]:
+                locked = (
+                    select(Order.id)
+                    .where(Order.id.in_(order_ids), Order.status == source)
+                    .order_by(Order.id)
+                    .with_for_update()
+                )
+                rows = db.execute(
+                    update(Order)
+                    .where(Order.id.in_(locked.scalar_subquery()), Order.status == source)
+                    .values(status=new_status, version=Order.version + 1)
+                    .returning(Order.id, Order.created_at, Order.status, Order.version)
+                    .execution_options(synchronize_session=False)
+                ).all()
+                for row in rows:
+                    day = order_day(row.created_at)
+                    status_changes += [(day, source, row.id, -1), (day, new_status, row.id, 1)]
+                updated.extend(rows)
+            updated.sort(key=lambda row: row.id)
+
+            RollupService.record_status(db, status_changes)
+            if new_status == OrderStatus.CANCELLED and updated:
+                days = {row.id: order_day(row.created_at) for row in updated}
+                items = db.execute(
+                    select(OrderItem.order_id, OrderItem.product_id, OrderItem.quantity_ordered, OrderItem.price_at_time)
+                    .where(OrderItem.order_id.in_(days))
+                ).all()
+                RollupService.record_sales(db, [
+                    (days[item.order_id], item.product_id, item.quantity_ordered, item.price_at_time) for item in items
+                ], sign=-1)
+            OutboxService.record_orders(db, ORDER_STATUS_CHANGED, updated)
+
+            updated_ids = {row.id for row in updated}
+            remaining = [order_id for order_id in order_ids if order_id not in updated_ids]
+            current = dict(db.execute(
+                select(Order.id, Order.status).where(Order.id.in_(remaining))
+            ).all()) if remaining else {}
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        skipped = []
+        for order_id in remaining:
+            old_status = current.get(order_id)
+            if old_status is None:
+                reason = "not_found"
+            elif old_status == OrderStatus.CANCELLED:
+                reason = "cancelled"
+            elif old_status == new_status:
+                reason = "unchanged"
+            else:
+                reason = "invalid_transition"
+            skipped.append((order_id, reason))
+        return updated, skipped
 
     @staticmethod
     def add_items_to_order(db: Session, order_id: int, items: List[OrderItemCreate]) -> Order:
@@ -120,31 +492,19 @@ class OrderService:
                 raise ValueError(f"Order with ID {order_id} not found")
             return order
         try:
-            order = db.query(Order).filter(Order.id == order_id).first()
+            # Lock the order so a concurrent status change cannot interleave (rollups)
+            order = db.query(Order).filter(Order.id == order_id).with_for_update().populate_existing().first()
             if not order:
                 raise ValueError(f"Order with ID {order_id} not found")
             if order.status != OrderStatus.PENDING:
                 raise ValueError("Can only add items to a Pending order")
-            product_ids = [item.product_id for item in items]
-            products_query = (
-                select(Product)
-                .where(Product.id.in_(product_ids), Product.deleted_at.is_(None))
-                .with_for_update()
-            )
-            products = db.execute(products_query).scalars().all()
-            products_dict = {p.id: p for p in products}
-            for item in items:
-                if item.product_id not in products_dict:
-                    raise ProductNotFoundError(f"Product with ID {item.product_id} not found")
-                product = products_dict[item.product_id]
-                if product.stock_quantity < item.quantity:
-                    raise InsufficientStockError(
-                        f"Insufficient stock for product '{product.name}'. "
-                        f"Available: {product.stock_quantity}, Requested: {item.quantity}"
-                    )
+            products_dict = OrderService._reserve_stock(db, items)
+            day = order_day(order.created_at)
+            RollupService.record_sales(db, [
+                (day, item.product_id, item.quantity, products_dict[item.product_id].price) for item in items
+            ])
             for item in items:
                 product = products_dict[item.product_id]
-                product.stock_quantity -= item.quantity
                 order_item = OrderItem(
                     order_id=order_id,
                     product_id=product.id,
@@ -152,7 +512,19 @@ class OrderService:
                     price_at_time=product.price,
                 )
                 db.add(order_item)
+            # New items change the order's representation, so its version moves too
+            version = db.execute(
+                update(Order)
+                .where(Order.id == order_id)
+                .values(version=Order.version + 1)
+                .returning(Order.version)
+                .execution_options(synchronize_session=False)
+            ).scalar_one()
+            OutboxService.record(db, [
+                (ORDER_UPDATED, order_id, {"id": order_id, "status": order.status, "version": version})
+            ])
             db.commit()
+            product_cache.invalidate(products_dict.keys())
             db.refresh(order)
             return order
         except (InsufficientStockError, ProductNotFoundError, ValueError):
@@ -0,0 +1,169 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import DateTime, delete, event, func, insert, select, type_coerce
+from sqlalchemy.orm import Session
+from app.models.change_event import ChangeEvent
+from app.models.product import Product
+from app.serializers import dumps, product_payload
+
+# A missing ID below a visible event may belong to a transaction that has not
+# committed yet (sequence values are taken before commit, in any order). Events
+# are written as the last statement before COMMIT and stamped with the database
+# clock at that moment, so the commit is normally milliseconds away. Readers
+# stop at a gap until the event after it is this many seconds old (by the same
+# clock); after that the gap is taken to be a rollback and skipped.
+GAP_SETTLE_SECONDS = 2.0
+
+# Session.info key of the events recorded in the current transaction
+_PENDING_KEY = "outbox_pending"
+
+PRODUCT_CREATED = "product.created"
+PRODUCT_UPDATED = "product.updated"
+PRODUCT_DELETED = "product.deleted"
+PRODUCTS_IMPORTED = "product.imported"
+ORDER_CREATED = "order.created"
+ORDER_UPDATED = "order.updated"
+ORDER_STATUS_CHANGED = "order.status_changed"
+
+
+def order_change(order) -> Dict[str, Any]:
+    """Change feed payload of an order (or a row with id, status and version)."""
+    return {"id": order.id, "status": order.status, "version": order.version}
+
+
+def _db_clock(db: Session):
+    """Current time by the database clock (not the transaction start), as a DateTime expression."""
+    if db.get_bind().dialect.name == "postgresql":
+        clock = func.clock_timestamp()
+    else:
+        clock = func.strftime("%Y-%m-%d %H:%M:%f", "now")  # SQLite, UTC with milliseconds
+    return type_coerce(clock, DateTime(timezone=True))
+
+
+@event.listens_for(Session, "before_commit")
+def _write_pending_events(session: Session) -> None:
+    """Insert the transaction's recorded events right before it commits."""
+    rows = session.info.pop(_PENDING_KEY, None)
+    if rows:
+        session.flush()
+        session.execute(insert(ChangeEvent).values(created_at=_db_clock(session)), rows)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending_events(session: Session, transaction) -> None:
+    """Drop the events of a transaction that ended without committing them."""
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
+
+
+class OutboxService:
+    """
+    Transactional outbox behind the change feed. Services record an event for
+    each stock, price or status change before they commit, so an event exists
+    if and only if its change was committed; the feed reads them back in ID order.
+    """
+
+    @staticmethod
+    def record(db: Session, events: Iterable[Tuple[str, Optional[int], Dict[str, Any]]]) -> None:
+        """
+        Add (type, entity ID, payload) events to the caller's transaction. The
+        payloads are encoded now; the rows are inserted when the caller commits
+        (and dropped if it rolls back).
+        """
+        db.connection()  # begins the transaction the events belong to
+        db.info.setdefault(_PENDING_KEY, []).extend(
+            {"type": event_type, "entity_id": entity_id, "data": dumps(data).decode()}
+            for event_type, entity_id, data in events
+        )
+
+    @staticmethod
+    def record_products(db: Session, event_type: str, products: Iterable) -> None:
+        """
+        Events carrying the ProductResponse fields of each product (ORM objects
+        or rows with id, name, price, stock_quantity and version). ORM changes
+        must be flushed first so the versions are current.
+        """
+        OutboxService.record(db, [(event_type, p.id, product_payload(p)) for p in products])
+
+    @staticmethod
+    def record_product_ids(db: Session, event_type: str, product_ids: Iterable[int]) -> None:
+        """Like record_products, for products changed with Core statements that returned nothing."""
+        product_ids = sorted(set(product_ids))
+        if not product_ids:
+            return
+        rows = db.execute(
+            select(Product.id, Product.name, Product.price, Product.stock_quantity, Product.version)
+            .where(Product.id.in_(product_ids))
+            .order_by(Product.id)
+        ).all()
+        OutboxService.record_products(db, event_type, rows)
+
+    @staticmethod
+    def record_orders(db: Session, event_type: str, orders: Iterable) -> None:
+        """Events carrying the ID, status and version of each order (flushed ORM objects or rows)."""
+        OutboxService.record(db, [(event_type, o.id, order_change(o)) for o in orders])
+
+    @staticmethod
+    def read(
+        db: Session, after: int = 0, limit: int = 500, settle_seconds: float = GAP_SETTLE_SECONDS
+    ) -> List[ChangeEvent]:
+        """
+        Up to limit committed events with ID > after, in ID order, ending before
+        the first unsettled gap (see GAP_SETTLE_SECONDS) so that no event is
+        skipped by a reader that resumes from the last ID it received.
+        """
+        now = db.execute(select(_db_clock(db))).scalar()
+        rows = db.execute(
+            select(ChangeEvent).where(ChangeEvent.id > after).order_by(ChangeEvent.id).limit(limit)
+        ).scalars().all()
+        if now.tzinfo is None:
+            now = now.replace(tzinfo=timezone.utc)
+        settled_before = now - timedelta(seconds=settle_seconds)
+        events = []
+        expected = after + 1
+        for event in rows:
+            created_at = event.created_at
+            if created_at.tzinfo is None:  # SQLite returns naive UTC
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            if event.id != expected and created_at > settled_before:
+                break
+            events.append(event)
+            expected = event.id + 1
+        return events
+
+    @staticmethod
+    def latest_id(db: Session) -> int:
+        """ID of the newest event (0 if there are none): the offset of "from now on"."""
+        return db.execute(select(func.max(ChangeEvent.id))).scalar() or 0
+
+    @staticmethod
+    def purge_older_than(db: Session, seconds: float, batch_size: int = 1000, max_batches: int = 100) -> int:
+        """
+        Delete events older than seconds in batches of batch_size, committing
+        after each batch. The oldest events have the lowest IDs, so each batch
+        is found by walking the primary key. Returns the number deleted.
+        """
+        deleted = 0
+        try:
+            for _ in range(max_batches):
+                cutoff = datetime.now(timezone.utc) - timedelta(seconds=seconds)
+                expired = (
+                    select(ChangeEvent.id)
+                    .where(ChangeEvent.created_at < cutoff)
+                    .order_by(ChangeEvent.id)
+                    .limit(batch_size)
+                    .scalar_subquery()
+                )
+                result = db.execute(
+                    delete(ChangeEvent)
+                    .where(ChangeEvent.id.in_(expired))
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
+                deleted += result.rowcount
+                if result.rowcount < batch_size:
+                    break
+            return deleted
+        except Exception:
+            db.rollback()
+            raise
@@ -1,8 +1,29 @@
 from datetime import datetime, timezone
+from sqlalchemy import Integer, Numeric, String, case, cast, column, func, literal, or_, select, update, values
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
-from typing import List, Tuple
+from sqlalchemy.sql.elements import ColumnElement
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.cache import product_cache
+from app.exceptions import InsufficientStockError, VersionConflictError
+from app.search import product_search_index, RANK_PREFIX, RANK_SUBSTRING, RANK_SIMILAR
 from app.models.product import Product
-from app.schemas.product import ProductCreate, ProductResponse, ProductUpdate
+from app.services.counter_service import CounterService, LIVE_PRODUCTS
+from app.services.outbox_service import OutboxService, PRODUCT_CREATED, PRODUCT_DELETED, PRODUCT_UPDATED
+from app.schemas.product import ProductBulkUpdateItem, ProductCreate, ProductResponse, ProductUpdate
+
+# Products per statement (PostgreSQL) and per commit in update_products_bulk
+BULK_UPDATE_CHUNK_SIZE = 1000
+
+# Fields of a bulk update item, as columns of the update source (NULL = not set)
+_BULK_UPDATE_FIELDS = (
+    ("id", Integer()),
+    ("name", String(255)),
+    ("price", Numeric(10, 2)),
+    ("stock_quantity", Integer()),
+    ("stock_delta", Integer()),
+    ("version", Integer()),
+)
 
 
 class ProductService:
@@ -15,18 +36,93 @@ class ProductService:
             stock_quantity=product_data.stock_quantity
         )
         db.add(product)
+        CounterService.adjust(db, LIVE_PRODUCTS, 1)
+        db.flush()
+        OutboxService.record_products(db, PRODUCT_CREATED, [product])
         db.commit()
         db.refresh(product)
+        product_search_index.add(product.id, product.name)
         return product
 
     @staticmethod
-    def list_products(db: Session, skip: int = 0, limit: int = 100) -> Tuple[List[Product], int]:
-        """List products with pagination (excludes soft-deleted)."""
-        base = db.query(Product).filter(Product.deleted_at.is_(None))
-        total = base.count()
-        products = base.order_by(Product.id).offset(skip).limit(limit).all()
+    def list_products(
+        db: Session,
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[int] = None,
+        include_total: bool = True,
+        exact_total: bool = False,
+    ) -> Tuple[List[Product], Optional[int]]:
+        """
+        List products by ID with pagination (excludes soft-deleted).
+        With after_id, seeks past that ID (keyset) instead of using skip, so deep
+        pages cost the same as the first. The total is None unless include_total;
+        it comes from the maintained counter, or from a recount (which also
+        resynchronizes the counter) with exact_total.
+        """
+        total = None
+        if include_total:
+            if exact_total:
+                total = CounterService.recount(db, LIVE_PRODUCTS)
+            else:
+                total = CounterService.get(db, LIVE_PRODUCTS)
+        query = db.query(Product).filter(Product.deleted_at.is_(None)).order_by(Product.id)
+        if after_id is not None:
+            query = query.filter(Product.id > after_id)
+        else:
+            query = query.offset(skip)
+        products = query.limit(limit).all()
         return products, total
 
+    @staticmethod
+    def search_products(db: Session, query: str, skip: int = 0, limit: int = 20) -> List[Tuple[Product, float]]:
+        """
+        Live products whose name starts with, contains or is similar to query,
+        with their trigram similarity. Ranked prefix > substring > similar, then by
+        similarity, name and ID. PostgreSQL uses the pg_trgm index on lower(name);
+        other databases use the in-process TrigramIndex.
+        """
+        query = query.strip().lower()
+        if db.get_bind().dialect.name == "postgresql":
+            return ProductService._search_pg_trgm(db, query, skip, limit)
+
+        if not product_search_index.loaded:
+            product_search_index.load(
+                db.execute(select(Product.id, Product.name).where(Product.deleted_at.is_(None))).all()
+            )
+        hits = product_search_index.search(query, skip + limit)[skip:]
+        products = {
+            p.id: p
+            for p in db.query(Product).filter(
+                Product.id.in_([product_id for product_id, _, _ in hits]),
+                Product.deleted_at.is_(None)
+            )
+        }
+        return [(products[product_id], score) for product_id, _, score in hits if product_id in products]
+
+    @staticmethod
+    def _search_pg_trgm(db: Session, query: str, skip: int, limit: int) -> List[Tuple[Product, float]]:
+        pattern = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        name = func.lower(Product.name)
+        similarity = func.similarity(name, query)
+        rank = case(
+            (name.like(f"{pattern}%", escape="\\"), RANK_PREFIX),
+            (name.like(f"%{pattern}%", escape="\\"), RANK_SUBSTRING),
+            else_=RANK_SIMILAR,
+        )
+        rows = db.execute(
+            select(Product, similarity)
+            .where(
+                Product.deleted_at.is_(None),
+                # Both predicates can use ix_products_name_trgm; % is pg_trgm's similarity operator
+                or_(name.like(f"%{pattern}%", escape="\\"), name.op("%")(query)),
+            )
+            .order_by(rank, similarity.desc(), name, Product.id)
+            .offset(skip)
+            .limit(limit)
+        ).all()
+        return [(product, score) for product, score in rows]
+
     @staticmethod
     def get_product(db: Session, product_id: int) -> Product | None:
         """Get a product by ID (excludes soft-deleted)."""
@@ -36,35 +132,256 @@ class ProductService:
         ).first()
 
     @staticmethod
-    def update_product(db: Session, product_id: int, data: ProductUpdate) -> Product | None:
-        """Update a product by ID (only if not soft-deleted)."""
-        product = db.query(Product).filter(
-            Product.id == product_id,
-            Product.deleted_at.is_(None)
-        ).first()
+    def get_product_version(db: Session, product_id: int) -> Optional[int]:
+        """Current version of a live product (for ETag checks), or None if missing."""
+        return db.execute(
+            select(Product.version).where(Product.id == product_id, Product.deleted_at.is_(None))
+        ).scalar()
+
+    @staticmethod
+    def get_product_cached(db: Session, product_id: int) -> ProductResponse | None:
+        """Get a product by ID (excludes soft-deleted), read through the product cache."""
+        cached = product_cache.get(product_id)
+        if cached is not None:
+            return cached
+        product = ProductService.get_product(db, product_id)
         if not product:
             return None
+        response = ProductResponse.model_validate(product)
+        product_cache.set(response)
+        return response
+
+    @staticmethod
+    def get_product_names(db: Session, product_ids: Iterable[int]) -> Dict[int, str]:
+        """
+        Names for the given product IDs, including soft-deleted products (order
+        history still shows them). Cached products are served from the cache;
+        the rest are loaded in one query and live ones are added to the cache.
+        """
+        names = {}
+        missing = []
+        for product_id in set(product_ids):
+            cached = product_cache.get(product_id)
+            if cached is not None:
+                names[product_id] = cached.name
+            else:
+                missing.append(product_id)
+        if missing:
+            for product in db.query(Product).filter(Product.id.in_(missing)):
+                names[product.id] = product.name
+                if product.deleted_at is None:
+                    product_cache.set(ProductResponse.model_validate(product))
+        return names
+
+    @staticmethod
+    def update_product(
+        db: Session, product_id: int, data: ProductUpdate, expected_version: Optional[int] = None
+    ) -> Product | None:
+        """
+        Update a live product in a single UPDATE ... RETURNING, writing only the
+        fields that are set. With an expected version (data.version or the
+        If-Match ETag) the UPDATE also requires it to be current and raises
+        VersionConflictError otherwise. Returns None if the product does not exist.
+        """
+        if expected_version is None:
+            expected_version = data.version
+        values = data.model_dump(include={"name", "price", "stock_quantity"}, exclude_none=True)
+        stmt = (
+            update(Product)
+            .where(Product.id == product_id, Product.deleted_at.is_(None))
+            .values(**values, version=Product.version + 1)
+            .returning(Product)
+            .execution_options(populate_existing=True)
+        )
+        if expected_version is not None:
+            stmt = stmt.where(Product.version == expected_version)
+        try:
+            product = db.scalars(stmt).first()
+            if product is None:
+                current = ProductService.get_product_version(db, product_id)
+                db.rollback()
+            else:
+                OutboxService.record_products(db, PRODUCT_UPDATED, [product])
+                db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        if product is None:
+            if current is None:
+                return None
+            raise VersionConflictError(f"Product {product_id} is at version {current}, not {expected_version}")
+        product_cache.invalidate([product_id])
         if data.name is not None:
-            product.name = data.name
-        if data.price is not None:
-            product.price = data.price
-        if data.stock_quantity is not None:
-            product.stock_quantity = data.stock_quantity
-        db.commit()
-        db.refresh(product)
+            product_search_index.add(product.id, product.name)
         return product
 
     @staticmethod
-    def delete_product(db: Session, product_id: int) -> bool:
-        """Soft-delete a product by ID. Returns True if (soft) deleted."""
-        product = db.query(Product).filter(
-            Product.id == product_id,
-            Product.deleted_at.is_(None)
-        ).first()
-        if not product:
-            return False
-        product.deleted_at = datetime.now(timezone.utc)
-        db.commit()
+    def adjust_stock(db: Session, product_id: int, delta: int) -> Product | None:
+        """
+        Add delta (negative to remove) to a live product's stock in one
+        conditional UPDATE, without reading it first. Raises
+        InsufficientStockError if the stock would go below zero; returns None
+        if the product does not exist.
+        """
+        new_stock = Product.stock_quantity + delta
+        stmt = (
+            update(Product)
+            .where(Product.id == product_id, Product.deleted_at.is_(None), new_stock >= 0)
+            .values(stock_quantity=new_stock, version=Product.version + 1)
+            .returning(Product)
+            .execution_options(populate_existing=True)
+        )
+        try:
+            product = db.scalars(stmt).first()
+            if product is None:
+                exists = ProductService.get_product_version(db, product_id) is not None
+                db.rollback()
+            else:
+                OutboxService.record_products(db, PRODUCT_UPDATED, [product])
+                db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        if product is None:
+            if not exists:
+                return None
+            raise InsufficientStockError(f"Cannot remove {-delta} units from product {product_id}: insufficient stock")
+        product_cache.invalidate([product_id])
+        return product
+
+    @staticmethod
+    def update_products_bulk(
+        db: Session, items: List[ProductBulkUpdateItem], chunk_size: int = BULK_UPDATE_CHUNK_SIZE
+    ) -> List[Tuple[int, str, Optional[Row]]]:
+        """
+        Apply many partial updates, chunk_size products per transaction, with the
+        semantics of update_product: fields left unset are kept, the version is
+        bumped and, when given, must match. stock_delta changes stock relative to
+        its current value and may not take it below zero. Soft-deleted products
+        are skipped. PostgreSQL updates a chunk with one UPDATE ... FROM (VALUES
+        ...); other databases run the same conditional UPDATE ... RETURNING once
+        per product. Products are locked in ID order either way.
+        Returns (product ID, outcome, updated row or None) in request order, with
+        outcomes "updated", "not_found", "version_conflict" and "insufficient_stock".
+        """
+        outcomes: Dict[int, Tuple[str, Optional[Row]]] = {}
+        ordered = sorted(items, key=lambda item: item.id)
+        for start in range(0, len(ordered), chunk_size):
+            chunk = ordered[start:start + chunk_size]
+            try:
+                if db.get_bind().dialect.name == "postgresql":
+                    rows = ProductService._update_chunk_from_values(db, chunk)
+                else:
+                    rows = ProductService._update_chunk_by_row(db, chunk)
+                updated = {row.id: row for row in rows}
+                missed = [item.id for item in chunk if item.id not in updated]
+                current = dict(db.execute(
+                    select(Product.id, Product.version).where(Product.id.in_(missed), Product.deleted_at.is_(None))
+                ).all()) if missed else {}
+                OutboxService.record_products(db, PRODUCT_UPDATED, rows)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            product_cache.invalidate(updated)
+            for item in chunk:
+                if item.id in updated:
+                    outcomes[item.id] = ("updated", updated[item.id])
+                    if item.name is not None:
+                        product_search_index.add(item.id, item.name)
+                elif item.id not in current:
+                    outcomes[item.id] = ("not_found", None)
+                elif item.version is not None and current[item.id] != item.version:
+                    outcomes[item.id] = ("version_conflict", None)
+                else:
+                    outcomes[item.id] = ("insufficient_stock", None)
+        return [(item.id, *outcomes[item.id]) for item in items]
+
+    @staticmethod
+    def _update_chunk_from_values(db: Session, chunk: List[ProductBulkUpdateItem]) -> List[Row]:
+        source = values(*(column(name, type_) for name, type_ in _BULK_UPDATE_FIELDS), name="v").data([
+            tuple(getattr(item, name) for name, _ in _BULK_UPDATE_FIELDS) for item in chunk
+        ])
+        # A VALUES column that is NULL in every row is text to PostgreSQL, so each one is cast
+        fields = {c.name: cast(c, c.type) for c in source.columns}
+        locked = (
+            select(Product.id)
+            .where(Product.id.in_([item.id for item in chunk]))
+            .order_by(Product.id)
+            .with_for_update()
+        )
+        stmt = ProductService._bulk_update_statement(fields).where(Product.id.in_(locked.scalar_subquery()))
+        return db.execute(stmt).all()
+
+    @staticmethod
+    def _update_chunk_by_row(db: Session, chunk: List[ProductBulkUpdateItem]) -> List[Row]:
+        rows = []
+        for item in chunk:
+            fields = {name: literal(getattr(item, name), type_) for name, type_ in _BULK_UPDATE_FIELDS}
+            row = db.execute(ProductService._bulk_update_statement(fields)).first()
+            if row is not None:
+                rows.append(row)
+        return rows
+
+    @staticmethod
+    def _bulk_update_statement(fields: Dict[str, ColumnElement]):
+        """Conditional UPDATE ... RETURNING of live products from fields (see _BULK_UPDATE_FIELDS)."""
+        new_stock = case(
+            (fields["stock_quantity"].is_not(None), fields["stock_quantity"]),
+            else_=Product.stock_quantity + func.coalesce(fields["stock_delta"], 0),
+        )
+        return (
+            update(Product)
+            .where(
+                Product.id == fields["id"],
+                Product.deleted_at.is_(None),
+                or_(fields["version"].is_(None), Product.version == fields["version"]),
+                new_stock >= 0,
+            )
+            .values(
+                name=func.coalesce(fields["name"], Product.name),
+                price=func.coalesce(fields["price"], Product.price),
+                stock_quantity=new_stock,
+                version=Product.version + 1,
+            )
+            .returning(Product.id, Product.name, Product.price, Product.stock_quantity, Product.version)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def delete_product(db: Session, product_id: int, expected_version: Optional[int] = None) -> bool:
+        """
+        Soft-delete a product by ID in one UPDATE ... RETURNING, so concurrent
+        stock changes do not make it fail. With an expected version (If-Match)
+        the UPDATE also requires it to be current and raises VersionConflictError
+        otherwise. Returns True if (soft) deleted, False if there is no live product.
+        """
+        stmt = (
+            update(Product)
+            .where(Product.id == product_id, Product.deleted_at.is_(None))
+            .values(deleted_at=datetime.now(timezone.utc), version=Product.version + 1)
+            .returning(Product.id, Product.name, Product.price, Product.stock_quantity, Product.version)
+        )
+        if expected_version is not None:
+            stmt = stmt.where(Product.version == expected_version)
+        try:
+            deleted = db.execute(stmt).first()
+            if deleted is None:
+                current = ProductService.get_product_version(db, product_id)
+                db.rollback()
+            else:
+                CounterService.adjust(db, LIVE_PRODUCTS, -1)
+                OutboxService.record_products(db, PRODUCT_DELETED, [deleted])
+                db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        if deleted is None:
+            if current is None:
+                return False
+            raise VersionConflictError(f"Product {product_id} is at version {current}, not {expected_version}")
+        product_cache.invalidate([product_id])
+        product_search_index.remove([product_id])
         return True
 
     @staticmethod
@@ -72,11 +389,15 @@ class ProductService:
         """Soft-delete multiple products by IDs. Returns count of (soft) deleted."""
         if not product_ids:
             return 0
-        from sqlalchemy import update
-        result = db.execute(
+        deleted = db.execute(
             update(Product)
             .where(Product.id.in_(product_ids), Product.deleted_at.is_(None))
-            .values(deleted_at=datetime.now(timezone.utc))
-        )
+            .values(deleted_at=datetime.now(timezone.utc), version=Product.version + 1)
+            .returning(Product.id, Product.name, Product.price, Product.stock_quantity, Product.version)
+        ).all()
+        CounterService.adjust(db, LIVE_PRODUCTS, -len(deleted))
+        OutboxService.record_products(db, PRODUCT_DELETED, deleted)
         db.commit()
-        return result.rowcount
+        product_cache.invalidate(product_ids)
+        product_search_index.remove(product_ids)
+        return len(deleted)
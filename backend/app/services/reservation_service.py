@@ -0,0 +1,180 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import bindparam, delete, func, select, update
+from sqlalchemy.orm import Session
+from app.cache import product_cache
+from app.config import settings
+from app.exceptions import ReservationNotFoundError
+from app.models.order import Order, OrderStatus
+from app.models.order_item import OrderItem
+from app.models.product import Product
+from app.models.reservation import Reservation, ReservationItem
+from app.schemas.reservation import ReservationCreate
+from app.services.order_service import OrderService
+from app.services.outbox_service import OutboxService, ORDER_CREATED, PRODUCT_UPDATED
+from app.services.rollup_service import RollupService
+
+
+class ReservationService:
+    """
+    Time-limited stock holds for checkout. A hold reduces products.stock_quantity
+    immediately, with the same checks as an order (settings.stock_mode). So
+    stock_quantity is always the available stock, and on-hand stock is
+    stock_quantity plus the active holds. Confirming creates the order without
+    touching stock again; releasing or expiring returns the held stock.
+    """
+
+    @staticmethod
+    def hold(db: Session, data: ReservationCreate) -> Reservation:
+        """
+        Hold stock for data.items for data.ttl_seconds (default settings.reservation_ttl).
+        Raises ProductNotFoundError / InsufficientStockError like order creation,
+        and ValueError for a TTL above settings.reservation_max_ttl.
+        """
+        ttl = data.ttl_seconds or settings.reservation_ttl
+        if ttl > settings.reservation_max_ttl:
+            raise ValueError(f"ttl_seconds must be at most {settings.reservation_max_ttl}")
+        try:
+            products_dict = OrderService._reserve_stock(db, data.items)
+            reservation = Reservation(
+                expires_at=datetime.now(timezone.utc) + timedelta(seconds=ttl),
+                items=[
+                    ReservationItem(
+                        product_id=item.product_id,
+                        quantity=item.quantity,
+                        price_at_time=products_dict[item.product_id].price,
+                    )
+                    for item in data.items
+                ],
+            )
+            db.add(reservation)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        product_cache.invalidate(products_dict.keys())
+        db.refresh(reservation)
+        return reservation
+
+    @staticmethod
+    def get_reservation(db: Session, reservation_id: int) -> Optional[Reservation]:
+        """An unexpired reservation by ID."""
+        return db.execute(
+            select(Reservation)
+            .where(Reservation.id == reservation_id, Reservation.expires_at > datetime.now(timezone.utc))
+        ).scalar_one_or_none()
+
+    @staticmethod
+    def confirm(db: Session, reservation_id: int) -> Order:
+        """
+        Turn an unexpired reservation into a Pending order at the held prices.
+        The stock was already taken by the hold. Raises ReservationNotFoundError.
+        """
+        try:
+            reservation = ReservationService._lock(db, reservation_id, unexpired=True)
+            if reservation is None:
+                raise ReservationNotFoundError(f"Reservation {reservation_id} not found or expired")
+            order = Order(status=OrderStatus.PENDING)
+            db.add(order)
+            db.flush()
+            lines = [(item.product_id, item.quantity, item.price_at_time) for item in reservation.items]
+            db.add_all([
+                OrderItem(order_id=order.id, product_id=product_id, quantity_ordered=quantity, price_at_time=price)
+                for product_id, quantity, price in lines
+            ])
+            RollupService.record_new_orders(db, [(order.id, order.created_at, lines)])
+            OutboxService.record_orders(db, ORDER_CREATED, [order])
+            db.delete(reservation)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        db.refresh(order)
+        return order
+
+    @staticmethod
+    def release(db: Session, reservation_id: int) -> bool:
+        """Cancel a reservation and return its stock. Returns False if it does not exist."""
+        try:
+            reservation = ReservationService._lock(db, reservation_id, unexpired=False)
+            if reservation is None:
+                db.rollback()
+                return False
+            product_ids = ReservationService._return_stock(
+                db, [(item.product_id, item.quantity) for item in reservation.items]
+            )
+            db.delete(reservation)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        product_cache.invalidate(product_ids)
+        return True
+
+    @staticmethod
+    def sweep_expired(db: Session, batch_size: int = 500, max_batches: int = 100) -> int:
+        """
+        Return the stock of expired reservations and delete them, batch_size
+        reservations per transaction. Rows locked by a concurrent confirm or
+        release are skipped. Returns the number of reservations swept.
+        """
+        swept = 0
+        try:
+            for _ in range(max_batches):
+                reservation_ids = db.execute(
+                    select(Reservation.id)
+                    .where(Reservation.expires_at <= datetime.now(timezone.utc))
+                    .order_by(Reservation.id)
+                    .limit(batch_size)
+                    .with_for_update(skip_locked=True)
+                ).scalars().all()
+                if not reservation_ids:
+                    break
+                held = db.execute(
+                    select(ReservationItem.product_id, func.sum(ReservationItem.quantity))
+                    .where(ReservationItem.reservation_id.in_(reservation_ids))
+                    .group_by(ReservationItem.product_id)
+                ).all()
+                product_ids = ReservationService._return_stock(db, held)
+                db.execute(delete(ReservationItem).where(ReservationItem.reservation_id.in_(reservation_ids)))
+                db.execute(delete(Reservation).where(Reservation.id.in_(reservation_ids)))
+                db.commit()
+                product_cache.invalidate(product_ids)
+                swept += len(reservation_ids)
+                if len(reservation_ids) < batch_size:
+                    break
+            return swept
+        except Exception:
+            db.rollback()
+            raise
+
+    @staticmethod
+    def _lock(db: Session, reservation_id: int, unexpired: bool) -> Optional[Reservation]:
+        query = db.query(Reservation).filter(Reservation.id == reservation_id)
+        if unexpired:
+            query = query.filter(Reservation.expires_at > datetime.now(timezone.utc))
+        return query.with_for_update().populate_existing().first()
+
+    @staticmethod
+    def _return_stock(db: Session, lines: Iterable[Tuple[int, int]]) -> List[int]:
+        """
+        Add (product ID, quantity) back to stock, in product ID order, and record
+        the change events; returns the product IDs.
+        """
+        totals: Dict[int, int] = defaultdict(int)
+        for product_id, quantity in lines:
+            totals[product_id] += quantity
+        if totals:
+            products = Product.__table__
+            db.connection().execute(
+                update(products)
+                .where(products.c.id == bindparam("b_id"))
+                .values(
+                    stock_quantity=products.c.stock_quantity + bindparam("b_quantity"),
+                    version=products.c.version + 1,
+                ),
+                [{"b_id": product_id, "b_quantity": totals[product_id]} for product_id in sorted(totals)],
+            )
+            OutboxService.record_product_ids(db, PRODUCT_UPDATED, totals)
+        return sorted(totals)
@@ -0,0 +1,175 @@
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, Tuple
+from sqlalchemy import Date, cast, delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from app.models.order import Order, OrderStatus
+from app.models.order_item import OrderItem
+from app.models.product import Product
+from app.models.rollup import DailyOrderStatusCount, DailyProductSales, ORDER_STATUS_SHARDS
+
+# INSERT ... ON CONFLICT DO UPDATE per dialect
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# (order day, product ID, quantity, unit price)
+SalesLine = Tuple[date, int, int, Decimal]
+
+
+def order_day(created_at: datetime) -> date:
+    """UTC calendar day of an order's created_at."""
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc)
+    return created_at.date()
+
+
+def _order_day_sql(db: Session):
+    """order_day() as SQL over Order.created_at, independent of the session time zone."""
+    if db.get_bind().dialect.name == "postgresql":
+        return cast(func.timezone("UTC", Order.created_at), Date)  # created_at AT TIME ZONE 'UTC'
+    return func.date(Order.created_at)  # SQLite stores UTC
+
+
+class RollupService:
+    """
+    Daily sales and order status rollups read by the analytics endpoints.
+    OrderService calls the record_* methods inside its own transactions, so the
+    rollups commit or roll back with the orders they summarize. Increments are
+    applied with INSERT ... ON CONFLICT DO UPDATE in key order.
+    """
+
+    @staticmethod
+    def record_new_orders(db: Session, orders: Iterable[Tuple[int, datetime, Iterable[Tuple[int, int, Decimal]]]]) -> None:
+        """Count new Pending orders and their (product ID, quantity, unit price) lines."""
+        sales: List[SalesLine] = []
+        statuses = []
+        for order_id, created_at, lines in orders:
+            day = order_day(created_at)
+            statuses.append((day, OrderStatus.PENDING, order_id, 1))
+            sales.extend((day, product_id, quantity, price) for product_id, quantity, price in lines)
+        RollupService.record_status(db, statuses)
+        RollupService.record_sales(db, sales)
+
+    @staticmethod
+    def record_sales(db: Session, lines: Iterable[SalesLine], sign: int = 1) -> None:
+        """Add (or with sign=-1, remove) sold units and revenue."""
+        totals: Dict[Tuple[date, int], List] = defaultdict(lambda: [0, Decimal(0)])
+        for day, product_id, quantity, price in lines:
+            total = totals[(day, product_id)]
+            total[0] += sign * quantity
+            total[1] += sign * quantity * Decimal(price)
+        RollupService._increment(db, DailyProductSales, ("day", "product_id"), ("units_sold", "revenue"), [
+            {"day": day, "product_id": product_id, "units_sold": units, "revenue": revenue}
+            for (day, product_id), (units, revenue) in sorted(totals.items())
+        ])
+
+    @staticmethod
+    def record_status(db: Session, changes: Iterable[Tuple[date, OrderStatus, int, int]]) -> None:
+        """Apply (order day, status, order ID, +1/-1) changes to the status counts."""
+        totals: Dict[Tuple[date, str, int], int] = defaultdict(int)
+        for day, order_status, order_id, delta in changes:
+            totals[(day, order_status.value, order_id % ORDER_STATUS_SHARDS)] += delta
+        RollupService._increment(db, DailyOrderStatusCount, ("day", "status", "shard"), ("order_count",), [
+            {"day": day, "status": OrderStatus(value), "shard": shard, "order_count": delta}
+            for (day, value, shard), delta in sorted(totals.items())
+            if delta
+        ])
+
+    @staticmethod
+    def _increment(db: Session, model, keys: Tuple[str, ...], values: Tuple[str, ...], rows: List[dict]) -> None:
+        if not rows:
+            return
+        dialect = db.get_bind().dialect.name
+        if dialect not in _UPSERT_INSERTS:
+            raise NotImplementedError(f"Rollups are not supported on {dialect}")
+        table = model.__table__
+        stmt = _UPSERT_INSERTS[dialect](table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={name: table.c[name] + stmt.excluded[name] for name in values},
+        )
+        db.execute(stmt, rows)
+
+    @staticmethod
+    def daily_revenue(db: Session, date_from: date, date_to: date) -> List[Row]:
+        """(day, units_sold, revenue) per day in [date_from, date_to]."""
+        return db.execute(
+            select(
+                DailyProductSales.day,
+                func.sum(DailyProductSales.units_sold).label("units_sold"),
+                func.sum(DailyProductSales.revenue).label("revenue"),
+            )
+            .where(DailyProductSales.day.between(date_from, date_to))
+            .group_by(DailyProductSales.day)
+            .order_by(DailyProductSales.day)
+        ).all()
+
+    @staticmethod
+    def top_products(db: Session, date_from: date, date_to: date, limit: int = 20) -> List[Row]:
+        """(product_id, name, units_sold, revenue) of the best-selling products in [date_from, date_to]."""
+        totals = (
+            select(
+                DailyProductSales.product_id,
+                func.sum(DailyProductSales.units_sold).label("units_sold"),
+                func.sum(DailyProductSales.revenue).label("revenue"),
+            )
+            .where(DailyProductSales.day.between(date_from, date_to))
+            .group_by(DailyProductSales.product_id)
+            .subquery()
+        )
+        return db.execute(
+            select(totals.c.product_id, Product.name, totals.c.units_sold, totals.c.revenue)
+            .join(Product, Product.id == totals.c.product_id)
+            .where(totals.c.units_sold > 0)
+            .order_by(totals.c.units_sold.desc(), totals.c.revenue.desc(), totals.c.product_id)
+            .limit(limit)
+        ).all()
+
+    @staticmethod
+    def daily_status_counts(db: Session, date_from: date, date_to: date) -> List[Row]:
+        """(day, status, order_count) per order day in [date_from, date_to], summed over shards."""
+        return db.execute(
+            select(
+                DailyOrderStatusCount.day,
+                DailyOrderStatusCount.status,
+                func.sum(DailyOrderStatusCount.order_count).label("order_count"),
+            )
+            .where(DailyOrderStatusCount.day.between(date_from, date_to))
+            .group_by(DailyOrderStatusCount.day, DailyOrderStatusCount.status)
+            .having(func.sum(DailyOrderStatusCount.order_count) != 0)
+            .order_by(DailyOrderStatusCount.day, DailyOrderStatusCount.status)
+        ).all()
+
+    @staticmethod
+    def rebuild(db: Session) -> None:
+        """
+        Recompute both rollups from orders and order_items (e.g. after loading data
+        behind the services' back). Writers should be stopped while this runs.
+        """
+        try:
+            day = _order_day_sql(db)
+            db.execute(delete(DailyProductSales))
+            db.execute(delete(DailyOrderStatusCount))
+            db.execute(insert(DailyProductSales).from_select(
+                ["day", "product_id", "units_sold", "revenue"],
+                select(
+                    day,
+                    OrderItem.product_id,
+                    func.sum(OrderItem.quantity_ordered),
+                    func.sum(OrderItem.quantity_ordered * OrderItem.price_at_time),
+                )
+                .join(Order, Order.id == OrderItem.order_id)
+                .where(Order.status != OrderStatus.CANCELLED)
+                .group_by(day, OrderItem.product_id),
+            ))
+            shard = Order.id % ORDER_STATUS_SHARDS
+            db.execute(insert(DailyOrderStatusCount).from_select(
+                ["day", "status", "shard", "order_count"],
+                select(day, Order.status, shard, func.count()).group_by(day, Order.status, shard),
+            ))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
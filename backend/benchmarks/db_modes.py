@@ -0,0 +1,103 @@
+"""
+Throughput comparison of the sync and async database paths.
+
+Builds one in-process app per mode over the same database and drives each
+with the same concurrent request mix through httpx's ASGI transport:
+
+    cd backend
+    DATABASE_URL=postgresql://... python -m benchmarks.db_modes --requests 2000 --concurrency 100
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.api.dependencies import get_async_database_session
+from app.api.routes import async_orders, async_products, orders, products
+from app.config import settings
+from app.database import Base, SessionLocal, create_async_session_factory, engine
+from app.models.product import Product
+from benchmarks.stats import summarize
+
+
+def build_app(mode: str) -> FastAPI:
+    """App serving only the routers of one database mode."""
+    app = FastAPI()
+    if mode == "async":
+        session_factory = create_async_session_factory(settings.database_url)
+
+        async def override_get_async_database_session():
+            async with session_factory() as db:
+                yield db
+
+        app.dependency_overrides[get_async_database_session] = override_get_async_database_session
+        app.include_router(async_products.router, prefix="/api/v1/products")
+        app.include_router(async_orders.router, prefix="/api/v1/orders")
+    else:
+        app.include_router(products.router, prefix="/api/v1/products")
+        app.include_router(orders.router, prefix="/api/v1/orders")
+    return app
+
+
+def seed_products(count: int) -> list[int]:
+    """Ensure at least `count` products exist; return their IDs."""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        ids = [row[0] for row in db.query(Product.id).filter(Product.deleted_at.is_(None)).limit(count)]
+        missing = count - len(ids)
+        if missing > 0:
+            new = [Product(name=f"Bench product {i}", price=9.99, stock_quantity=1_000_000) for i in range(missing)]
+            db.add_all(new)
+            db.commit()
+            ids.extend(p.id for p in new)
+        return ids
+    finally:
+        db.close()
+
+
+async def run_mode(mode: str, product_ids: list[int], requests: int, concurrency: int) -> dict:
+    """Issue `requests` GETs with `concurrency` workers; return throughput and latency."""
+    app = build_app(mode)
+    latencies: list[float] = []
+    counter = iter(range(requests))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def worker():
+            for i in counter:
+                if i % 2:
+                    url = f"/api/v1/products/{product_ids[i % len(product_ids)]}/"
+                else:
+                    url = "/api/v1/products/?limit=20"
+                start = time.perf_counter()
+                response = await client.get(url)
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {"mode": mode, **summarize(latencies, elapsed)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--products", type=int, default=100, help="products to seed/read")
+    args = parser.parse_args()
+
+    product_ids = seed_products(args.products)
+    for mode in ("sync", "async"):
+        result = asyncio.run(run_mode(mode, product_ids, args.requests, args.concurrency))
+        print(
+            f"{result['mode']:>5}: {result['rps']:>8} req/s  "
+            f"p50 {result['p50_ms']} ms  p99 {result['p99_ms']} ms  ({result['seconds']} s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+Synthetic large-dataset generator for products and orders.
+
+Fills the schema created by `alembic upgrade head` with a realistic-looking
+catalog and order history, so that list/pagination/export performance can be
+measured at scale:
+
+- product popularity follows a Zipf distribution (a few best sellers, a long tail)
+- items per order follow a skewed distribution (mostly 1-3 lines, up to 10)
+- order statuses follow a configurable mix
+- a fraction of products is soft-deleted (they still appear in older orders)
+- order IDs increase with created_at, like real traffic
+
+Rows are written in batches with COPY on PostgreSQL (psycopg2) and with
+executemany inserts on other databases. The live-products counter and the
+sales/status rollups are recomputed at the end.
+
+    cd backend
+    python -m benchmarks.generate_dataset --products 200000 --orders 4000000   # ~10M order items
+"""
+import argparse
+import bisect
+import csv
+import io
+import itertools
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.models.order import Order, OrderStatus
+from app.models.order_item import OrderItem
+from app.models.product import Product
+from app.services.counter_service import LIVE_PRODUCTS, CounterService
+from app.services.rollup_service import RollupService
+
+# Relative frequency of 1..10 line items per order (mean ~2.4)
+ITEM_COUNT_WEIGHTS = [40, 25, 14, 8, 5, 3, 2, 1.5, 1, 0.5]
+
+DEFAULT_STATUS_MIX = "Pending=0.15,Shipped=0.75,Cancelled=0.10"
+
+
+def parse_status_mix(spec: str) -> Dict[OrderStatus, float]:
+    """Parse 'Pending=0.2,Shipped=0.7,...' into status weights."""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        try:
+            mix[OrderStatus(name.strip())] = float(weight)
+        except ValueError:
+            raise ValueError(f"Invalid status weight: {part!r}")
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("Status mix must have a positive total weight")
+    return mix
+
+
+class DatasetGenerator:
+    """Generates and bulk-loads products, orders and order items."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        products: int,
+        orders: int,
+        deleted_fraction: float = 0.02,
+        zipf_exponent: float = 1.1,
+        status_mix: Optional[Dict[OrderStatus, float]] = None,
+        days: int = 365,
+        batch_size: int = 50000,
+        seed: int = 1,
+        verbose: bool = True,
+    ):
+        self.engine = engine
+        self.products = products
+        self.orders = orders
+        self.deleted_fraction = deleted_fraction
+        self.zipf_exponent = zipf_exponent
+        self.status_mix = status_mix or parse_status_mix(DEFAULT_STATUS_MIX)
+        self.days = days
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.verbose = verbose
+        self.now = datetime.now(timezone.utc).replace(microsecond=0)
+
+    def run(self) -> Dict[str, int]:
+        """Generate everything; returns the number of rows written per table."""
+        started = time.perf_counter()
+        with self.engine.connect() as conn:
+            next_product_id = self._next_id(conn, Product.id)
+            next_order_id = self._next_id(conn, Order.id)
+            next_item_id = self._next_id(conn, OrderItem.id)
+
+        prices = self._write_products(next_product_id)
+        counts = {"products": len(prices)}
+        if prices and self.orders:
+            counts["orders"], counts["order_items"] = self._write_orders(prices, next_order_id, next_item_id)
+        else:
+            counts["orders"] = counts["order_items"] = 0
+
+        self._reset_sequences()
+        with Session(self.engine) as db:
+            CounterService.recount(db, LIVE_PRODUCTS)
+            RollupService.rebuild(db)
+        self._log(f"done in {time.perf_counter() - started:.1f}s: {counts}")
+        return counts
+
+    def _write_products(self, first_id: int) -> Dict[int, Decimal]:
+        """Insert the catalog; returns product id -> price for the order generator."""
+        prices: Dict[int, Decimal] = {}
+        deleted_at = self.now.isoformat()
+
+        def rows() -> Iterator[Sequence]:
+            for product_id in range(first_id, first_id + self.products):
+                # Log-normal prices: most products are cheap, a few are expensive
+                price = Decimal(str(round(min(max(self.rng.lognormvariate(3, 1), 0.5), 99999), 2)))
+                prices[product_id] = price
+                deleted = self.rng.random() < self.deleted_fraction
+                yield (
+                    product_id,
+                    f"Product {product_id}",
+                    price,
+                    self.rng.randint(0, 10000),
+                    deleted_at if deleted else None,
+                )
+
+        columns = ["id", "name", "price", "stock_quantity", "deleted_at"]
+        self._load(Product.__table__.name, columns, rows(), self.products)
+        return prices
+
+    def _write_orders(self, prices: Dict[int, Decimal], first_order_id: int, first_item_id: int):
+        product_ids = list(prices)
+        # Popularity rank is independent of the ID so best sellers are spread over the catalog
+        self.rng.shuffle(product_ids)
+        cum_weights = list(itertools.accumulate(1 / rank ** self.zipf_exponent for rank in range(1, len(product_ids) + 1)))
+        total_weight = cum_weights[-1]
+        item_cum = list(itertools.accumulate(ITEM_COUNT_WEIGHTS))
+        statuses = list(self.status_mix)
+        status_cum = list(itertools.accumulate(self.status_mix.values()))
+
+        start = self.now - timedelta(days=self.days)
+        step = timedelta(days=self.days) / self.orders
+        items: List[Sequence] = []
+        item_id = first_item_id
+        item_count = 0
+
+        def orders_rows() -> Iterator[Sequence]:
+            nonlocal item_id, item_count
+            rng = self.rng
+            for n in range(self.orders):
+                order_id = first_order_id + n
+                created_at = start + step * n
+                status = statuses[bisect.bisect(status_cum, rng.random() * status_cum[-1])]
+                yield (order_id, created_at.isoformat(), status.value)
+
+                lines = bisect.bisect(item_cum, rng.random() * item_cum[-1]) + 1
+                chosen = set()
+                for _ in range(lines):
+                    product_id = product_ids[bisect.bisect(cum_weights, rng.random() * total_weight)]
+                    if product_id in chosen:
+                        continue
+                    chosen.add(product_id)
+                    quantity = 1 if rng.random() < 0.7 else rng.randint(2, 5)
+                    items.append((item_id, order_id, product_id, quantity, prices[product_id]))
+                    item_id += 1
+
+                # Items reference orders, so they are flushed after the orders of each batch
+                if len(items) >= self.batch_size:
+                    pending.append(items[:])
+                    item_count += len(items)
+                    items.clear()
+
+        pending: List[List[Sequence]] = []
+        order_columns = ["id", "created_at", "status"]
+        item_columns = ["id", "order_id", "product_id", "quantity_ordered", "price_at_time"]
+        written = 0
+        for batch in _batched(orders_rows(), self.batch_size):
+            self._copy_or_insert(Order.__table__.name, order_columns, batch)
+            written += len(batch)
+            for item_batch in pending:
+                self._copy_or_insert(OrderItem.__table__.name, item_columns, item_batch)
+            pending.clear()
+            self._log(f"orders: {written}/{self.orders}, order items: {item_count}")
+        # The generator's last resumption (after a full final batch) can still queue items
+        for item_batch in pending:
+            self._copy_or_insert(OrderItem.__table__.name, item_columns, item_batch)
+        if items:
+            self._copy_or_insert(OrderItem.__table__.name, item_columns, items)
+            item_count += len(items)
+        return written, item_count
+
+    def _load(self, table: str, columns: List[str], rows: Iterable[Sequence], total: int) -> None:
+        written = 0
+        for batch in _batched(rows, self.batch_size):
+            self._copy_or_insert(table, columns, batch)
+            written += len(batch)
+            self._log(f"{table}: {written}/{total}")
+
+    def _copy_or_insert(self, table: str, columns: List[str], rows: List[Sequence]) -> None:
+        """Write one batch in its own transaction."""
+        with self.engine.begin() as conn:
+            if conn.dialect.driver == "psycopg2":
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(rows)
+                buffer.seek(0)
+                cursor = conn.connection.driver_connection.cursor()
+                cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+            else:
+                target = {"products": Product, "orders": Order, "order_items": OrderItem}[table].__table__
+                datetimes = [i for i, c in enumerate(columns) if c in ("created_at", "deleted_at")]
+                params = []
+                for row in rows:
+                    values = dict(zip(columns, row))
+                    for i in datetimes:
+                        if row[i] is not None:
+                            values[columns[i]] = datetime.fromisoformat(row[i])
+                    params.append(values)
+                conn.execute(target.insert(), params)
+
+    def _reset_sequences(self) -> None:
+        """Move the serial sequences past the explicit IDs written above (PostgreSQL only)."""
+        with self.engine.begin() as conn:
+            if conn.dialect.name != "postgresql":
+                return
+            for table in ("products", "orders", "order_items"):
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)"
+                ))
+
+    @staticmethod
+    def _next_id(conn: Connection, column) -> int:
+        return (conn.execute(select(func.max(column))).scalar() or 0) + 1
+
+    def _log(self, message: str) -> None:
+        if self.verbose:
+            print(message, flush=True)
+
+
+def _batched(rows: Iterable[Sequence], size: int) -> Iterator[List[Sequence]]:
+    iterator = iter(rows)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=100000)
+    parser.add_argument("--orders", type=int, default=1000000)
+    parser.add_argument("--deleted-fraction", type=float, default=0.02, help="share of soft-deleted products")
+    parser.add_argument("--zipf", type=float, default=1.1, help="popularity skew exponent (higher = more skewed)")
+    parser.add_argument("--status-mix", default=DEFAULT_STATUS_MIX)
+    parser.add_argument("--days", type=int, default=365, help="spread orders over this many past days")
+    parser.add_argument("--batch-size", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    from app.database import engine
+
+    DatasetGenerator(
+        engine,
+        products=args.products,
+        orders=args.orders,
+        deleted_fraction=args.deleted_fraction,
+        zipf_exponent=args.zipf,
+        status_mix=parse_status_mix(args.status_mix),
+        days=args.days,
+        batch_size=args.batch_size,
+        seed=args.seed,
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
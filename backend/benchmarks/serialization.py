@@ -0,0 +1,108 @@
+"""
+Micro-benchmark of order page serialization: the response_model path
+(OrderResponse objects, FastAPI validation, stdlib json) against the fast path
+(app.serializers payload dicts, orjson). No database is involved; orders are
+transient ORM objects shaped like a GET /orders page.
+
+    cd backend
+    python -m benchmarks.serialization --orders 1000 --items 3 --repeat 20
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.models.order import Order, OrderStatus
+from app.models.order_item import OrderItem
+from app.schemas.order import OrderResponse
+from app.serializers import FastJSONResponse, order_payload
+
+_ORDER_LIST_FIELD = create_response_field(name="orders", type_=List[OrderResponse], mode="serialization")
+
+
+def build_orders(count: int, items: int, seed: int = 1):
+    """(orders, product names) for a page of `count` orders with `items` lines each."""
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    statuses = list(OrderStatus)
+    orders = []
+    for n in range(count):
+        order = Order(
+            id=n + 1,
+            created_at=start + timedelta(seconds=n * 37, microseconds=rng.randrange(1_000_000)),
+            status=statuses[n % len(statuses)],
+            version=1,
+        )
+        order.order_items = [
+            OrderItem(
+                id=n * items + i + 1,
+                product_id=rng.randint(1, 500),
+                quantity_ordered=rng.randint(1, 5),
+                price_at_time=Decimal(rng.randint(50, 100000)) / 100,
+            )
+            for i in range(items)
+        ]
+        orders.append(order)
+    names = {product_id: f"Product {product_id}" for product_id in range(1, 501)}
+    return orders, names
+
+
+def render_response_model(orders, names) -> bytes:
+    """What the routes did before the fast path: build models, validate, encode."""
+    content = [OrderResponse.from_order(order, names) for order in orders]
+    serialized = asyncio.run(serialize_response(field=_ORDER_LIST_FIELD, response_content=content))
+    return JSONResponse(serialized).body
+
+
+def render_fast(orders, names) -> bytes:
+    return FastJSONResponse([order_payload(order, names) for order in orders]).body
+
+
+def _best_of(render: Callable, orders, names, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        render(orders, names)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run(orders: int = 1000, items: int = 3, repeat: int = 20) -> Dict[str, float]:
+    """Best-of-`repeat` milliseconds per page for both paths (they must produce identical bytes)."""
+    page, names = build_orders(orders, items)
+    if render_response_model(page, names) != render_fast(page, names):
+        raise AssertionError("fast path output differs from the response_model path")
+    baseline = _best_of(render_response_model, page, names, repeat)
+    fast = _best_of(render_fast, page, names, repeat)
+    return {
+        "orders": orders,
+        "items_per_order": items,
+        "response_model_ms": round(baseline * 1000, 3),
+        "fast_path_ms": round(fast * 1000, 3),
+        "speedup": round(baseline / fast, 2),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--items", type=int, default=3, help="line items per order")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+    result = run(args.orders, args.items, args.repeat)
+    print(
+        f"{result['orders']} orders x {result['items_per_order']} items: "
+        f"response_model {result['response_model_ms']} ms, fast path {result['fast_path_ms']} ms "
+        f"({result['speedup']}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
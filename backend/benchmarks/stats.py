@@ -0,0 +1,23 @@
+"""Latency summaries shared by the benchmark scripts"""
+from typing import Dict, List, Optional
+
+from app.pool_metrics import percentile
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int = 0) -> Dict[str, float]:
+    """Throughput and latency percentiles (ms) for one run."""
+    values = sorted(latencies)
+
+    def ms(value: Optional[float]) -> Optional[float]:
+        return round(value * 1000, 3) if value is not None else None
+
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "rps": round(len(values) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": ms(percentile(values, 50)),
+        "p95_ms": ms(percentile(values, 95)),
+        "p99_ms": ms(percentile(values, 99)),
+        "max_ms": ms(values[-1] if values else None),
+    }
@@ -0,0 +1,299 @@
+"""
+Load-test and benchmark suite for the product and order APIs.
+
+Runs each scenario for a fixed number of requests with N concurrent clients,
+either in-process against the ASGI app or over HTTP against a running server,
+and reports throughput and p50/p95/p99 latency. Results are saved as JSON and
+two result files can be compared:
+
+    cd backend
+    python -m benchmarks.suite run --output before.json                  # in-process ASGI app
+    python -m benchmarks.suite run --url http://localhost:8000 --output after.json
+    python -m benchmarks.suite compare before.json after.json --threshold 10
+
+Scenarios:
+    catalog_browse          product detail reads (80%) and first list pages (20%)
+    checkout_hot_skus       POST /orders/ contending on a few hot products
+    deep_pagination_offset  product pages far into the catalog via skip
+    deep_pagination_cursor  product pages far into the catalog via the after cursor
+    order_listing           order pages via cursor, starting at random depths
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from app.pagination import encode_cursor
+from benchmarks.stats import summarize
+
+API = "/api/v1"
+
+# Number of products that checkout_hot_skus buys from
+HOT_SKUS = 5
+
+
+class BenchmarkContext:
+    """Data discovered during setup and shared by the scenarios."""
+
+    def __init__(self, product_ids: List[int], order_cursors: List[Optional[str]], seed: int):
+        self.product_ids = product_ids
+        self.hot_product_ids = product_ids[:HOT_SKUS]
+        self.order_cursors = order_cursors
+        self.rng = random.Random(seed)
+
+
+async def catalog_browse(client: httpx.AsyncClient, ctx: BenchmarkContext) -> httpx.Response:
+    if ctx.rng.random() < 0.8:
+        return await client.get(f"{API}/products/{ctx.rng.choice(ctx.product_ids)}/")
+    return await client.get(f"{API}/products/?limit=50&include_total=false")
+
+
+async def checkout_hot_skus(client: httpx.AsyncClient, ctx: BenchmarkContext) -> httpx.Response:
+    products = ctx.rng.sample(ctx.hot_product_ids, k=ctx.rng.randint(1, min(3, len(ctx.hot_product_ids))))
+    return await client.post(
+        f"{API}/orders/", json={"items": [{"product_id": p, "quantity": 1} for p in products]}
+    )
+
+
+async def deep_pagination_offset(client: httpx.AsyncClient, ctx: BenchmarkContext) -> httpx.Response:
+    skip = ctx.rng.randint(len(ctx.product_ids) // 2, max(len(ctx.product_ids) - 100, len(ctx.product_ids) // 2))
+    return await client.get(f"{API}/products/?skip={skip}&limit=100")
+
+
+async def deep_pagination_cursor(client: httpx.AsyncClient, ctx: BenchmarkContext) -> httpx.Response:
+    index = ctx.rng.randint(len(ctx.product_ids) // 2, len(ctx.product_ids) - 1)
+    cursor = encode_cursor(ctx.product_ids[index])
+    return await client.get(f"{API}/products/?after={cursor}&limit=100&include_total=false")
+
+
+async def order_listing(client: httpx.AsyncClient, ctx: BenchmarkContext) -> httpx.Response:
+    cursor = ctx.rng.choice(ctx.order_cursors)
+    url = f"{API}/orders/?limit=100" + (f"&after={cursor}" if cursor else "")
+    return await client.get(url)
+
+
+SCENARIOS: Dict[str, Callable[[httpx.AsyncClient, BenchmarkContext], Awaitable[httpx.Response]]] = {
+    "catalog_browse": catalog_browse,
+    "checkout_hot_skus": checkout_hot_skus,
+    "deep_pagination_offset": deep_pagination_offset,
+    "deep_pagination_cursor": deep_pagination_cursor,
+    "order_listing": order_listing,
+}
+
+
+async def seed(client: httpx.AsyncClient, products: int, orders: int) -> None:
+    """Import `products` products and create `orders` orders through the API."""
+    if products:
+        body = "name,price,stock_quantity\n" + "".join(
+            f"Benchmark product {i},{1 + i % 100}.99,1000000\n" for i in range(products)
+        )
+        response = await client.post(f"{API}/products/import?format=csv", content=body)
+        response.raise_for_status()
+    if orders:
+        ids = await fetch_product_ids(client)
+        rng = random.Random(0)
+        for start in range(0, orders, 500):
+            batch = [
+                {"items": [{"product_id": p, "quantity": 1} for p in rng.sample(ids, k=min(3, len(ids)))]}
+                for _ in range(min(500, orders - start))
+            ]
+            response = await client.post(f"{API}/orders/batch", json={"orders": batch})
+            response.raise_for_status()
+
+
+async def fetch_product_ids(client: httpx.AsyncClient) -> List[int]:
+    """All live product IDs, walked with the cursor."""
+    ids: List[int] = []
+    url = f"{API}/products/?limit=1000&include_total=false"
+    while url:
+        data = (await client.get(url)).raise_for_status().json()
+        ids += [p["id"] for p in data["items"]]
+        cursor = data["next_cursor"]
+        url = f"{API}/products/?limit=1000&include_total=false&after={cursor}" if cursor else None
+    return ids
+
+
+async def fetch_order_cursors(client: httpx.AsyncClient, pages: int = 50) -> List[Optional[str]]:
+    """Cursors of the first `pages` order pages (None = first page)."""
+    cursors: List[Optional[str]] = [None]
+    while len(cursors) < pages:
+        url = f"{API}/orders/?limit=100" + (f"&after={cursors[-1]}" if cursors[-1] else "")
+        response = (await client.get(url)).raise_for_status()
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        cursors.append(cursor)
+    return cursors
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    ctx: BenchmarkContext,
+    scenario: Callable[[httpx.AsyncClient, BenchmarkContext], Awaitable[httpx.Response]],
+    requests: int,
+    concurrency: int,
+    warmup: int,
+) -> Dict[str, float]:
+    """Run `warmup` unmeasured then `requests` measured calls across `concurrency` workers."""
+    for _ in range(warmup):
+        await scenario(client, ctx)
+
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await scenario(client, ctx)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+def _client(url: Optional[str], app=None) -> httpx.AsyncClient:
+    if url:
+        return httpx.AsyncClient(base_url=url, timeout=60)
+    if app is None:
+        from app import models  # noqa: F401  (registers the tables)
+        from app.database import Base, engine
+        from app.main import app
+
+        Base.metadata.create_all(bind=engine)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+
+async def run_suite(
+    scenarios: List[str],
+    requests: int = 500,
+    concurrency: int = 20,
+    warmup: int = 20,
+    products: int = 5000,
+    orders: int = 2000,
+    url: Optional[str] = None,
+    app=None,
+    seed_value: int = 42,
+) -> Dict:
+    """Seed (optional), run the selected scenarios and return the result document."""
+    async with _client(url, app) as client:
+        await seed(client, products, orders)
+        ctx = BenchmarkContext(await fetch_product_ids(client), await fetch_order_cursors(client), seed_value)
+        if not ctx.product_ids:
+            raise SystemExit("No products to benchmark against; seed with --products")
+        results = {}
+        for name in scenarios:
+            results[name] = await run_scenario(client, ctx, SCENARIOS[name], requests, concurrency, warmup)
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "target": url or "asgi",
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "requests": requests,
+            "concurrency": concurrency,
+            "warmup": warmup,
+            "catalog_size": len(ctx.product_ids),
+        },
+        "scenarios": results,
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> List[str]:
+    """
+    Print a per-scenario comparison and return the regressions: p95 latency up or
+    throughput down by more than `threshold` percent.
+    """
+    regressions = []
+    print(f"{'scenario':<24} {'rps':>18} {'p95 ms':>22} {'p99 ms':>22}")
+    for name, new in current["scenarios"].items():
+        old = baseline["scenarios"].get(name)
+        if old is None:
+            print(f"{name:<24} (no baseline)")
+            continue
+        cells = []
+        for key in ("rps", "p95_ms", "p99_ms"):
+            change = (new[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+            cells.append(f"{old[key]:>8} -> {new[key]:<8} ({change:+.1f}%)")
+            worse = change < -threshold if key == "rps" else change > threshold
+            if worse and key != "p99_ms":
+                regressions.append(f"{name}: {key} {old[key]} -> {new[key]} ({change:+.1f}%)")
+        print(f"{name:<24} " + "  ".join(cells))
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run scenarios and save results")
+    run.add_argument("--url", help="base URL of a running server (default: in-process ASGI app)")
+    run.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="repeatable; default: all")
+    run.add_argument("--requests", type=int, default=500, help="measured requests per scenario")
+    run.add_argument("--concurrency", type=int, default=20)
+    run.add_argument("--warmup", type=int, default=20)
+    run.add_argument("--products", type=int, default=5000, help="products to import before running (0 = none)")
+    run.add_argument("--orders", type=int, default=2000, help="orders to create before running (0 = none)")
+    run.add_argument("--seed", type=int, default=42, help="random seed for request selection")
+    run.add_argument("--output", help="write results JSON here")
+
+    cmp_ = commands.add_parser("compare", help="compare two result files")
+    cmp_.add_argument("baseline")
+    cmp_.add_argument("current")
+    cmp_.add_argument("--threshold", type=float, default=10.0, help="allowed regression in percent")
+
+    args = parser.parse_args(argv)
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+
+    result = asyncio.run(run_suite(
+        args.scenario or list(SCENARIOS),
+        requests=args.requests,
+        concurrency=args.concurrency,
+        warmup=args.warmup,
+        products=args.products,
+        orders=args.orders,
+        url=args.url,
+        seed_value=args.seed,
+    ))
+    for name, stats in result["scenarios"].items():
+        print(
+            f"{name:<24} {stats['rps']:>8} req/s  p50 {stats['p50_ms']} ms  "
+            f"p95 {stats['p95_ms']} ms  p99 {stats['p99_ms']} ms  errors {stats['errors']}"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
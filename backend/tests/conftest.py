@@ -1,9 +1,11 @@
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
 from app.database import Base, get_db
 from app.api.dependencies import get_database_session
+from app.cache import product_cache
+from app.search import product_search_index
 from app.main import app
 from app.models.product import Product
 from app.models.order import Order
@@ -22,6 +24,8 @@ TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engin
 def db_session():
     """Create a fresh database for each test"""
     Base.metadata.create_all(bind=engine)
+    product_cache.clear()
+    product_search_index.clear()
     db = TestingSessionLocal()
     try:
         yield db
@@ -77,3 +81,27 @@ def sample_products(db_session):
     for product in products:
         db_session.refresh(product)
     return products
+
+
+@pytest.fixture
+def query_plans():
+    """Run a callable and return the SQLite EXPLAIN QUERY PLAN details of every SELECT it issued"""
+    def explain(fn, *args, **kwargs):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                statements.append((statement, parameters))
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            fn(*args, **kwargs)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        with engine.connect() as connection:
+            return [
+                row[-1]
+                for statement, parameters in statements
+                for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)
+            ]
+    return explain
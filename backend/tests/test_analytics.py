@@ -0,0 +1,48 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from app.services.rollup_service import RollupService
+
+
+def _today():
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+def _rollups(client):
+    revenue = client.get("/api/v1/analytics/revenue/daily").json()
+    top = client.get("/api/v1/analytics/products/top").json()
+    statuses = client.get("/api/v1/analytics/orders/status-daily").json()
+    return revenue, top, statuses
+
+
+def test_rollups_follow_order_lifecycle(client, db_session, sample_products):
+    """Test sales and status rollups are maintained by create, batch, add items, ship and cancel"""
+    first, second, third = sample_products  # prices 10, 20, 15
+    order_a = client.post("/api/v1/orders/", json={"items": [{"product_id": first.id, "quantity": 2}]}).json()
+    order_b = client.post("/api/v1/orders/", json={"items": [{"product_id": second.id, "quantity": 1}]}).json()
+    client.post("/api/v1/orders/batch", json={"orders": [
+        {"items": [{"product_id": first.id, "quantity": 1}, {"product_id": third.id, "quantity": 2}]},
+        {"items": [{"product_id": 99999, "quantity": 1}]},
+    ]})
+    client.post(f"/api/v1/orders/{order_a['id']}/items/", json={"items": [{"product_id": second.id, "quantity": 3}]})
+    client.patch(f"/api/v1/orders/{order_a['id']}/status", json={"status": "Shipped"})
+    client.delete(f"/api/v1/orders/{order_b['id']}/")
+
+    revenue, top, statuses = _rollups(client)
+    # A: 2x10 + 3x20 shipped; B cancelled; batch order: 1x10 + 2x15
+    assert revenue == [{"day": _today(), "units_sold": 8, "revenue": "120.00"}]
+    assert [(p["product_id"], p["units_sold"], Decimal(p["revenue"])) for p in top] == [
+        (second.id, 3, Decimal(60)), (first.id, 3, Decimal(30)), (third.id, 2, Decimal(30)),
+    ]
+    assert {s["status"]: s["order_count"] for s in statuses} == {"Pending": 1, "Shipped": 1, "Cancelled": 1}
+
+    # Rebuilding from the orders gives the same numbers
+    RollupService.rebuild(db_session)
+    assert _rollups(client) == (revenue, top, statuses)
+
+
+def test_analytics_date_range_validation(client):
+    """Test inverted or overly long date ranges are rejected"""
+    assert client.get("/api/v1/analytics/revenue/daily?date_from=2026-02-01&date_to=2026-01-01").status_code == 400
+    assert client.get("/api/v1/analytics/orders/status-daily?date_from=2020-01-01&date_to=2026-01-01").status_code == 400
+    assert client.get("/api/v1/analytics/products/top?date_from=2026-01-01&date_to=2026-01-31").json() == []
@@ -0,0 +1,77 @@
+import pytest
+import pytest_asyncio
+import httpx
+from fastapi import FastAPI
+from app.api.dependencies import get_async_database_session
+from app.api.routes import async_orders, async_products
+from app.database import Base, create_async_session_factory
+from app.exceptions import InsufficientStockError
+from app.schemas.order import OrderCreate
+from app.schemas.product import ProductCreate
+from app.services.async_order_service import AsyncOrderService
+from app.services.async_product_service import AsyncProductService
+
+
+@pytest_asyncio.fixture
+async def async_session_factory():
+    """Async session factory over a fresh aiosqlite database"""
+    session_factory = create_async_session_factory("sqlite:///./test_async.db")
+    async with session_factory.kw["bind"].begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield session_factory
+    async with session_factory.kw["bind"].begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await session_factory.kw["bind"].dispose()
+
+
+@pytest.mark.asyncio
+async def test_async_services_create_order_reduces_stock(async_session_factory):
+    """Async services share the sync stock reduction and validation rules"""
+    async with async_session_factory() as db:
+        product = await AsyncProductService.create_product(
+            db, ProductCreate(name="Async Product", price="5.00", stock_quantity=3)
+        )
+        product_id = product.id
+        order = await AsyncOrderService.create_order(
+            db, OrderCreate(items=[{"product_id": product_id, "quantity": 2}])
+        )
+        order = await AsyncOrderService.get_order(db, order.id)
+        assert order.order_items[0].quantity_ordered == 2
+
+        with pytest.raises(InsufficientStockError):
+            await AsyncOrderService.create_order(
+                db, OrderCreate(items=[{"product_id": product_id, "quantity": 2}])
+            )
+
+        product = await AsyncProductService.get_product(db, product_id)
+        assert product.stock_quantity == 1
+
+
+@pytest.mark.asyncio
+async def test_async_routes(async_session_factory):
+    """Async routers serve the same API as the sync ones"""
+    app = FastAPI()
+    app.include_router(async_products.router, prefix="/api/v1/products")
+    app.include_router(async_orders.router, prefix="/api/v1/orders")
+
+    async def override_get_async_database_session():
+        async with async_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_async_database_session] = override_get_async_database_session
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post(
+            "/api/v1/products/", json={"name": "Widget", "price": "2.50", "stock_quantity": 10}
+        )
+        assert response.status_code == 201
+        product_id = response.json()["id"]
+
+        response = await client.post(
+            "/api/v1/orders/", json={"items": [{"product_id": product_id, "quantity": 4}]}
+        )
+        assert response.status_code == 201
+        assert response.json()["order_items"][0]["product_name"] == "Widget"
+
+        response = await client.get("/api/v1/products/")
+        assert response.json()["total"] == 1
+        assert response.json()["items"][0]["stock_quantity"] == 6
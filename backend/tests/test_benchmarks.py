@@ -0,0 +1,22 @@
+import asyncio
+
+from app.main import app
+from benchmarks.suite import SCENARIOS, compare, run_suite
+
+
+def test_benchmark_suite_smoke(client):
+    """Test every scenario runs against a small seeded catalog without errors"""
+    result = asyncio.run(run_suite(
+        list(SCENARIOS), requests=5, concurrency=1, warmup=1, products=20, orders=10, app=app
+    ))
+    assert result["meta"]["catalog_size"] == 20
+    for name, stats in result["scenarios"].items():
+        assert stats["requests"] == 5, name
+        assert stats["errors"] == 0, name
+        assert stats["p95_ms"] >= stats["p50_ms"]
+
+    slower = {"scenarios": {
+        name: {**stats, "rps": stats["rps"] / 2} for name, stats in result["scenarios"].items()
+    }}
+    assert compare(result, result, threshold=10) == []
+    assert len(compare(result, slower, threshold=10)) == len(SCENARIOS)
@@ -0,0 +1,45 @@
+import time
+from app.cache import LRUTTLCache, product_cache
+
+
+def test_lru_ttl_cache_eviction_and_expiry():
+    """Test the in-process backend evicts least recently used and expired entries"""
+    cache = LRUTTLCache(maxsize=2, ttl=60)
+    cache.set(1, "a")
+    cache.set(2, "b")
+    assert cache.get(1) == "a"
+    cache.set(3, "c")  # evicts 2, the least recently used
+    assert cache.get(2) is None
+    assert cache.get(1) == "a"
+    assert cache.evictions == 1
+
+    short = LRUTTLCache(maxsize=10, ttl=0.01)
+    short.set(1, "a")
+    time.sleep(0.02)
+    assert short.get(1) is None
+
+
+def test_get_product_reads_through_cache(client, sample_product):
+    """Test repeated product reads are served from the cache"""
+    for _ in range(3):
+        response = client.get(f"/api/v1/products/{sample_product.id}/")
+        assert response.status_code == 200
+    stats = client.get("/health/cache").json()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2
+
+
+def test_cache_invalidated_by_writes(client, sample_product):
+    """Test product updates, orders and deletes invalidate cached products"""
+    url = f"/api/v1/products/{sample_product.id}/"
+    assert client.get(url).json()["stock_quantity"] == 100
+
+    client.patch(url, json={"price": "12.00"})
+    assert client.get(url).json()["price"] == "12.00"
+
+    client.post("/api/v1/orders/", json={"items": [{"product_id": sample_product.id, "quantity": 5}]})
+    assert client.get(url).json()["stock_quantity"] == 95
+
+    client.delete(url)
+    assert client.get(url).status_code == 404
+    assert product_cache.get(sample_product.id) is None
@@ -0,0 +1,141 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from app.api.routes.changes import sse_message
+from app.change_feed import ChangeFeedBroadcaster
+from app.models.change_event import ChangeEvent
+from app.services.outbox_service import OutboxService
+from tests.conftest import TestingSessionLocal
+
+
+def _record(count: int, start: int = 0) -> None:
+    db = TestingSessionLocal()
+    try:
+        OutboxService.record(db, [("product.updated", n, {"n": n}) for n in range(start, start + count)])
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_changes_recorded_for_stock_price_and_status(client, sample_product):
+    """Each committed stock, price or status change leaves one event in the outbox"""
+    client.patch(f"/api/v1/products/{sample_product.id}/", json={"price": "12.50"})
+    order = client.post("/api/v1/orders/", json={
+        "items": [{"product_id": sample_product.id, "quantity": 3}]
+    }).json()
+    client.patch(f"/api/v1/orders/{order['id']}/status", json={"status": "Shipped"})
+    # A rejected order records nothing
+    client.post("/api/v1/orders/", json={"items": [{"product_id": sample_product.id, "quantity": 1000}]})
+
+    response = client.get("/api/v1/changes/", params={"after": 0})
+    assert response.status_code == 200
+    events = response.json()["events"]
+    assert [e["type"] for e in events] == [
+        "product.updated", "product.updated", "order.created", "order.status_changed",
+    ]
+    assert events[0]["data"]["price"] == "12.50"
+    assert events[1]["data"]["stock_quantity"] == 97
+    assert events[1]["data"]["version"] == 3
+    assert events[3]["data"] == {"id": order["id"], "status": "Shipped", "version": 2}
+    assert response.json()["next_after"] == events[-1]["id"]
+
+    # Resuming from an offset returns only what came after it, optionally filtered
+    later = client.get("/api/v1/changes/", params={"after": events[1]["id"], "types": "order"}).json()
+    assert [e["type"] for e in later["events"]] == ["order.created", "order.status_changed"]
+    assert client.get("/api/v1/changes/", params={"types": "invoice"}).status_code == 400
+
+
+def test_read_stops_at_unsettled_gap(db_session):
+    """A missing ID may still commit, so readers wait for it unless it is old"""
+    now = datetime.now(timezone.utc)
+    db_session.add_all([
+        ChangeEvent(id=1, created_at=now, type="product.updated", entity_id=1, data="{}"),
+        ChangeEvent(id=3, created_at=now, type="product.updated", entity_id=1, data="{}"),
+    ])
+    db_session.commit()
+
+    assert [e.id for e in OutboxService.read(db_session, 0)] == [1]
+    assert [e.id for e in OutboxService.read(db_session, 0, settle_seconds=0)] == [1, 3]
+
+
+def test_slow_writer_is_not_skipped(db_session):
+    """Events get their ID and timestamp at commit, so a long transaction leaves no gap to skip"""
+    slow = TestingSessionLocal()
+    try:
+        OutboxService.record(slow, [("order.created", 1, {"id": 1})])
+        time.sleep(0.2)  # longer than the settle window below
+        _record(1)
+        first = OutboxService.read(db_session, 0, settle_seconds=0.1)
+        assert [e.type for e in first] == ["product.updated"]
+        slow.commit()
+    finally:
+        slow.close()
+
+    later = OutboxService.read(db_session, first[-1].id, settle_seconds=0.1)
+    assert [e.type for e in later] == ["order.created"]
+
+
+def test_rolled_back_events_are_not_written(db_session):
+    db = TestingSessionLocal()
+    try:
+        OutboxService.record(db, [("order.created", 1, {"id": 1})])
+        db.rollback()
+        db.commit()
+    finally:
+        db.close()
+    assert OutboxService.latest_id(db_session) == 0
+
+
+def test_stream_replays_from_offset_then_delivers_live_events(db_session):
+    _record(3)
+
+    async def scenario():
+        feed = ChangeFeedBroadcaster(poll_interval=0.01, buffer_size=100, heartbeat=5)
+        feed.configure(TestingSessionLocal)
+        replaying = feed.stream(after=1)
+        from_now = feed.stream()
+        try:
+            replayed = [await replaying.__anext__() for _ in range(2)]
+            pending = asyncio.ensure_future(from_now.__anext__())
+            await asyncio.sleep(0.05)  # subscribed at the current position
+            _record(1, start=3)
+            live = await asyncio.wait_for(replaying.__anext__(), 5)
+            first_new = await asyncio.wait_for(pending, 5)
+            assert feed.stats()["subscribers"] == 2
+        finally:
+            await replaying.aclose()
+            await from_now.aclose()
+            await feed.stop()
+        return replayed, live, first_new
+
+    replayed, live, first_new = asyncio.run(scenario())
+    assert [e.id for e in replayed] == [2, 3]
+    assert live.id == first_new.id == 4
+    assert sse_message(live) == f'id: 4\nevent: product.updated\ndata: {{"n":3}}\n\n'
+
+
+def test_slow_stream_catches_up_from_outbox(db_session):
+    """A stream whose buffer overflows re-reads the outbox instead of losing events"""
+    async def scenario():
+        feed = ChangeFeedBroadcaster(poll_interval=0.01, buffer_size=2, heartbeat=5)
+        feed.configure(TestingSessionLocal)
+        stream = feed.stream()
+        try:
+            pending = asyncio.ensure_future(stream.__anext__())
+            await asyncio.sleep(0.05)
+            _record(10)
+            received = [await asyncio.wait_for(pending, 5)]
+            while len(received) < 10:
+                received.append(await asyncio.wait_for(stream.__anext__(), 5))
+        finally:
+            await stream.aclose()
+            await feed.stop()
+        return received
+
+    assert [e.id for e in asyncio.run(scenario())] == list(range(1, 11))
+
+
+def test_stream_rejects_malformed_last_event_id(client):
+    response = client.get("/api/v1/changes/stream", headers={"Last-Event-ID": "abc"})
+    assert response.status_code == 400
@@ -0,0 +1,117 @@
+import asyncio
+import zlib
+
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+
+from app import etags
+from app.compression import CompressionMiddleware, choose_encoding
+
+
+def _call(app, accept_encoding="gzip", if_none_match=None):
+    """Run one GET through an ASGI app; returns the sent messages."""
+    messages = []
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else []
+    if if_none_match:
+        headers.append((b"if-none-match", if_none_match.encode()))
+    scope = {"type": "http", "method": "GET", "path": "/", "query_string": b"", "headers": headers}
+
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if requested:
+            # No disconnect: StreamingResponse's listener waits until the stream ends
+            await asyncio.Event().wait()
+        requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return messages
+
+
+def _headers(message):
+    return {k.decode().lower(): v.decode() for k, v in message["headers"]}
+
+
+def test_choose_encoding():
+    """Test Accept-Encoding negotiation honours q-values and wildcards"""
+    both = ("br", "gzip")
+    assert choose_encoding("gzip, deflate, br", both) == "br"
+    assert choose_encoding("br;q=0.5, gzip", both) == "gzip"
+    assert choose_encoding("gzip;q=0, *;q=0.1", ("gzip",)) is None
+    assert choose_encoding("*", ("gzip",)) == "gzip"
+    assert choose_encoding("identity", both) is None
+    assert choose_encoding(None) is None
+
+
+def test_compresses_large_responses_only(client, db_session):
+    """Large list pages are gzipped; small bodies and identity requests are not"""
+    client.post("/api/v1/products/import?format=ndjson", content="\n".join(
+        f'{{"name": "Compressible product {i}", "price": "9.99", "stock_quantity": 10}}' for i in range(200)
+    ))
+    response = client.get("/api/v1/products/?limit=200", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) < len(response.content) / 4
+    assert len(response.json()["items"]) == 200
+
+    small = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    identity = client.get("/api/v1/products/?limit=200", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+
+
+def test_streams_are_compressed_incrementally():
+    """Each streamed chunk is sent compressed and decodable on its own; event streams pass through"""
+    async def chunks():
+        for i in range(3):
+            yield f"line {i}\n" * 200
+
+    middleware = CompressionMiddleware(StreamingResponse(chunks(), media_type="application/x-ndjson"))
+    messages = _call(middleware)
+    assert _headers(messages[0])["content-encoding"] == "gzip"
+    assert "content-length" not in _headers(messages[0])
+
+    bodies = [m for m in messages[1:] if m["type"] == "http.response.body"]
+    assert [m.get("more_body", False) for m in bodies] == [True, True, True, False]
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    # The first chunk decodes on its own (sync flush), before the rest was sent
+    assert decoder.decompress(bodies[0]["body"]) == ("line 0\n" * 200).encode()
+    rest = b"".join(m["body"] for m in bodies[1:])
+    assert decoder.decompress(rest) == "".join(f"line {i}\n" * 200 for i in (1, 2)).encode()
+
+    async def events():
+        yield "data: 1\n\n" * 200
+
+    sse = _call(CompressionMiddleware(StreamingResponse(events(), media_type="text/event-stream")))
+    assert "content-encoding" not in _headers(sse[0])
+    assert sse[1]["body"] == b"data: 1\n\n" * 200
+
+    # Small complete bodies keep their Content-Length and gain Vary
+    small = _call(CompressionMiddleware(PlainTextResponse("ok")))
+    assert "content-encoding" not in _headers(small[0])
+    assert _headers(small[0])["vary"] == "Accept-Encoding"
+
+
+def test_compressed_responses_get_their_own_strong_etag():
+    """A gzipped body never shares a strong ETag with the identity body, and both validate"""
+    def app(etag):
+        return CompressionMiddleware(PlainTextResponse("x" * 2000, headers={"ETag": etag}))
+
+    assert _headers(_call(app('"product-1-v3"'))[0])["etag"] == '"product-1-v3-gzip"'
+    assert _headers(_call(app('"product-1-v3"'), accept_encoding=None)[0])["etag"] == '"product-1-v3"'
+    # Weak tags may be shared by equivalent representations
+    assert _headers(_call(app('W/"abc"'))[0])["etag"] == 'W/"abc"'
+
+    assert etags.if_none_match('"product-1-v3-gzip"', '"product-1-v3"')
+    assert etags.if_none_match('"product-1-v3-br", "x"', '"product-1-v3"')
+    assert not etags.if_none_match('"product-1-v2-gzip"', '"product-1-v3"')
+    assert etags.version_from_if_match('"product-1-v3-gzip"', "product", 1) == 3
+
+    # A 304 names the tag the client validated with
+    not_modified = CompressionMiddleware(Response(status_code=304, headers={"ETag": '"product-1-v3"'}))
+    assert _headers(_call(not_modified, if_none_match='"product-1-v3-gzip"')[0])["etag"] == '"product-1-v3-gzip"'
+    assert _headers(_call(not_modified, if_none_match='"product-1-v3"')[0])["etag"] == '"product-1-v3"'
@@ -0,0 +1,43 @@
+import csv
+import io
+import json
+
+
+def test_export_orders_ndjson_and_csv(client, sample_products):
+    """Test order export streams one NDJSON line per order and one CSV row per item"""
+    first, second, _ = sample_products
+    client.post("/api/v1/orders/", json={"items": [{"product_id": first.id, "quantity": 1}, {"product_id": second.id, "quantity": 2}]})
+    created = client.post("/api/v1/orders/", json={"items": [{"product_id": first.id, "quantity": 3}]}).json()
+    client.patch(f"/api/v1/orders/{created['id']}/status", json={"status": "Shipped"})
+
+    response = client.get("/api/v1/orders/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    orders = [json.loads(line) for line in response.text.splitlines()]
+    assert [len(o["order_items"]) for o in orders] == [2, 1]
+    assert orders[0]["order_items"][1] == {
+        "id": orders[0]["order_items"][1]["id"],
+        "product_id": second.id,
+        "quantity_ordered": 2,
+        "price_at_time": "20.00",
+        "product_name": "Product 2",
+    }
+
+    response = client.get("/api/v1/orders/export?format=csv&status=Shipped")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 1
+    assert rows[0]["status"] == "Shipped"
+    assert rows[0]["quantity_ordered"] == "3"
+
+
+def test_export_products(client, sample_products):
+    """Test product export skips soft-deleted products unless requested"""
+    client.delete(f"/api/v1/products/{sample_products[0].id}/")
+
+    response = client.get("/api/v1/products/export?format=csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [r["name"] for r in rows] == ["Product 2", "Product 3"]
+    assert rows[0]["price"] == "20.00"
+
+    response = client.get("/api/v1/products/export?include_deleted=true")
+    assert len(response.text.splitlines()) == 3
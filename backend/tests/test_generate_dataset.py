@@ -0,0 +1,45 @@
+from sqlalchemy import func
+
+from app.models.order import Order, OrderStatus
+from app.models.order_item import OrderItem
+from app.models.product import Product
+from app.services.counter_service import LIVE_PRODUCTS, CounterService
+from benchmarks.generate_dataset import DatasetGenerator, parse_status_mix
+from tests.conftest import engine
+
+
+def test_generate_dataset(db_session, sample_product):
+    """Test the generator appends a consistent dataset and reconciles the product counter"""
+    counts = DatasetGenerator(
+        engine, products=200, orders=500, deleted_fraction=0.1,
+        status_mix=parse_status_mix("Pending=1,Shipped=1"), batch_size=64, verbose=False,
+    ).run()
+    assert counts["products"] == 200
+    assert counts["orders"] == 500
+    assert db_session.query(OrderItem).count() == counts["order_items"] >= 500
+
+    live = db_session.query(Product).filter(Product.deleted_at.is_(None)).count()
+    assert 1 < live < 201
+    assert CounterService.get(db_session, LIVE_PRODUCTS) == live
+
+    statuses = {s for (s,) in db_session.query(Order.status).distinct()}
+    assert statuses == {OrderStatus.PENDING, OrderStatus.SHIPPED}
+    # Every item points at an existing product, priced as that product
+    mismatched = (
+        db_session.query(func.count(OrderItem.id))
+        .join(Product, Product.id == OrderItem.product_id)
+        .filter(OrderItem.price_at_time != Product.price)
+        .scalar()
+    )
+    assert mismatched == 0
+    assert db_session.query(OrderItem).outerjoin(Product).filter(Product.id.is_(None)).count() == 0
+
+
+def test_generate_dataset_writes_last_item_batch(db_session):
+    """Items queued after the final full order batch are still written"""
+    counts = DatasetGenerator(
+        engine, products=10, orders=3, deleted_fraction=0, batch_size=1, verbose=False,
+    ).run()
+    assert counts["orders"] == 3
+    assert db_session.query(OrderItem).count() == counts["order_items"]
+    assert db_session.query(OrderItem.order_id).distinct().count() == 3
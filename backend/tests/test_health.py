@@ -0,0 +1,52 @@
+from sqlalchemy import create_engine, text
+from app.pool_metrics import InstrumentedQueuePool, pool_stats
+
+
+def test_db_health(client):
+    """Test the database health endpoint reports connectivity and pool stats"""
+    response = client.get("/health/db")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "healthy"
+    assert "sync" in data["pools"]
+
+
+def test_instrumented_pool_stats():
+    """Test checkout waits, occupancy and connection churn are recorded"""
+    engine = create_engine(
+        "sqlite:///./test_pool.db", poolclass=InstrumentedQueuePool, pool_size=2, max_overflow=1
+    )
+    held = [engine.connect() for _ in range(3)]
+    stats = pool_stats(engine.pool)
+    assert stats["checked_out"] == 3
+    assert stats["overflow_in_use"] == 1
+    for connection in held:
+        connection.execute(text("SELECT 1"))
+        connection.close()
+
+    stats = pool_stats(engine.pool)
+    assert stats["checked_out"] == 0
+    assert stats["checkouts"] == 3
+    assert stats["connections_opened"] == 3
+    assert stats["connections_closed"] == 1  # the overflow connection is discarded on checkin
+    assert stats["checkout_wait_ms"]["p95"] is not None
+    engine.dispose()
+
+
+def test_metrics_endpoint(client, sample_product):
+    """Test per-route latency and SQL statement histograms are exported"""
+    client.get(f"/api/v1/products/{sample_product.id}/")
+    client.get("/api/v1/orders/99999")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/products/{product_id}/",status="200"}' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/orders/{order_id}",status="404"}' in body
+    sql_count = next(
+        line for line in body.splitlines()
+        if line.startswith('http_request_sql_statements_sum{method="GET",route="/api/v1/orders/{order_id}"}')
+    )
+    assert float(sql_count.split()[-1]) >= 1
+    assert "http_requests_in_flight" in body
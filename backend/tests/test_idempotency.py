@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.models.idempotency_key import IdempotencyKey
+from app.models.order import Order
+from app.schemas.order import OrderCreate
+from app.services.idempotency_service import IdempotencyService
+from app.services.order_service import OrderService
+
+
+def test_create_order_replays_with_idempotency_key(client, sample_product, db_session):
+    """Test a retried request with the same key replays the response without a second order"""
+    order_data = {"items": [{"product_id": sample_product.id, "quantity": 5}]}
+    headers = {"Idempotency-Key": "checkout-1"}
+    first = client.post("/api/v1/orders/", json=order_data, headers=headers)
+    assert first.status_code == 201
+    assert "Idempotent-Replayed" not in first.headers
+
+    retry = client.post("/api/v1/orders/", json=order_data, headers=headers)
+    assert retry.status_code == 201
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+
+    db_session.refresh(sample_product)
+    assert sample_product.stock_quantity == 95
+    assert db_session.query(Order).count() == 1
+
+    # Another body under the same key is rejected
+    other = client.post(
+        "/api/v1/orders/", json={"items": [{"product_id": sample_product.id, "quantity": 1}]}, headers=headers
+    )
+    assert other.status_code == 422
+
+
+def test_concurrent_duplicate_key_rolls_back(client, sample_product, db_session):
+    """Test a second transaction recording the same key fails and keeps its stock untouched"""
+    order_data = OrderCreate(items=[{"product_id": sample_product.id, "quantity": 5}])
+    request_hash = IdempotencyService.fingerprint(order_data)
+    OrderService.create_order(db_session, order_data, "race", request_hash)
+
+    # Simulates the loser of the race, which missed the lookup before the winner committed
+    with pytest.raises(IntegrityError):
+        OrderService.create_order(db_session, order_data, "race", request_hash)
+    db_session.refresh(sample_product)
+    assert sample_product.stock_quantity == 95
+    assert db_session.query(Order).count() == 1
+
+
+def test_expired_keys_are_purged_and_reusable(client, sample_product, db_session):
+    """Test expired keys are deleted in batches and no longer replay"""
+    past = datetime.now(timezone.utc) - timedelta(minutes=1)
+    for i in range(5):
+        db_session.add(IdempotencyKey(
+            key=f"old-{i}", request_hash="x", status_code=201, response_body="{}", expires_at=past
+        ))
+    db_session.commit()
+
+    order_data = {"items": [{"product_id": sample_product.id, "quantity": 1}]}
+    response = client.post("/api/v1/orders/", json=order_data, headers={"Idempotency-Key": "old-0"})
+    assert response.status_code == 201
+    assert "Idempotent-Replayed" not in response.headers
+
+    assert IdempotencyService.purge_expired(db_session, batch_size=2) == 4
+    assert {k.key for k in db_session.query(IdempotencyKey)} == {"old-0"}
@@ -0,0 +1,68 @@
+from app.models.product import Product
+from app.services.import_service import ProductImportService
+
+
+def test_import_products_csv_with_row_errors(client, db_session):
+    """Test CSV import inserts valid rows and reports invalid ones by row number"""
+    body = (
+        "name,price,stock_quantity\n"
+        "Alpha,1.50,10\n"
+        "Beta,-2,5\n"
+        '"Gamma, large",3.00,\n'
+        "Delta,4.25,7\n"
+    )
+    response = client.post("/api/v1/products/import?format=csv", content=body)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["received"] == 4
+    assert data["inserted"] == 2
+    assert data["failed"] == 2
+    assert [e["row"] for e in data["errors"]] == [2, 3]
+    assert "price" in data["errors"][0]["errors"][0]
+    assert sorted(p.name for p in db_session.query(Product)) == ["Alpha", "Delta"]
+
+
+def test_import_products_ndjson_upsert_by_name(client, db_session, sample_product):
+    """Test NDJSON import updates products with matching names when upserting"""
+    body = (
+        '{"name": "Test Product", "price": "11.00", "stock_quantity": 7}\n'
+        "\n"
+        '{"name": "New Product", "price": "2.00", "stock_quantity": 1}\n'
+        "not json\n"
+    )
+    response = client.post("/api/v1/products/import?format=ndjson&upsert_by_name=true", content=body)
+
+    data = response.json()
+    assert (data["inserted"], data["updated"], data["failed"]) == (1, 1, 1)
+    assert data["errors"][0]["row"] == 4
+    assert client.get(f"/api/v1/products/{sample_product.id}/").json()["stock_quantity"] == 7
+
+
+def test_import_upsert_counts_repeated_names(client, db_session, sample_product):
+    """Every row is counted once when a name repeats within a batch or matches several products"""
+    db_session.add(Product(name="Test Product", price=1, stock_quantity=1))
+    db_session.commit()
+    body = (
+        '{"name": "New Product", "price": "2.00", "stock_quantity": 1}\n'
+        '{"name": "Test Product", "price": "11.00", "stock_quantity": 7}\n'
+        '{"name": "New Product", "price": "3.00", "stock_quantity": 4}\n'
+    )
+    data = client.post("/api/v1/products/import?format=ndjson&upsert_by_name=true", content=body).json()
+
+    assert (data["received"], data["inserted"], data["updated"], data["skipped"], data["failed"]) == (3, 1, 1, 1, 0)
+    new = db_session.query(Product).filter(Product.name == "New Product").one()
+    assert (str(new.price), new.stock_quantity) == ("3.00", 4)
+    assert {p.stock_quantity for p in db_session.query(Product).filter(Product.name == "Test Product")} == {7}
+
+
+def test_import_products_batches_split_chunks(db_session):
+    """Test lines split across body chunks are reassembled and rows are written in batches"""
+    rows = "".join(f"P{i},1.00,{i}\n" for i in range(25))
+    body = ("name,price,stock_quantity\n" + rows).encode()
+    chunks = [body[i:i + 7] for i in range(0, len(body), 7)]
+
+    report = ProductImportService.import_products(db_session, chunks, "csv", batch_size=10)
+
+    assert report["inserted"] == 25
+    assert db_session.query(Product).count() == 25
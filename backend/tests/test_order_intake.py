@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from app.exceptions import InsufficientStockError, OrderIntakeUnavailableError, ProductNotFoundError
+from app.models.order import Order
+from app.models.product import Product
+from app.order_intake import OrderIntakeQueue, order_intake
+from app.schemas.order import OrderCreate
+from tests.conftest import TestingSessionLocal
+
+
+def _order(product_id, quantity):
+    return OrderCreate(items=[{"product_id": product_id, "quantity": quantity}])
+
+
+def test_queue_creates_orders_in_one_batch_in_arrival_order(db_session):
+    """Orders arriving within the window share one transaction; each gets its own outcome"""
+    product = Product(name="Flash sale", price=10, stock_quantity=5)
+    db_session.add(product)
+    db_session.commit()
+
+    intake = OrderIntakeQueue(window_ms=500, max_batch_size=10)
+    intake.start(TestingSessionLocal)
+    try:
+        futures = [intake.submit(_order(product.id, q)) for q in (2, 2, 2, 1)]
+        futures.append(intake.submit(_order(99999, 1)))
+        first, second, third, fourth, fifth = (f.exception(timeout=10) or f.result() for f in futures)
+    finally:
+        intake.stop()
+
+    assert isinstance(first, int) and isinstance(second, int) and isinstance(fourth, int)
+    # Stock is taken in arrival order: the third order finds 1 unit left, the fourth fits
+    assert isinstance(third, InsufficientStockError)
+    assert isinstance(fifth, ProductNotFoundError)
+    assert intake.stats()["batches"] == 1
+    assert intake.stats()["largest_batch"] == 5
+    db_session.expire_all()
+    assert db_session.get(Product, product.id).stock_quantity == 0
+    assert db_session.query(Order).count() == 3
+
+    with pytest.raises(OrderIntakeUnavailableError):
+        intake.submit(_order(product.id, 1))
+
+
+def test_timed_out_order_is_not_created(db_session, sample_product):
+    """A caller that gives up while its order is still queued gets an error and no order"""
+    intake = OrderIntakeQueue(window_ms=300, max_batch_size=10, timeout=0.05)
+    intake.start(TestingSessionLocal)
+    try:
+        with pytest.raises(OrderIntakeUnavailableError):
+            intake.create(_order(sample_product.id, 1))
+    finally:
+        intake.stop()
+    db_session.expire_all()
+    assert db_session.query(Order).count() == 0
+    assert db_session.get(Product, sample_product.id).stock_quantity == 100
+
+
+def test_timeout_waits_for_started_batch(db_session, sample_product):
+    """Once its batch has started, an order outlives the timeout and its ID is returned"""
+    def slow_session():
+        time.sleep(0.3)
+        return TestingSessionLocal()
+
+    intake = OrderIntakeQueue(window_ms=0, max_batch_size=10, timeout=0.05)
+    intake.start(slow_session)
+    try:
+        order_id = intake.create(_order(sample_product.id, 1))
+        async_order_id = asyncio.run(intake.create_async(_order(sample_product.id, 1)))
+    finally:
+        intake.stop()
+    db_session.expire_all()
+    assert {o.id for o in db_session.query(Order)} == {order_id, async_order_id}
+    assert db_session.get(Product, sample_product.id).stock_quantity == 98
+
+
+def test_worker_survives_session_failure_and_fails_leftovers(sample_product):
+    """A batch whose session cannot be opened fails alone; requests left behind on stop are failed"""
+    release = threading.Event()
+    calls = []
+
+    def session_factory():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("database unavailable")
+        release.wait(10)
+        return TestingSessionLocal()
+
+    intake = OrderIntakeQueue(window_ms=0, max_batch_size=10)
+    intake.start(session_factory)
+    with pytest.raises(RuntimeError, match="database unavailable"):
+        intake.submit(_order(sample_product.id, 1)).result(10)
+
+    in_flight = intake.submit(_order(sample_product.id, 1))
+    intake.stop(timeout=0)
+    # A request that slipped in behind the stop sentinel
+    leftover: Future = Future()
+    intake._queue.put((_order(sample_product.id, 1), leftover))
+    release.set()
+
+    assert isinstance(in_flight.result(10), int)
+    assert isinstance(leftover.exception(10), OrderIntakeUnavailableError)
+
+
+def test_create_order_through_intake_queue(client, sample_product):
+    """POST /orders/ responses are the same with the intake queue enabled"""
+    order_intake.start(TestingSessionLocal)
+    try:
+        response = client.post("/api/v1/orders/", json={"items": [{"product_id": sample_product.id, "quantity": 3}]})
+        assert response.status_code == 201
+        assert response.json()["order_items"][0]["quantity_ordered"] == 3
+
+        too_many = client.post("/api/v1/orders/", json={"items": [{"product_id": sample_product.id, "quantity": 10**6}]})
+        assert too_many.status_code == 400
+        missing = client.post("/api/v1/orders/", json={"items": [{"product_id": 99999, "quantity": 1}]})
+        assert missing.status_code == 404
+
+        # Requests with an Idempotency-Key are created directly
+        batches = order_intake.stats()["batches"]
+        keyed = client.post(
+            "/api/v1/orders/",
+            json={"items": [{"product_id": sample_product.id, "quantity": 1}]},
+            headers={"Idempotency-Key": "intake-bypass"},
+        )
+        assert keyed.status_code == 201
+        assert order_intake.stats()["batches"] == batches
+    finally:
+        order_intake.stop()
+    assert client.get("/health/order-intake").json()["running"] is False
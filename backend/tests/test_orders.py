@@ -1,7 +1,8 @@
 import pytest
 from app.models.product import Product
-from app.models.order import Order
+from app.models.order import Order, OrderStatus
 from app.models.order_item import OrderItem
+from app.services.order_service import OrderService
 
 
 def test_create_order_success(client, db_session, sample_product):
@@ -169,3 +170,186 @@ def test_update_cancelled_order_status(client, sample_product):
     assert update_response.status_code == 400
     data = update_response.json()
     assert "cancelled" in data["detail"].lower()
+
+
+def test_bulk_order_status_update(client, db_session, sample_product):
+    """Test bulk transitions apply the single-order rules and report skipped orders"""
+    ids = [
+        client.post("/api/v1/orders/", json={"items": [{"product_id": sample_product.id, "quantity": 1}]}).json()["id"]
+        for _ in range(4)
+    ]
+    pending, shipped, cancelled, other = ids
+    client.patch(f"/api/v1/orders/{shipped}/status", json={"status": "Shipped"})
+    client.patch(f"/api/v1/orders/{cancelled}/status", json={"status": "Cancelled"})
+
+    response = client.post("/api/v1/orders/status/bulk", json={
+        "order_ids": [pending, shipped, cancelled, 99999, pending], "status": "shipped",
+    })
+    assert response.status_code == 200
+    assert response.json() == {
+        "updated": [{"id": pending, "status": "Shipped", "version": 2}],
+        "skipped": [
+            {"id": shipped, "reason": "unchanged"},
+            {"id": cancelled, "reason": "cancelled"},
+            {"id": 99999, "reason": "not_found"},
+        ],
+    }
+
+    assert client.post("/api/v1/orders/status/bulk", json={
+        "order_ids": [shipped], "status": "Pending",
+    }).json()["skipped"] == [{"id": shipped, "reason": "invalid_transition"}]
+
+    # Cancelling from both Pending and Shipped keeps the rollups in step
+    response = client.post("/api/v1/orders/status/bulk", json={"order_ids": [other, shipped], "status": "Cancelled"})
+    assert [row["id"] for row in response.json()["updated"]] == sorted([other, shipped])
+    statuses = client.get("/api/v1/analytics/orders/status-daily").json()
+    assert {s["status"]: s["order_count"] for s in statuses} == {"Shipped": 1, "Cancelled": 3}
+    assert client.get("/api/v1/analytics/revenue/daily").json()[0]["units_sold"] == 1
+    assert client.get(f"/api/v1/orders/{shipped}").json()["status"] == "Cancelled"
+
+
+def test_order_etag_conditional_get(client, sample_product):
+    """Order ETags change with status updates, added items and renamed products"""
+    order_id = client.post(
+        "/api/v1/orders/",
+        json={"items": [{"product_id": sample_product.id, "quantity": 1}]}
+    ).json()["id"]
+    url = f"/api/v1/orders/{order_id}"
+
+    etag = client.get(url).headers["ETag"]
+    assert etag.startswith(f'"order-{order_id}-v1-')
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(url, headers={"If-None-Match": "*"}).status_code == 304
+
+    list_etag = client.get("/api/v1/orders/").headers["ETag"]
+    assert client.get("/api/v1/orders/", headers={"If-None-Match": list_etag}).status_code == 304
+
+    client.post(f"/api/v1/orders/{order_id}/items/", json={"items": [{"product_id": sample_product.id, "quantity": 1}]})
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert etag.startswith(f'"order-{order_id}-v2-')
+
+    client.patch(f"{url}/status", json={"status": "Shipped"})
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"].startswith(f'"order-{order_id}-v3-')
+    assert client.get("/api/v1/orders/", headers={"If-None-Match": list_etag}).status_code == 200
+
+    # The response shows product names, so a rename invalidates both tags
+    etag = response.headers["ETag"]
+    list_etag = client.get("/api/v1/orders/").headers["ETag"]
+    client.patch(f"/api/v1/products/{sample_product.id}/", json={"name": "Renamed Product"})
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["order_items"][0]["product_name"] == "Renamed Product"
+    assert response.headers["ETag"] != etag
+    assert client.get("/api/v1/orders/", headers={"If-None-Match": list_etag}).status_code == 200
+
+
+def test_list_orders_cursor_pagination(client, db_session):
+    """Test keyset pagination over (created_at, id), including ties on created_at"""
+    from datetime import datetime, timedelta
+
+    base = datetime(2026, 1, 1, 12, 0, 0)
+    created = [base, base + timedelta(minutes=1), base + timedelta(minutes=1), base + timedelta(minutes=2)]
+    orders = [Order(created_at=c) for c in created]
+    db_session.add_all(orders)
+    db_session.commit()
+    expected = [o.id for o in sorted(orders, key=lambda o: (o.created_at, o.id), reverse=True)]
+
+    seen = []
+    response = client.get("/api/v1/orders/?limit=3")
+    seen += [o["id"] for o in response.json()]
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get(f"/api/v1/orders/?limit=3&after={cursor}")
+    seen += [o["id"] for o in response.json()]
+    assert "X-Next-Cursor" not in response.headers
+    assert seen == expected
+
+
+def test_create_orders_batch(client, db_session, sample_products):
+    """Test batch creation reports per-order results and one bad order does not abort the rest"""
+    first, second, _ = sample_products
+    response = client.post(
+        "/api/v1/orders/batch",
+        json={
+            "orders": [
+                {"items": [{"product_id": first.id, "quantity": 30}, {"product_id": second.id, "quantity": 5}]},
+                {"items": [{"product_id": first.id, "quantity": 30}]},
+                {"items": [{"product_id": 99999, "quantity": 1}]},
+                {"items": [{"product_id": first.id, "quantity": 20}]},
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 2
+    assert data["failed"] == 2
+    assert [r["status_code"] for r in data["results"]] == [201, 400, 404, 201]
+    assert len(data["results"][0]["order"]["order_items"]) == 2
+    assert "insufficient" in data["results"][1]["error"].lower()
+
+    db_session.expire_all()
+    assert db_session.get(Product, first.id).stock_quantity == 0
+    assert db_session.get(Product, second.id).stock_quantity == 25
+    assert db_session.query(OrderItem).count() == 3
+
+
+def test_list_orders_filters(client, db_session, sample_products):
+    """Test status, created_at range and product filters, combined with the cursor"""
+    from datetime import datetime
+
+    first, second, _ = sample_products
+    orders = [
+        Order(created_at=datetime(2026, 1, 1), status=OrderStatus.PENDING, order_items=[
+            OrderItem(product_id=first.id, quantity_ordered=1, price_at_time=10)]),
+        Order(created_at=datetime(2026, 2, 1), status=OrderStatus.SHIPPED, order_items=[
+            OrderItem(product_id=second.id, quantity_ordered=1, price_at_time=20)]),
+        Order(created_at=datetime(2026, 3, 1), status=OrderStatus.SHIPPED, order_items=[
+            OrderItem(product_id=first.id, quantity_ordered=1, price_at_time=10),
+            OrderItem(product_id=second.id, quantity_ordered=1, price_at_time=20)]),
+    ]
+    db_session.add_all(orders)
+    db_session.commit()
+    jan, feb, mar = [o.id for o in orders]
+
+    def ids(query):
+        response = client.get(f"/api/v1/orders/?{query}")
+        assert response.status_code == 200
+        return [o["id"] for o in response.json()]
+
+    assert ids("status=Shipped") == [mar, feb]
+    assert ids("created_from=2026-01-15T00:00:00&created_to=2026-03-01T00:00:00") == [feb]
+    assert ids(f"product_id={first.id}") == [mar, jan]
+    assert ids(f"product_id={second.id}&status=Shipped&created_to=2026-03-01T00:00:00") == [feb]
+
+    response = client.get("/api/v1/orders/?status=Shipped&limit=1")
+    cursor = response.headers["X-Next-Cursor"]
+    assert ids(f"status=Shipped&limit=1&after={cursor}") == [feb]
+
+    assert client.get("/api/v1/orders/?status=Unknown").status_code == 422
+
+
+def test_list_orders_uses_indexes(db_session, query_plans):
+    """Test EXPLAIN QUERY PLAN shows the listing queries walk the composite indexes instead of the table"""
+    from datetime import datetime
+
+    def plan(**filters):
+        return query_plans(OrderService.list_orders, db_session, limit=10, **filters)
+
+    # Only the outer query of the eager load sorts (the page it joined with order_items)
+    unfiltered = plan()
+    assert "SCAN orders USING INDEX ix_orders_created_at_id" in unfiltered
+    assert "SCAN orders" not in unfiltered
+
+    by_status = plan(status=OrderStatus.SHIPPED, after=(datetime(2026, 1, 1), 5))
+    assert any("ix_orders_status_created_at_id (status=?" in step for step in by_status)
+    assert not any("SCAN orders" in step for step in by_status)
+
+    by_range = plan(created_from=datetime(2026, 1, 1), created_to=datetime(2026, 2, 1))
+    assert any("ix_orders_created_at_id (created_at>? AND created_at<?)" in step for step in by_range)
+
+    by_product = plan(product_id=1)
+    assert any("ix_order_items_product_id_order_id (product_id=? AND order_id=?)" in step for step in by_product)
@@ -41,3 +41,236 @@ def test_list_products_pagination(client, sample_products):
     data = response.json()
     assert len(data["items"]) == 2
     assert data["total"] == 3
+
+
+def test_list_products_cursor_pagination(client, sample_products):
+    """Test keyset pagination with next_cursor"""
+    response = client.get("/api/v1/products/?limit=2&include_total=false")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] is None
+    assert [p["id"] for p in data["items"]] == [sample_products[0].id, sample_products[1].id]
+    assert data["next_cursor"]
+
+    response = client.get(f"/api/v1/products/?limit=2&after={data['next_cursor']}")
+    data = response.json()
+    assert [p["id"] for p in data["items"]] == [sample_products[2].id]
+    assert data["total"] == 3
+    assert data["next_cursor"] is None
+
+
+def test_list_products_invalid_cursor(client):
+    """Test malformed cursor is rejected"""
+    response = client.get("/api/v1/products/?after=not-a-cursor")
+    assert response.status_code == 400
+
+
+def test_list_products_total_from_maintained_counter(client, db_session, sample_products):
+    """Test the total is maintained on create/delete and can be recounted exactly"""
+    assert client.get("/api/v1/products/").json()["total"] == 3
+
+    client.post("/api/v1/products/", json={"name": "Extra", "price": "1.00", "stock_quantity": 1})
+    client.delete(f"/api/v1/products/{sample_products[0].id}/")
+    client.post("/api/v1/products/bulk-delete/", json=[sample_products[1].id, 99999])
+    assert client.get("/api/v1/products/").json()["total"] == 2
+
+    # Rows written behind the service's back are picked up by an exact recount
+    db_session.add(Product(name="Untracked", price=1, stock_quantity=1))
+    db_session.commit()
+    assert client.get("/api/v1/products/").json()["total"] == 2
+    assert client.get("/api/v1/products/?exact_total=true").json()["total"] == 3
+    assert client.get("/api/v1/products/").json()["total"] == 3
+
+
+def test_product_etag_conditional_get(client, sample_product):
+    """ETags follow the product version, which every write bumps"""
+    url = f"/api/v1/products/{sample_product.id}/"
+    response = client.get(url)
+    etag = response.headers["ETag"]
+    assert response.json()["version"] == 1
+    assert etag == f'"product-{sample_product.id}-v1"'
+
+    not_modified = client.get(url, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == etag
+    assert not_modified.content == b""
+
+    assert client.patch(url, json={"price": "12.50"}).json()["version"] == 2
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+    # Stock decrements by orders are plain UPDATEs that bump the version too
+    client.post("/api/v1/orders/", json={"items": [{"product_id": sample_product.id, "quantity": 1}]})
+    response = client.get(url, headers={"If-None-Match": f'"product-{sample_product.id}-v2"'})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == f'"product-{sample_product.id}-v3"'
+
+    assert client.get("/api/v1/products/99999/", headers={"If-None-Match": etag}).status_code == 404
+
+
+def test_product_list_etag(client, sample_products):
+    """A product page is 304 until one of its products changes"""
+    response = client.get("/api/v1/products/?limit=10")
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert client.get("/api/v1/products/?limit=10", headers={"If-None-Match": etag}).status_code == 304
+    # Other parameters produce other pages
+    assert client.get("/api/v1/products/?limit=2", headers={"If-None-Match": etag}).status_code == 200
+
+    client.patch(f"/api/v1/products/{sample_products[0].id}/", json={"stock_quantity": 1})
+    assert client.get("/api/v1/products/?limit=10", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_search_products_ranking(client):
+    """Test search ranks prefix, substring and similar names and follows writes"""
+    ids = {}
+    for name in ["Wireless Mouse", "Mouse Pad", "Mousse", "Gaming Keyboard", "Monitor"]:
+        response = client.post("/api/v1/products/", json={"name": name, "price": "5.00", "stock_quantity": 1})
+        ids[name] = response.json()["id"]
+
+    response = client.get("/api/v1/products/search?q=Mouse")
+    assert response.status_code == 200
+    names = [p["name"] for p in response.json()["items"]]
+    assert names == ["Mouse Pad", "Wireless Mouse", "Mousse"]
+
+    # Typo tolerance via trigram similarity
+    items = client.get("/api/v1/products/search?q=keybord").json()["items"]
+    assert [p["name"] for p in items] == ["Gaming Keyboard"]
+    assert 0 < items[0]["score"] < 1
+
+    # Pagination
+    page = client.get("/api/v1/products/search?q=mouse&skip=1&limit=1").json()
+    assert [p["name"] for p in page["items"]] == ["Wireless Mouse"]
+
+    # The index follows renames and deletes
+    client.patch(f"/api/v1/products/{ids['Monitor']}/", json={"name": "Mouse Bungee"})
+    client.delete(f"/api/v1/products/{ids['Mouse Pad']}/")
+    names = [p["name"] for p in client.get("/api/v1/products/search?q=mouse").json()["items"]]
+    assert names == ["Mouse Bungee", "Wireless Mouse", "Mousse"]
+
+
+def test_search_index_picks_up_other_workers_writes(client, db_session, monkeypatch):
+    """Renames made behind this process's back show up once the index reaches its maximum age"""
+    from app.search import product_search_index
+
+    product = {"name": "Desk Lamp", "price": "5.00", "stock_quantity": 1}
+    product_id = client.post("/api/v1/products/", json=product).json()["id"]
+    assert [p["name"] for p in client.get("/api/v1/products/search?q=lamp").json()["items"]] == ["Desk Lamp"]
+    # Another worker renames it: this process's index is not told
+    db_session.query(Product).filter(Product.id == product_id).update({"name": "Floor Light"})
+    db_session.commit()
+    assert client.get("/api/v1/products/search?q=light").json()["items"] == []
+
+    monkeypatch.setattr(product_search_index, "max_age", 0)
+    assert [p["name"] for p in client.get("/api/v1/products/search?q=light").json()["items"]] == ["Floor Light"]
+    assert client.get("/api/v1/products/search?q=lamp").json()["items"] == []
+
+
+def test_list_products_uses_partial_index(db_session, query_plans):
+    """Test product pages are read from the partial index on live products"""
+    from app.services.product_service import ProductService
+
+    plan = query_plans(ProductService.list_products, db_session, limit=10, after_id=5, include_total=False)
+    assert any("ix_products_live_id (id>?)" in step for step in plan)
+
+
+def test_update_product_version_check(client, sample_product):
+    """Versioned updates apply once and report later stale writes as conflicts"""
+    url = f"/api/v1/products/{sample_product.id}/"
+    etag = client.get(url).headers["ETag"]
+
+    response = client.patch(url, json={"price": "11.00"}, headers={"If-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["version"] == 2
+    assert response.headers["ETag"] == f'"product-{sample_product.id}-v2"'
+    assert response.json()["stock_quantity"] == sample_product.stock_quantity
+
+    # The same ETag (or body version) is now stale
+    conflict = client.patch(url, json={"price": "12.00"}, headers={"If-Match": etag})
+    assert conflict.status_code == 409
+    assert client.patch(url, json={"price": "12.00", "version": 1}).status_code == 409
+    assert client.get(url).json()["price"] == "11.00"
+
+    assert client.patch(url, json={"price": "12.00", "version": 2}).status_code == 200
+    assert client.patch(url, json={"price": "13.00"}, headers={"If-Match": 'W/"x"'}).status_code == 400
+    assert client.patch("/api/v1/products/99999/", json={"price": "1.00", "version": 1}).status_code == 404
+
+
+def test_delete_product_version_check(client, db_session, sample_product):
+    """Plain deletes succeed despite concurrent writes; If-Match deletes require the current version"""
+    from app.services.product_service import ProductService
+    from tests.conftest import TestingSessionLocal
+
+    url = f"/api/v1/products/{sample_product.id}/"
+    etag = client.get(url).headers["ETag"]
+    # A stock change (e.g. an order) lands after this session read the product
+    other = TestingSessionLocal()
+    try:
+        ProductService.adjust_stock(other, sample_product.id, -1)
+    finally:
+        other.close()
+
+    assert client.delete(url, headers={"If-Match": etag}).status_code == 409
+    assert client.delete(url, headers={"If-Match": "abc"}).status_code == 400
+    assert ProductService.delete_product(db_session, sample_product.id) is True
+    assert client.get(url).status_code == 404
+    assert client.delete(url).status_code == 404
+
+
+def test_adjust_stock(client, sample_product):
+    """Relative stock changes never take stock below zero"""
+    url = f"/api/v1/products/{sample_product.id}/stock/"
+    stock = sample_product.stock_quantity
+
+    response = client.post(url, json={"delta": 5})
+    assert response.status_code == 200
+    assert response.json()["stock_quantity"] == stock + 5
+    assert response.json()["version"] == 2
+
+    assert client.post(url, json={"delta": -(stock + 5)}).json()["stock_quantity"] == 0
+    response = client.post(url, json={"delta": -1})
+    assert response.status_code == 400
+    assert "insufficient stock" in response.json()["detail"].lower()
+
+    assert client.post(url, json={"delta": 0}).status_code == 422
+    assert client.post("/api/v1/products/99999/stock/", json={"delta": 1}).status_code == 404
+
+
+def test_bulk_update_products(client, db_session, sample_products):
+    """Test bulk updates apply absolute and relative changes and report per-product outcomes"""
+    first, second, third = sample_products  # stock 50, 30, 25
+    client.delete(f"/api/v1/products/{third.id}/")
+
+    response = client.patch("/api/v1/products/bulk", json={"items": [
+        {"id": second.id, "stock_delta": -31},
+        {"id": first.id, "price": "11.00", "stock_delta": -5},
+        {"id": third.id, "stock_quantity": 10},
+        {"id": 99999, "price": "1.00"},
+        {"id": second.id + 100, "name": "Missing"},
+    ]})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["updated"], body["skipped"]) == (1, 4)
+    assert [(r["id"], r["outcome"]) for r in body["results"]] == [
+        (second.id, "insufficient_stock"),
+        (first.id, "updated"),
+        (third.id, "not_found"),
+        (99999, "not_found"),
+        (second.id + 100, "not_found"),
+    ]
+    assert body["results"][1]["product"] == {
+        "id": first.id, "name": "Product 1", "price": "11.00", "stock_quantity": 45, "version": 2,
+    }
+
+    response = client.patch("/api/v1/products/bulk", json={"items": [
+        {"id": first.id, "stock_quantity": 7, "version": 2},
+        {"id": second.id, "name": "Renamed", "version": 5},
+    ]})
+    assert [r["outcome"] for r in response.json()["results"]] == ["updated", "version_conflict"]
+    # The product cache was invalidated
+    assert client.get(f"/api/v1/products/{first.id}/").json()["stock_quantity"] == 7
+    assert client.get(f"/api/v1/products/{second.id}/").json()["name"] == "Product 2"
+
+    assert client.patch("/api/v1/products/bulk", json={"items": [
+        {"id": first.id, "stock_quantity": 1, "stock_delta": 1},
+    ]}).status_code == 422
+    assert client.patch("/api/v1/products/bulk", json={"items": [{"id": first.id}, {"id": first.id}]}).status_code == 422
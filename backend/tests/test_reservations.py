@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+
+from app.models.product import Product
+from app.models.reservation import Reservation, ReservationItem
+from app.services.reservation_service import ReservationService
+
+
+def _stock(client, product_id):
+    return client.get(f"/api/v1/products/{product_id}/").json()["stock_quantity"]
+
+
+def test_hold_confirm_and_release(client, sample_product):
+    """Holds take stock at once; confirming keeps it, releasing returns it"""
+    stock = sample_product.stock_quantity
+    response = client.post("/api/v1/reservations/", json={
+        "items": [{"product_id": sample_product.id, "quantity": 4}], "ttl_seconds": 60,
+    })
+    assert response.status_code == 201
+    reservation = response.json()
+    assert reservation["items"][0]["quantity"] == 4
+    assert _stock(client, sample_product.id) == stock - 4
+    assert client.get(f"/api/v1/reservations/{reservation['id']}").status_code == 200
+
+    # Confirmed at the held price, without taking stock again
+    held_price = reservation["items"][0]["price_at_time"]
+    client.patch(f"/api/v1/products/{sample_product.id}/", json={"price": "999.00"})
+    order = client.post(f"/api/v1/reservations/{reservation['id']}/confirm")
+    assert order.status_code == 201
+    assert order.json()["order_items"][0]["quantity_ordered"] == 4
+    assert order.json()["order_items"][0]["price_at_time"] == held_price
+    assert _stock(client, sample_product.id) == stock - 4
+    assert client.post(f"/api/v1/reservations/{reservation['id']}/confirm").status_code == 404
+
+    second = client.post("/api/v1/reservations/", json={"items": [{"product_id": sample_product.id, "quantity": 6}]})
+    assert _stock(client, sample_product.id) == stock - 10
+    assert client.delete(f"/api/v1/reservations/{second.json()['id']}").status_code == 204
+    assert _stock(client, sample_product.id) == stock - 4
+    assert client.delete(f"/api/v1/reservations/{second.json()['id']}").status_code == 404
+
+
+def test_hold_errors(client, sample_product):
+    """Holds are checked like orders"""
+    too_many = client.post("/api/v1/reservations/", json={"items": [{"product_id": sample_product.id, "quantity": 10**6}]})
+    assert too_many.status_code == 400
+    missing = client.post("/api/v1/reservations/", json={"items": [{"product_id": 99999, "quantity": 1}]})
+    assert missing.status_code == 404
+    too_long = client.post("/api/v1/reservations/", json={
+        "items": [{"product_id": sample_product.id, "quantity": 1}], "ttl_seconds": 10**7,
+    })
+    assert too_long.status_code == 400
+    assert _stock(client, sample_product.id) == sample_product.stock_quantity
+
+
+def test_sweep_returns_expired_stock(client, db_session, sample_products):
+    """Expired holds cannot be confirmed and the sweeper returns their stock in batches"""
+    product_id = sample_products[0].id
+    stock = sample_products[0].stock_quantity
+    ids = [
+        client.post("/api/v1/reservations/", json={"items": [{"product_id": product_id, "quantity": 1}]}).json()["id"]
+        for _ in range(3)
+    ]
+    db_session.execute(
+        update(Reservation).where(Reservation.id.in_(ids[:2]))
+        .values(expires_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+    )
+    db_session.commit()
+
+    assert client.post(f"/api/v1/reservations/{ids[0]}/confirm").status_code == 404
+    assert client.get(f"/api/v1/reservations/{ids[0]}").status_code == 404
+    assert ReservationService.sweep_expired(db_session, batch_size=1) == 2
+    assert _stock(client, product_id) == stock - 1
+    assert db_session.query(Reservation).count() == 1
+    assert db_session.query(ReservationItem).count() == 1
+    assert db_session.get(Product, product_id).version == 6  # 3 holds + 2 returns
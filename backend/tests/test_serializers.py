@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.models.order import Order, OrderStatus
+from app.models.order_item import OrderItem
+from app.models.product import Product
+from app.schemas.order import OrderResponse
+from app.schemas.product import ProductResponse
+from app.serializers import FastJSONResponse, order_payload, product_payload
+from benchmarks import serialization
+
+
+def test_fast_path_matches_response_model_encoding():
+    """Payloads encode to the same bytes as validated response models"""
+    names = {1: "Café crème", 2: "Plain"}
+    for created_at in (
+        datetime(2026, 3, 1, 12, 30),
+        datetime(2026, 3, 1, 12, 30, 0, 120000, tzinfo=timezone.utc),
+        datetime(2026, 3, 1, 12, 30, tzinfo=timezone(timedelta(hours=-5))),
+    ):
+        order = Order(id=7, created_at=created_at, status=OrderStatus.SHIPPED, version=3)
+        order.order_items = [
+            OrderItem(id=1, product_id=1, quantity_ordered=2, price_at_time=Decimal("19.90")),
+            OrderItem(id=2, product_id=3, quantity_ordered=1, price_at_time=Decimal("5.00")),
+        ]
+        expected = JSONResponse(jsonable_encoder(OrderResponse.from_order(order, names))).body
+        assert FastJSONResponse(order_payload(order, names)).body == expected
+
+    product = Product(id=4, name="Ünïcode", price=Decimal("1234.50"), stock_quantity=0, version=2)
+    expected = JSONResponse(jsonable_encoder(ProductResponse.model_validate(product))).body
+    assert FastJSONResponse(product_payload(product)).body == expected
+    assert FastJSONResponse(product_payload(ProductResponse.model_validate(product))).body == expected
+
+
+def test_serialization_benchmark_smoke():
+    """Test the micro-benchmark runs (it checks both paths agree)"""
+    result = serialization.run(orders=20, items=2, repeat=1)
+    assert result["orders"] == 20
+    assert result["fast_path_ms"] > 0
@@ -0,0 +1,69 @@
+import threading
+import pytest
+from app.config import settings
+from app.exceptions import InsufficientStockError, ProductNotFoundError
+from app.models.order_item import OrderItem
+from app.models.product import Product
+from app.schemas.order import OrderCreate
+from app.services.order_service import OrderService
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def conditional_stock_mode(monkeypatch):
+    monkeypatch.setattr(settings, "stock_mode", "conditional")
+
+
+def test_conditional_mode_create_order(client, db_session, sample_product, conditional_stock_mode):
+    """Test order creation and error mapping with conditional stock decrements"""
+    response = client.post(
+        "/api/v1/orders/",
+        json={"items": [{"product_id": sample_product.id, "quantity": 40}, {"product_id": sample_product.id, "quantity": 20}]},
+    )
+    assert response.status_code == 201
+    assert [i["price_at_time"] for i in response.json()["order_items"]] == ["10.50", "10.50"]
+
+    response = client.post("/api/v1/orders/", json={"items": [{"product_id": sample_product.id, "quantity": 41}]})
+    assert response.status_code == 400
+    assert "Available: 40" in response.json()["detail"]
+
+    response = client.post("/api/v1/orders/", json={"items": [{"product_id": 99999, "quantity": 1}]})
+    assert response.status_code == 404
+
+    db_session.expire_all()
+    assert db_session.get(Product, sample_product.id).stock_quantity == 40
+
+
+def test_conditional_mode_concurrent_orders_never_oversell(db_session, conditional_stock_mode):
+    """Stress test: concurrent buyers of one hot SKU sell exactly the available stock"""
+    product = Product(name="Hot SKU", price=5, stock_quantity=10)
+    db_session.add(product)
+    db_session.commit()
+    product_id = product.id
+
+    outcomes = []
+    lock = threading.Lock()
+
+    def buy():
+        db = TestingSessionLocal()
+        try:
+            OrderService.create_order(db, OrderCreate(items=[{"product_id": product_id, "quantity": 1}]))
+            result = "ok"
+        except (InsufficientStockError, ProductNotFoundError):
+            result = "rejected"
+        finally:
+            db.close()
+        with lock:
+            outcomes.append(result)
+
+    threads = [threading.Thread(target=buy) for _ in range(25)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert outcomes.count("ok") == 10
+    assert outcomes.count("rejected") == 15
+    db_session.expire_all()
+    assert db_session.get(Product, product_id).stock_quantity == 0
+    assert db_session.query(OrderItem).count() == 10